@@ -122,7 +122,7 @@ from irobot_edu_sdk.robots import Create3
 
 # Importar módulos propios del sistema
 from src import config
-from src.potential_fields import attractive_wheel_speeds, POTENTIAL_TYPES, reset_velocity_ramp
+from src.potential_fields import attractive_wheel_speeds, POTENTIAL_TYPES, reset_velocity_ramp, warmup
 from src.safety import saturate_wheel_speeds, detect_obstacle, emergency_stop_needed, apply_obstacle_slowdown
 from src.sensor_logger import SensorLogger
 from src.velocity_logger import VelocityLogger
@@ -619,6 +619,10 @@ Ejemplos de uso:
     # Mostrar información de la misión antes de iniciar
     print_mission_info(q_i, q_f, args.robot, args.potential)
     
+    # Compilar los núcleos del control antes de conectar, para que la primera
+    # iteración del bucle no pague la compilación de Numba
+    warmup()
+    
     # Establecemos la conexión Bluetooth con nuestro robot del grupo 1
     # El nombre por defecto es "C3_UIEC_Grupo1" según config.py
     print(f"[CONNECTING] Conectando a '{args.robot}'...")
@@ -152,7 +152,8 @@ from irobot_edu_sdk.robots import Create3
 
 # Importar módulos propios del sistema
 from src import config
-from src.potential_fields import combined_potential_speeds, POTENTIAL_TYPES, reset_velocity_ramp
+from src.potential_fields import (combined_potential_speeds, POTENTIAL_TYPES, reset_velocity_ramp,
+                                   PoseCache, warmup)
 from src.safety import saturate_wheel_speeds, emergency_stop_needed, apply_obstacle_slowdown
 from src.sensor_logger import SensorLogger
 from src.velocity_logger import VelocityLogger
@@ -566,6 +567,8 @@ class CombinedPotentialNavigator:
                 
                 # Posición completa en nuestro sistema de coordenadas mundial
                 q = (actual_x, actual_y, actual_heading)
+                # Seno/coseno de la orientación calculados una sola vez por iteración
+                pose = PoseCache.from_tuple(q)
                 
                 # CALCULAR DISTANCIA AL OBJETIVO ACTUAL usando la posición corregida
                 dx = self.q_goal[0] - actual_x
@@ -701,7 +704,7 @@ class CombinedPotentialNavigator:
                 # siempre intenta avanzar hacia el objetivo, pero ajusta su dirección
                 # para evitar colisiones.
                 v_left, v_right, dist_from_func, info = combined_potential_speeds(
-                    q, self.q_goal, 
+                    pose, self.q_goal, 
                     ir_sensors=ir_sensors,
                     k_rep=self.k_rep,
                     d_influence=self.d_influence,
@@ -906,6 +909,10 @@ Ejemplos de uso:
     print_mission_info(q_i, waypoints, q_f, args.robot, args.potential, 
                       k_rep=args.k_rep, d_influence=args.d_influence)
     
+    # Compilar los núcleos del control antes de conectar, para que la primera
+    # iteración del bucle no pague la compilación de Numba
+    warmup()
+    
     # Establecemos la conexión Bluetooth con nuestro robot del grupo 1
     # El nombre por defecto es "C3_UIEC_Grupo1" según config.py
     print(f"[CONNECTING] Conectando a '{args.robot}'...")
@@ -1,15 +1,44 @@
 import json
-from dataclasses import dataclass
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Optional, Dict, Tuple
+from typing import Callable, Iterator, List, Optional, Dict, Set, Tuple
 
 import tkinter as tk
 from tkinter import messagebox
 from tkinter import ttk
 import tkinter.font as tkfont
 
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
 GRAPH_FILE = Path(__file__).resolve().parent / "grafo.json"
 
+# A partir de este número de nodos la proyección se hace en bloque
+BATCH_PROJECTION_MIN = 256
+
+NODE_RADIUS = 18
+
+# Con más nodos que esto las etiquetas solo se dibujan al pasar el ratón
+LAZY_LABELS_MIN = 200
+
 
 # ---------------------- Modelo de datos ---------------------- #
 
@@ -33,6 +62,13 @@ class Graph:
     names: List[str]
     coords: List[Optional[NodeCoord]]  # mismo índice que names
     edges: List[Edge]
+    # nodo -> índices de las aristas que inciden en él
+    _adj: Dict[int, List[int]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        self.rebuild_adjacency()
 
     @classmethod
     def load(cls, path: Path = GRAPH_FILE) -> "Graph":
@@ -72,8 +108,70 @@ class Graph:
 
         return cls(names=names, coords=coords, edges=edges)
 
-    def save(self, path: Path = GRAPH_FILE) -> None:
-        nombres = self.names
+    # ---------- Adyacencia ---------- #
+
+    def rebuild_adjacency(self) -> None:
+        adj: Dict[int, List[int]] = {}
+        for ei, e in enumerate(self.edges):
+            adj.setdefault(e.src, []).append(ei)
+            if e.dst != e.src:
+                adj.setdefault(e.dst, []).append(ei)
+        self._adj = adj
+
+    def incident_edges(self, idx: int) -> List[int]:
+        return self._adj.get(idx, [])
+
+    def _link(self, ei: int, e: Edge) -> None:
+        self._adj.setdefault(e.src, []).append(ei)
+        if e.dst != e.src:
+            self._adj.setdefault(e.dst, []).append(ei)
+
+    def _unlink(self, ei: int, e: Edge) -> None:
+        for n in {e.src, e.dst}:
+            incident = self._adj.get(n)
+            if incident is not None and ei in incident:
+                incident.remove(ei)
+
+    def add_edge(self, edge: Edge) -> int:
+        self.edges.append(edge)
+        ei = len(self.edges) - 1
+        self._link(ei, edge)
+        return ei
+
+    def update_edge(self, ei: int, edge: Edge) -> None:
+        self._unlink(ei, self.edges[ei])
+        self.edges[ei] = edge
+        self._link(ei, edge)
+
+    def delete_edge(self, ei: int) -> None:
+        # Los índices posteriores se desplazan, así que se reconstruye
+        self.edges.pop(ei)
+        self.rebuild_adjacency()
+
+    def delete_node(self, idx: int) -> None:
+        """Elimina el nodo ``idx`` y sus aristas, renumerando el resto."""
+        self.names.pop(idx)
+        if idx < len(self.coords):
+            self.coords.pop(idx)
+
+        # Las aristas que sobreviven se renumeran en el sitio, sin copiarlas
+        removed = set(self.incident_edges(idx))
+        kept: List[Edge] = []
+        for ei, e in enumerate(self.edges):
+            if ei in removed:
+                continue
+            if e.src > idx:
+                e.src -= 1
+            if e.dst > idx:
+                e.dst -= 1
+            kept.append(e)
+
+        self.edges[:] = kept
+        self.rebuild_adjacency()
+
+    def to_dict(self) -> dict:
+        """Copia serializable del grafo, independiente de los objetos vivos."""
+        nombres = list(self.names)
         coords_out: List[Optional[dict]] = []
 
         for i, coord in enumerate(self.coords):
@@ -95,14 +193,33 @@ class Graph:
             for e in self.edges
         ]
 
-        data = {
+        return {
             "nombres": nombres,
             "coordenadas": coords_out,
             "aristas": aristas,
         }
 
-        with path.open("w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+    def save(self, path: Path = GRAPH_FILE) -> None:
+        self.write_json(self.to_dict(), path)
+
+    @staticmethod
+    def write_json(data: dict, path: Path = GRAPH_FILE) -> None:
+        """Serializa ``data`` y lo escribe en ``path``; no toca el grafo."""
+        if HAS_ORJSON:
+            payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        else:
+            payload = json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+
+        # Se escribe todo de una vez en un temporal y se renombra, así un
+        # fallo a mitad de escritura nunca deja el grafo corrupto. El fsync
+        # asegura que los datos estén en disco antes del renombrado; si no,
+        # un corte de luz podría dejar un graph.json vacío.
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with tmp_path.open("wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
 
 
 @dataclass
@@ -115,49 +232,95 @@ class Transform:
     height: int
     padding: int = 60
 
-    def world_to_screen(self, x: float, y: float) -> Tuple[float, float]:
-        if self.max_x == self.min_x:
-            sx = self.width / 2
+    def __post_init__(self) -> None:
+        # Los casos degenerados (todos los nodos alineados) se resuelven aquí
+        # una sola vez: las funciones resultantes no tienen ramas. Si se
+        # modifican los campos hay que crear un Transform nuevo.
+        self.world_to_screen = self._make_world_to_screen()
+        self.screen_to_world = self._make_screen_to_world()
+
+    def covers(self, x: float, y: float) -> bool:
+        """True si el punto está dentro de los límites usados para proyectar."""
+        return self.min_x <= x <= self.max_x and self.min_y <= y <= self.max_y
+
+    def _make_world_to_screen(self) -> Callable[[float, float], Tuple[float, float]]:
+        span_x = self.max_x - self.min_x
+        span_y = self.max_y - self.min_y
+
+        if span_x == 0:
+            kx, ox = 0.0, self.width / 2
         else:
-            sx = self.padding + (x - self.min_x) / (self.max_x - self.min_x) * (
-                self.width - 2 * self.padding
-            )
+            kx = (self.width - 2 * self.padding) / span_x
+            ox = self.padding - self.min_x * kx
 
-        if self.max_y == self.min_y:
-            sy = self.height / 2
+        if span_y == 0:
+            ky, oy = 0.0, self.height / 2
         else:
-            sy = self.padding + (y - self.min_y) / (self.max_y - self.min_y) * (
-                self.height - 2 * self.padding
-            )
+            ky = (self.height - 2 * self.padding) / span_y
+            oy = self.padding - self.min_y * ky
 
-        return sx, self.height - sy
+        self._coef = (ox, kx, self.height - oy, ky)
 
-    def screen_to_world(self, sx: float, sy_canvas: float) -> Tuple[float, float]:
-        sy = self.height - sy_canvas
+        def world_to_screen(
+            x: float, y: float, ox: float = ox, kx: float = kx,
+            cy: float = self.height - oy, ky: float = ky,
+        ) -> Tuple[float, float]:
+            return ox + x * kx, cy - y * ky
 
-        if self.width - 2 * self.padding <= 0 or self.height - 2 * self.padding <= 0:
-            return 0.0, 0.0
+        return world_to_screen
 
-        if self.max_x == self.min_x:
-            x = self.min_x
-        else:
-            x = self.min_x + (sx - self.padding) / (self.width - 2 * self.padding) * (
-                self.max_x - self.min_x
-            )
+    def world_to_screen_many(
+        self, xs: "np.ndarray", ys: "np.ndarray"
+    ) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Proyecta arrays de coordenadas en una sola llamada (requiere numpy)."""
+        return _project(xs, ys, *self._coef)
+
+    def _make_screen_to_world(self) -> Callable[[float, float], Tuple[float, float]]:
+        inner_w = self.width - 2 * self.padding
+        inner_h = self.height - 2 * self.padding
 
-        if self.max_y == self.min_y:
-            y = self.min_y
+        if inner_w <= 0 or inner_h <= 0:
+            ix = iy = ox = oy = 0.0
         else:
-            y = self.min_y + (sy - self.padding) / (self.height - 2 * self.padding) * (
-                self.max_y - self.min_y
-            )
+            ix = (self.max_x - self.min_x) / inner_w
+            ox = self.min_x - self.padding * ix
+            iy = (self.max_y - self.min_y) / inner_h
+            oy = self.min_y + (self.height - self.padding) * iy
+
+        def screen_to_world(
+            sx: float, sy_canvas: float, ox: float = ox, ix: float = ix,
+            oy: float = oy, iy: float = iy,
+        ) -> Tuple[float, float]:
+            return ox + sx * ix, oy - sy_canvas * iy
+
+        return screen_to_world
 
-        return x, y
+
+if HAS_NUMBA:
+    @njit(cache=True, fastmath=True)
+    def _project(xs, ys, ox, kx, cy, ky):
+        n = xs.shape[0]
+        sx = np.empty(n)
+        sy = np.empty(n)
+        for i in range(n):
+            sx[i] = ox + xs[i] * kx
+            sy[i] = cy - ys[i] * ky
+        return sx, sy
+
+elif HAS_NUMPY:
+    def _project(xs, ys, ox, kx, cy, ky):
+        return ox + xs * kx, cy - ys * ky
 
 
 # ---------------------- Editor gráfico ---------------------- #
 
 class GraphEditorApp(tk.Tk):
+    # Estilos de óvalos y aristas, compartidos por todas las llamadas a Tk
+    _NODE_DEFAULT = {"fill": "#38bdf8", "outline": "#0f172a", "width": 2}
+    _NODE_HL = {"fill": "#f97316", "outline": "#f97316", "width": 2}
+    _EDGE_DEFAULT = {"fill": "#64748b", "width": 2}
+    _EDGE_HL = {"fill": "#f97316", "width": 3}
+
     def __init__(self) -> None:
         super().__init__()
 
@@ -170,6 +333,10 @@ class GraphEditorApp(tk.Tk):
         self.font_small = tkfont.Font(family="Segoe UI", size=9)
         self.font_small_bold = tkfont.Font(family="Segoe UI", size=8, weight="bold")
         self.font_title = tkfont.Font(family="Segoe UI", size=13, weight="bold")
+        # Las etiquetas de peso solo se dibujan en aristas lo bastante largas
+        # para leerse; se calcula una vez en lugar de consultar Tk al redibujar
+        min_label_len = 2 * self.font_small_bold.cget("size")
+        self._min_label_len_sq = min_label_len * min_label_len
 
         try:
             self.graph = Graph.load()
@@ -177,23 +344,56 @@ class GraphEditorApp(tk.Tk):
             messagebox.showerror("Error", str(e))
             self.graph = Graph(names=[], coords=[], edges=[])
 
-        self.node_items: Dict[int, Dict[str, int]] = {}
-        self.edge_items: List[Dict[str, int]] = []
+        # Ids de los elementos del lienzo en listas paralelas indexadas por
+        # nodo / arista (None si no se ha dibujado)
+        self._node_oval_ids: List[Optional[int]] = []
+        self._node_index_ids: List[Optional[int]] = []
+        self._node_label_ids: List[Optional[int]] = []
+        self._edge_line_ids: List[Optional[int]] = []
+        self._edge_weight_ids: List[Optional[int]] = []
+        # Posición con la que se dibujó cada elemento, para moverlo solo si cambia
+        self._node_drawn_at: List[Optional[Tuple[float, float]]] = []
+        self._edge_drawn_at: List[Optional[Tuple[float, float, float, float]]] = []
+        self._grid_size: Optional[Tuple[int, int]] = None
+        # Rejilla espacial para localizar nodos por posición (None = rehacer)
+        self._hit_grid: Optional[Dict[Tuple[int, int], List[int]]] = None
         self._item_to_node: Dict[int, int] = {}
-        self._line_to_edge_index: Dict[int, int] = {}
+        # Texto de cada fila de la lista de nodos; None si hay que recalcularlo
+        self._node_desc_cache: List[Optional[str]] = []
 
         self._transform: Optional[Transform] = None
+        # Posiciones en pantalla calculadas con _screen_cache_tf
+        self._screen_cache: List[Optional[Tuple[float, float]]] = []
+        self._screen_cache_tf: Optional[Transform] = None
+        self._screen_stale: Set[int] = set()
         self._drag_node_index: Optional[int] = None
+        # Nodo cuya etiqueta se ha creado al pasar el ratón (grafos grandes)
+        self._hover_label_node: Optional[int] = None
         self._drag_offset: Tuple[float, float] = (0.0, 0.0)
         self._selected_node_index: Optional[int] = None
 
+        # Redibujados agrupados: se ejecutan una vez cuando Tk queda ocioso
+        self._redraw_pending = False
+        self._batch_depth = 0
+        self._visible = True
+        # Nodo pintado actualmente como resaltado
+        self._highlighted_node: Optional[int] = None
+        self._highlighted_targets: Optional[Tuple[Optional[int], str]] = None
+        # Por nodo: (óvalo, expresión de sus aristas); se vacía si cambian los ids
+        self._hl_cache: Dict[int, Tuple[Optional[int], str]] = {}
+
         self.status_var = tk.StringVar(value="Listo")
 
+        # Hilo para escribir el grafo sin bloquear la interfaz
+        self._io_pool = ThreadPoolExecutor(max_workers=1)
+        self._save_future: Optional[Future] = None
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+
         self._configure_style()
         self._build_ui()
         self._bind_shortcuts()
         self._refresh_lists()
-        self._redraw_canvas()
+        self._schedule_redraw()
 
     # ---------- UI ---------- #
 
@@ -413,16 +613,20 @@ class GraphEditorApp(tk.Tk):
             anchor="w",
         ).pack(side=tk.LEFT, padx=10, pady=4, fill=tk.X, expand=True)
 
-        self.canvas.bind("<Configure>", lambda e: self._redraw_canvas())
+        self.canvas.bind("<Configure>", lambda e: self._schedule_redraw())
         self.canvas.bind("<ButtonPress-1>", self._on_canvas_press)
         self.canvas.bind("<B1-Motion>", self._on_canvas_drag)
         self.canvas.bind("<ButtonRelease-1>", self._on_canvas_release)
         self.canvas.bind("<ButtonPress-3>", self._on_canvas_right_click)
 
         self.canvas.tag_bind("edge_line", "<Button-1>", self._on_edge_click)
+        self.canvas.tag_bind("node_hit", "<Enter>", self._on_node_enter)
+        self.canvas.tag_bind("node_hit", "<Leave>", self._on_node_leave)
 
     def _bind_shortcuts(self) -> None:
         self.bind("<Control-s>", self._on_save_shortcut)
+        self.bind("<Map>", self._on_map)
+        self.bind("<Unmap>", self._on_unmap)
         self.list_nodes.bind("<Delete>", self._delete_node)
         self.list_edges.bind("<Delete>", self._delete_edge)
 
@@ -448,121 +652,501 @@ class GraphEditorApp(tk.Tk):
 
     # ---------- Listas ---------- #
 
-    def _refresh_lists(self) -> None:
-        self.list_nodes.delete(0, tk.END)
-        for i, name in enumerate(self.graph.names):
+    def _node_desc(self, i: int) -> str:
+        cache = self._node_desc_cache
+        if i >= len(cache):
+            cache.extend([None] * (i - len(cache) + 1))
+        desc = cache[i]
+        if desc is None:
+            name = self.graph.names[i]
             coord = self.graph.coords[i] if i < len(self.graph.coords) else None
             if coord is not None:
                 desc = f"{i} - {name} (x={coord.x:.2f}, y={coord.y:.2f})"
             else:
                 desc = f"{i} - {name}"
-            self.list_nodes.insert(tk.END, desc)
+            cache[i] = desc
+        return desc
+
+    def _edge_desc(self, idx: int) -> str:
+        e = self.graph.edges[idx]
+        f = e.src
+        t = e.dst
+        nf = self.graph.names[f] if 0 <= f < len(self.graph.names) else f"#{f}"
+        nt = self.graph.names[t] if 0 <= t < len(self.graph.names) else f"#{t}"
+        return f"{idx}: {f} ({nf}) -> {t} ({nt}) [w={e.weight}]"
+
+    def _refresh_lists(self) -> None:
+        self._refresh_node_list()
+        self._refresh_edge_list()
+
+    def _refresh_node_list(self) -> None:
+        self.list_nodes.delete(0, tk.END)
+        for i in range(len(self.graph.names)):
+            self.list_nodes.insert(tk.END, self._node_desc(i))
 
+    def _refresh_edge_list(self) -> None:
         self.list_edges.delete(0, tk.END)
-        for idx, e in enumerate(self.graph.edges):
-            f = e.src
-            t = e.dst
-            w = e.weight
-            nf = self.graph.names[f] if 0 <= f < len(self.graph.names) else f"#{f}"
-            nt = self.graph.names[t] if 0 <= t < len(self.graph.names) else f"#{t}"
-            self.list_edges.insert(
-                tk.END, f"{idx}: {f} ({nf}) -> {t} ({nt}) [w={w}]"
-            )
+        for idx in range(len(self.graph.edges)):
+            self.list_edges.insert(tk.END, self._edge_desc(idx))
+
+    @staticmethod
+    def _replace_list_item(listbox: tk.Listbox, idx: int, desc: str) -> None:
+        """Sustituye una sola entrada de la lista conservando la selección."""
+        selected = idx in listbox.curselection()
+        listbox.delete(idx)
+        listbox.insert(idx, desc)
+        if selected:
+            listbox.selection_set(idx)
+
+    def _list_node_added(self, i: int) -> None:
+        self.list_nodes.insert(tk.END, self._node_desc(i))
+
+    def _list_node_updated(self, i: int, name_changed: bool = False) -> None:
+        if i < len(self._node_desc_cache):
+            self._node_desc_cache[i] = None
+        self._replace_list_item(self.list_nodes, i, self._node_desc(i))
+        if name_changed:
+            # Las aristas muestran el nombre de sus extremos
+            for idx in self.graph.incident_edges(i):
+                self._list_edge_updated(idx)
+
+    def _list_edge_added(self, idx: int) -> None:
+        self.list_edges.insert(tk.END, self._edge_desc(idx))
+
+    def _list_edge_updated(self, idx: int) -> None:
+        self._replace_list_item(self.list_edges, idx, self._edge_desc(idx))
 
     # ---------- Canvas ---------- #
 
+    def _schedule_redraw(self) -> None:
+        """Pide un redibujado; varias peticiones seguidas se agrupan en uno."""
+        if self._redraw_pending:
+            return
+        self._redraw_pending = True
+        self._request_flush()
+
+    def _request_flush(self) -> None:
+        # Suspendido o con la ventana oculta el redibujado queda pendiente
+        if self._batch_depth == 0 and self._visible:
+            self.after_idle(self._flush_redraw)
+
+    def _flush_redraw(self) -> None:
+        if not self._redraw_pending or self._batch_depth > 0 or not self._visible:
+            return
+        self._redraw_pending = False
+        self._redraw_canvas()
+
+    def suspend_redraws(self) -> None:
+        self._batch_depth += 1
+
+    def resume_redraws(self) -> None:
+        self._batch_depth -= 1
+        if self._batch_depth == 0 and self._redraw_pending:
+            self._request_flush()
+
+    @contextmanager
+    def batch_updates(self) -> Iterator[None]:
+        """Agrupa varias modificaciones del grafo en un único redibujado.
+
+        Es reentrante: solo al salir del bloque más externo se programa el
+        redibujado pendiente.
+        """
+        self.suspend_redraws()
+        try:
+            yield
+        finally:
+            self.resume_redraws()
+
+    def _on_map(self, event: tk.Event) -> None:
+        # <Map>/<Unmap> también llegan desde los widgets hijos
+        if event.widget is not self:
+            return
+        self._visible = True
+        if self._redraw_pending:
+            self._request_flush()
+
+    def _on_unmap(self, event: tk.Event) -> None:
+        if event.widget is self:
+            self._visible = False
+
     def _redraw_canvas(self) -> None:
-        self.canvas.delete("all")
-        self._draw_background_grid()
-        self.node_items.clear()
-        self.edge_items.clear()
-        self._item_to_node.clear()
-        self._line_to_edge_index.clear()
+        """Sincroniza el lienzo con el grafo reutilizando los elementos ya creados.
+
+        Lo que no ha cambiado de sitio no se toca, lo desplazado se mueve con
+        ``move``/``coords`` y solo se crean o borran los elementos que aparecen
+        o desaparecen. Quien cambie el texto o los extremos de un elemento
+        debe descartarlo antes con ``_drop_node_items``/``_drop_edge_items``.
+        """
+        width = self.canvas.winfo_width() or 800
+        height = self.canvas.winfo_height() or 500
+        if self._grid_size != (width, height):
+            self.canvas.delete("grid")
+            self._draw_background_grid()
+            self.canvas.tag_lower("grid")
+            self._grid_size = (width, height)
+
+        # El resaltado se quita y se vuelve a aplicar al final
+        self._clear_highlight()
         self._transform = None
 
-        if not self.graph.names:
-            return
+        n_nodes = len(self.graph.names)
+        n_edges = len(self.graph.edges)
+        self._resize_node_slots(n_nodes)
+        self._resize_edge_slots(n_edges)
 
         xs = [c.x for c in self.graph.coords if c is not None]
         ys = [c.y for c in self.graph.coords if c is not None]
         if not xs or not ys:
+            self._drop_all_items()
             return
 
         min_x, max_x = min(xs), max(xs)
         min_y, max_y = min(ys), max(ys)
 
-        width = self.canvas.winfo_width() or 800
-        height = self.canvas.winfo_height() or 500
-
         self._transform = Transform(min_x, max_x, min_y, max_y, width, height)
-        tf = self._transform.world_to_screen
-
-        for idx, e in enumerate(self.graph.edges):
-            f = e.src
-            t = e.dst
-            if not (0 <= f < len(self.graph.coords) and 0 <= t < len(self.graph.coords)):
-                continue
-            cf = self.graph.coords[f]
-            ct = self.graph.coords[t]
-            if cf is None or ct is None:
+        screen = self._project_nodes(self._transform)
+
+        min_label_len_sq = self._min_label_len_sq
+
+        edges = self.graph.edges
+        line_ids = self._edge_line_ids
+        weight_ids = self._edge_weight_ids
+        drawn_at = self._edge_drawn_at
+        drawn = [False] * n_edges
+        created_edges = False
+        for idx, x1, y1, x2, y2, length_sq in self._visible_edges(screen):
+            drawn[idx] = True
+            seg = (x1, y1, x2, y2)
+            moved = drawn_at[idx] != seg
+            line_id = line_ids[idx]
+            if line_id is None:
+                e = edges[idx]
+                line_ids[idx] = self.canvas.create_line(
+                    *seg,
+                    arrow=tk.LAST,
+                    tags=("edge_line", f"ei:{idx}", f"from:{e.src}", f"to:{e.dst}"),
+                    **self._EDGE_DEFAULT,
+                )
+                created_edges = True
+            elif moved:
+                self.canvas.coords(line_id, *seg)
+
+            weight_id = weight_ids[idx]
+            # Un bucle (src == dst) mide 0 px, pero su peso solo se ve en la etiqueta
+            if length_sq >= min_label_len_sq or edges[idx].src == edges[idx].dst:
+                mx, my = (x1 + x2) / 2, (y1 + y2) / 2
+                if weight_id is None:
+                    weight_ids[idx] = self.canvas.create_text(
+                        mx,
+                        my - 8,
+                        text=str(edges[idx].weight),
+                        fill="#e5e7eb",
+                        font=self.font_small_bold,
+                        tags=("edge_weight",),
+                    )
+                    created_edges = True
+                elif moved:
+                    self.canvas.coords(weight_id, mx, my - 8)
+            elif weight_id is not None:
+                self.canvas.delete(weight_id)
+                weight_ids[idx] = None
+            drawn_at[idx] = seg
+
+        for idx in range(n_edges):
+            if not drawn[idx] and line_ids[idx] is not None:
+                self._drop_edge_items(idx)
+
+        if created_edges:
+            # Las aristas nuevas quedan bajo los nodos y sobre la rejilla
+            self.canvas.tag_lower("edge_weight")
+            self.canvas.tag_lower("edge_line")
+            self.canvas.tag_lower("grid")
+
+        for i in range(n_nodes):
+            p = screen[i] if i < len(screen) else None
+            if p is None:
+                if self._node_oval_ids[i] is not None:
+                    self._drop_node_items(i)
                 continue
+            x, y = p
+
+            old = self._node_drawn_at[i]
+            if self._node_oval_ids[i] is None:
+                self._draw_single_node(i, x, y)
+            elif old != p:
+                self.canvas.move(f"node{i}", x - old[0], y - old[1])
+                self._node_drawn_at[i] = p
+
+        self._hit_grid = None
+        self._apply_highlight()
+
+    # ---------- Elementos del lienzo ---------- #
+
+    def _resize_node_slots(self, n: int) -> None:
+        for i in range(n, len(self._node_oval_ids)):
+            self._drop_node_items(i)
+        for slots in (
+            self._node_oval_ids,
+            self._node_index_ids,
+            self._node_label_ids,
+            self._node_drawn_at,
+        ):
+            del slots[n:]
+            slots.extend([None] * (n - len(slots)))
+
+    def _resize_edge_slots(self, n: int) -> None:
+        for ei in range(n, len(self._edge_line_ids)):
+            self._drop_edge_items(ei)
+        for slots in (self._edge_line_ids, self._edge_weight_ids, self._edge_drawn_at):
+            del slots[n:]
+            slots.extend([None] * (n - len(slots)))
+
+    def _drop_node_items(self, i: int) -> None:
+        """Borra los elementos del nodo ``i``; se recrean en el próximo redibujado."""
+        if i >= len(self._node_oval_ids):
+            return
+        self.canvas.delete(f"node{i}")
+        for item_id in (self._node_oval_ids[i], self._node_index_ids[i], self._node_label_ids[i]):
+            if item_id is not None:
+                self._item_to_node.pop(item_id, None)
+        self._node_oval_ids[i] = None
+        self._node_index_ids[i] = None
+        self._node_label_ids[i] = None
+        self._node_drawn_at[i] = None
+        self._hit_grid = None
+        self._hl_cache.pop(i, None)
+        if self._hover_label_node == i:
+            self._hover_label_node = None
+
+    def _drop_edge_items(self, ei: int) -> None:
+        """Borra la línea y el peso de la arista ``ei``."""
+        if ei >= len(self._edge_line_ids):
+            return
+        ids = [i for i in (self._edge_line_ids[ei], self._edge_weight_ids[ei]) if i is not None]
+        if ids:
+            self.canvas.delete(*ids)
+        self._edge_line_ids[ei] = None
+        self._edge_weight_ids[ei] = None
+        self._edge_drawn_at[ei] = None
+
+    def _drop_all_edge_items(self) -> None:
+        self.canvas.delete("edge_line", "edge_weight")
+        self._edge_line_ids = []
+        self._edge_weight_ids = []
+        self._edge_drawn_at = []
+
+    def _drop_all_items(self) -> None:
+        """Borra todo salvo la rejilla (p. ej. tras renumerar los nodos)."""
+        self._drop_all_edge_items()
+        self.canvas.delete("node_hit", "node_label")
+        self._node_oval_ids = []
+        self._node_index_ids = []
+        self._node_label_ids = []
+        self._node_drawn_at = []
+        self._hit_grid = None
+        self._hl_cache.clear()
+        self._item_to_node.clear()
+        self._hover_label_node = None
+
+    def _draw_single_node(self, i: int, x: float, y: float) -> None:
+        """Crea óvalo, índice y etiqueta del nodo ``i`` centrado en (x, y)."""
+        r = NODE_RADIUS
+        # Etiqueta común para mover óvalo y textos con una sola llamada
+        node_tag = f"node{i}"
+        oval_id = self.canvas.create_oval(
+            x - r,
+            y - r,
+            x + r,
+            y + r,
+            tags=(node_tag, "node_hit"),
+            **self._NODE_DEFAULT,
+        )
+        index_id = self.canvas.create_text(
+            x,
+            y,
+            text=f"{i}",
+            fill="#0f172a",
+            font=self.font_small_bold,
+            tags=(node_tag, "node_hit"),
+        )
+        label_id: Optional[int] = None
+        if len(self.graph.names) < LAZY_LABELS_MIN:
+            label_id = self._create_node_label(i, x, y)
+
+        if i >= len(self._node_oval_ids):
+            self._resize_node_slots(i + 1)
+        self._node_oval_ids[i] = oval_id
+        self._node_index_ids[i] = index_id
+        self._node_label_ids[i] = label_id
+        self._node_drawn_at[i] = (x, y)
+        self._hit_grid = None
+        self._hl_cache.pop(i, None)
+        self._item_to_node[oval_id] = i
+        self._item_to_node[index_id] = i
+
+    def _create_node_label(self, i: int, x: float, y: float) -> int:
+        coord = self.graph.coords[i]
+        label_text = (coord.label if coord is not None else None) or self.graph.names[i]
+        label_id = self.canvas.create_text(
+            x,
+            y + NODE_RADIUS + 12,
+            text=label_text,
+            fill="#e5e7eb",
+            font=self.font_small,
+            tags=(f"node{i}", "node_label"),
+        )
+        self._item_to_node[label_id] = i
+        return label_id
 
-            x1, y1 = tf(cf.x, cf.y)
-            x2, y2 = tf(ct.x, ct.y)
-            line_id = self.canvas.create_line(
-                x1, y1, x2, y2, fill="#64748b", width=2, arrow=tk.LAST, tags=("edge_line",)
+    def _on_node_enter(self, event: tk.Event) -> None:
+        """En grafos grandes crea la etiqueta del nodo bajo el ratón."""
+        item = self.canvas.find_withtag("current")
+        if not item:
+            return
+        idx = self._item_to_node.get(item[0])
+        if idx is None or self._node_label_ids[idx] is not None:
+            return
+        cx, cy = self._get_node_center(idx)
+        if cx is None:
+            return
+        self._node_label_ids[idx] = self._create_node_label(idx, cx, cy)
+        self._hover_label_node = idx
+
+    def _on_node_leave(self, event: tk.Event) -> None:
+        idx = self._hover_label_node
+        if idx is None or self._drag_node_index == idx:
+            return
+        self._hover_label_node = None
+        label_id = self._node_label_ids[idx] if idx < len(self._node_label_ids) else None
+        if label_id is not None:
+            self.canvas.delete(label_id)
+            self._item_to_node.pop(label_id, None)
+            self._node_label_ids[idx] = None
+
+    def _draw_added_node(self, i: int) -> None:
+        """Dibuja un nodo recién añadido sin rehacer el lienzo si es posible.
+
+        Si el nodo cae fuera de los límites actuales la transformación cambia
+        y hay que redibujarlo todo.
+        """
+        coord = self.graph.coords[i]
+        if self._redraw_pending or not self._visible:
+            # Ya hay (o habrá al mostrarse) un redibujado completo
+            self._schedule_redraw()
+            return
+        tf = self._transform
+        if tf is None or coord is None or not tf.covers(coord.x, coord.y):
+            self._schedule_redraw()
+            return
+        x, y = tf.world_to_screen(coord.x, coord.y)
+        if self._screen_cache_tf == tf and len(self._screen_cache) == i:
+            self._screen_cache.append((x, y))
+        self._draw_single_node(i, x, y)
+
+    def _project_nodes(self, transform: Transform) -> List[Optional[Tuple[float, float]]]:
+        """Posición en pantalla de cada nodo (None si no tiene coordenadas).
+
+        Si la transformación no ha cambiado desde la última vez se reutilizan
+        las posiciones guardadas y solo se proyectan los nodos nuevos o los
+        marcados con ``_invalidate_screen_cache``.
+        """
+        coords = self.graph.coords
+        cache = self._screen_cache
+        if transform == self._screen_cache_tf and len(cache) <= len(coords):
+            tf = transform.world_to_screen
+            for i in self._screen_stale:
+                if i < len(cache):
+                    c = coords[i]
+                    cache[i] = tf(c.x, c.y) if c is not None else None
+            for c in coords[len(cache):]:
+                cache.append(tf(c.x, c.y) if c is not None else None)
+            self._screen_stale.clear()
+            return cache
+
+        if not HAS_NUMPY or len(coords) < BATCH_PROJECTION_MIN:
+            tf = transform.world_to_screen
+            screen = [tf(c.x, c.y) if c is not None else None for c in coords]
+        else:
+            n = len(coords)
+            xs = np.fromiter(
+                (c.x if c is not None else 0.0 for c in coords), dtype=np.float64, count=n
             )
-            mx, my = (x1 + x2) / 2, (y1 + y2) / 2
-            weight_text = str(e.weight)
-            weight_id = self.canvas.create_text(
-                mx,
-                my - 8,
-                text=weight_text,
-                fill="#e5e7eb",
-                font=self.font_small_bold,
+            ys = np.fromiter(
+                (c.y if c is not None else 0.0 for c in coords), dtype=np.float64, count=n
             )
-            self.edge_items.append(
-                {"line": line_id, "weight": weight_id, "from": f, "to": t}
+            sx, sy = transform.world_to_screen_many(xs, ys)
+            screen = [
+                (px, py) if c is not None else None
+                for c, px, py in zip(coords, sx.tolist(), sy.tolist())
+            ]
+
+        self._screen_cache = screen
+        self._screen_cache_tf = transform
+        self._screen_stale.clear()
+        return screen
+
+    def _visible_edges(
+        self, screen: List[Optional[Tuple[float, float]]]
+    ) -> Iterator[Tuple[int, float, float, float, float, float]]:
+        """Aristas que merece la pena dibujar: (índice, x1, y1, x2, y2, longitud²).
+
+        Se descartan las que tienen algún extremo sin coordenadas y las de
+        menos de un píxel (salvo los bucles src == dst, que miden 0 px pero
+        llevan su peso).
+        """
+        edges = self.graph.edges
+        n = len(screen)
+
+        if HAS_NUMPY and len(edges) >= BATCH_PROJECTION_MIN:
+            nan = float("nan")
+            pts = np.array(
+                [p if p is not None else (nan, nan) for p in screen], dtype=np.float64
+            ).reshape(-1, 2)
+            src = np.fromiter((e.src for e in edges), dtype=np.int64, count=len(edges))
+            dst = np.fromiter((e.dst for e in edges), dtype=np.int64, count=len(edges))
+            in_range = (src >= 0) & (src < n) & (dst >= 0) & (dst < n)
+            ei = np.nonzero(in_range)[0]
+            x1, y1 = pts[src[ei], 0], pts[src[ei], 1]
+            x2, y2 = pts[dst[ei], 0], pts[dst[ei], 1]
+            dx, dy = x2 - x1, y2 - y1
+            length_sq = dx * dx + dy * dy
+            # Las comparaciones con NaN son falsas: descartan nodos sin coordenadas
+            keep = (length_sq >= 1.0) | ((src[ei] == dst[ei]) & ~np.isnan(length_sq))
+            yield from zip(
+                ei[keep].tolist(),
+                x1[keep].tolist(),
+                y1[keep].tolist(),
+                x2[keep].tolist(),
+                y2[keep].tolist(),
+                length_sq[keep].tolist(),
             )
-            self._line_to_edge_index[line_id] = idx
+            return
 
-        r = 18
-        for i, name in enumerate(self.graph.names):
-            coord = self.graph.coords[i] if i < len(self.graph.coords) else None
-            if coord is None:
+        for idx, e in enumerate(edges):
+            f = e.src
+            t = e.dst
+            if not (0 <= f < n and 0 <= t < n):
+                continue
+            pf = screen[f]
+            pt = screen[t]
+            if pf is None or pt is None:
                 continue
-            x, y = tf(coord.x, coord.y)
-            oval_id = self.canvas.create_oval(
-                x - r,
-                y - r,
-                x + r,
-                y + r,
-                fill="#38bdf8",
-                outline="#0f172a",
-                width=2,
-            )
-            index_id = self.canvas.create_text(
-                x,
-                y,
-                text=f"{i}",
-                fill="#0f172a",
-                font=self.font_small_bold,
-            )
-            label_text = coord.label or name
-            label_id = self.canvas.create_text(
-                x,
-                y + r + 12,
-                text=label_text,
-                fill="#e5e7eb",
-                font=self.font_small,
-            )
 
-            self.node_items[i] = {"oval": oval_id, "index": index_id, "label": label_id}
-            self._item_to_node[oval_id] = i
-            self._item_to_node[index_id] = i
-            self._item_to_node[label_id] = i
+            x1, y1 = pf
+            x2, y2 = pt
+            dx, dy = x2 - x1, y2 - y1
+            length_sq = dx * dx + dy * dy
+            if length_sq < 1.0 and f != t:
+                # Arista de menos de un píxel: no aporta nada visualmente
+                continue
+            yield idx, x1, y1, x2, y2, length_sq
 
-        self._apply_highlight()
+    def _invalidate_screen_cache(self, idx: Optional[int] = None) -> None:
+        """Marca como obsoleta la posición de ``idx`` (o de todos si es None)."""
+        if idx is None:
+            self._screen_cache_tf = None
+        else:
+            self._screen_stale.add(idx)
 
     def _draw_background_grid(self) -> None:
         """Dibuja una rejilla sutil en el lienzo para dar contexto visual moderno."""
@@ -576,38 +1160,45 @@ class GraphEditorApp(tk.Tk):
         # Líneas verticales
         for x in range(0, width, spacing):
             color = major_color if x % (spacing * 5) == 0 else minor_color
-            self.canvas.create_line(x, 0, x, height, fill=color, width=1)
+            self.canvas.create_line(x, 0, x, height, fill=color, width=1, tags=("grid",))
 
         # Líneas horizontales
         for y in range(0, height, spacing):
             color = major_color if y % (spacing * 5) == 0 else minor_color
-            self.canvas.create_line(0, y, width, y, fill=color, width=1)
+            self.canvas.create_line(0, y, width, y, fill=color, width=1, tags=("grid",))
+
+    def _node_oval(self, idx: int) -> Optional[int]:
+        if 0 <= idx < len(self._node_oval_ids):
+            return self._node_oval_ids[idx]
+        return None
 
     def _get_node_center(self, idx: int) -> Tuple[Optional[float], Optional[float]]:
-        node = self.node_items.get(idx)
-        if not node:
-            return None, None
-        x1, y1, x2, y2 = self.canvas.coords(node["oval"])
-        return (x1 + x2) / 2, (y1 + y2) / 2
+        if 0 <= idx < len(self._node_drawn_at):
+            pos = self._node_drawn_at[idx]
+            if pos is not None:
+                return pos
+        return None, None
 
     def _update_edges_for_node(self, idx: int) -> None:
         cx, cy = self._get_node_center(idx)
         if cx is None:
             return
-        for edge in self.edge_items:
-            f = edge["from"]
-            t = edge["to"]
-            if not (0 <= f < len(self.graph.coords) and 0 <= t < len(self.graph.coords)):
+        line_ids = self._edge_line_ids
+        for ei in self.graph.incident_edges(idx):
+            line_id = line_ids[ei] if ei < len(line_ids) else None
+            if line_id is None:
                 continue
-            cfx, cfy = self._get_node_center(f)
-            ctx, cty = self._get_node_center(t)
+            e = self.graph.edges[ei]
+            cfx, cfy = self._get_node_center(e.src)
+            ctx, cty = self._get_node_center(e.dst)
             if cfx is None or ctx is None:
                 continue
-            line_id = edge["line"]
-            weight_id = edge["weight"]
+            weight_id = self._edge_weight_ids[ei]
             self.canvas.coords(line_id, cfx, cfy, ctx, cty)
-            mx, my = (cfx + ctx) / 2, (cfy + cty) / 2
-            self.canvas.coords(weight_id, mx, my - 8)
+            self._edge_drawn_at[ei] = (cfx, cfy, ctx, cty)
+            if weight_id is not None:
+                mx, my = (cfx + ctx) / 2, (cfy + cty) / 2
+                self.canvas.coords(weight_id, mx, my - 8)
 
     # ---------- Eventos de lista ---------- #
 
@@ -666,8 +1257,8 @@ class GraphEditorApp(tk.Tk):
 
         self.graph.names.append(name)
         self.graph.coords.append(NodeCoord(x=x, y=y, theta=theta, label=name))
-        self._refresh_lists()
-        self._redraw_canvas()
+        self._list_node_added(len(self.graph.names) - 1)
+        self._draw_added_node(len(self.graph.names) - 1)
 
     def _update_node(self) -> None:
         idx = self._get_selected_node_index()
@@ -684,12 +1275,14 @@ class GraphEditorApp(tk.Tk):
             messagebox.showerror("Error", "x, y y θ deben ser números.")
             return
 
+        name_changed = name != self.graph.names[idx]
         self.graph.names[idx] = name
 
         if idx >= len(self.graph.coords):
             self.graph.coords.extend([None] * (idx - len(self.graph.coords) + 1))
 
         coord = self.graph.coords[idx]
+        moved = coord is None or (coord.x, coord.y) != (x, y)
         if coord is None:
             coord = NodeCoord(x=x, y=y, theta=theta, label=name)
             self.graph.coords[idx] = coord
@@ -699,8 +1292,18 @@ class GraphEditorApp(tk.Tk):
             coord.theta = theta
             coord.label = name
 
-        self._refresh_lists()
-        self._redraw_canvas()
+        self._list_node_updated(idx, name_changed=name_changed)
+        if not moved:
+            # Solo cambian nombre u orientación: basta con el texto de la etiqueta
+            label_id = self._node_label_ids[idx] if idx < len(self._node_label_ids) else None
+            if label_id is not None:
+                self.canvas.itemconfig(label_id, text=name)
+            return
+
+        self._invalidate_screen_cache(idx)
+        # La posición puede cambiar los límites: el nodo se recrea al redibujar
+        self._drop_node_items(idx)
+        self._schedule_redraw()
 
     def _delete_node(self, event: Optional[tk.Event] = None) -> None:
         idx = self._get_selected_node_index()
@@ -714,27 +1317,15 @@ class GraphEditorApp(tk.Tk):
         ):
             return
 
-        self.graph.names.pop(idx)
-        if idx < len(self.graph.coords):
-            self.graph.coords.pop(idx)
-
-        nuevas_aristas: List[Edge] = []
-        for e in self.graph.edges:
-            f = e.src
-            t = e.dst
-            if f == idx or t == idx:
-                continue
-            if f > idx:
-                f -= 1
-            if t > idx:
-                t -= 1
-            nuevas_aristas.append(Edge(src=f, dst=t, weight=e.weight))
-
-        self.graph.edges = nuevas_aristas
+        self.graph.delete_node(idx)
+        # Todos los nodos posteriores se renumeran
+        self._node_desc_cache.clear()
+        self._invalidate_screen_cache()
+        self._drop_all_items()
 
         self._selected_node_index = None
         self._refresh_lists()
-        self._redraw_canvas()
+        self._schedule_redraw()
 
     # ---------- Aristas ---------- #
 
@@ -751,9 +1342,9 @@ class GraphEditorApp(tk.Tk):
             messagebox.showerror("Error", "Índices de nodo fuera de rango.")
             return
 
-        self.graph.edges.append(Edge(src=f, dst=t, weight=w))
-        self._refresh_lists()
-        self._redraw_canvas()
+        ei = self.graph.add_edge(Edge(src=f, dst=t, weight=w))
+        self._list_edge_added(ei)
+        self._schedule_redraw()
 
     def _update_edge(self) -> None:
         idx = self._get_selected_edge_index()
@@ -773,43 +1364,101 @@ class GraphEditorApp(tk.Tk):
             messagebox.showerror("Error", "Índices de nodo fuera de rango.")
             return
 
-        self.graph.edges[idx] = Edge(src=f, dst=t, weight=w)
-        self._refresh_lists()
-        self._redraw_canvas()
+        old = self.graph.edges[idx]
+        self.graph.update_edge(idx, Edge(src=f, dst=t, weight=w))
+        self._list_edge_updated(idx)
+        if (old.src, old.dst) == (f, t):
+            # Mismos extremos: solo cambia el texto del peso, si se dibuja
+            weight_id = self._edge_weight_ids[idx] if idx < len(self._edge_weight_ids) else None
+            if weight_id is not None:
+                self.canvas.itemconfig(weight_id, text=str(w))
+            return
+
+        self._drop_edge_items(idx)
+        self._schedule_redraw()
 
     def _delete_edge(self, event: Optional[tk.Event] = None) -> None:
         idx = self._get_selected_edge_index()
         if idx is None:
             messagebox.showwarning("Aviso", "Selecciona una arista para eliminar.")
             return
-        self.graph.edges.pop(idx)
-        self._refresh_lists()
-        self._redraw_canvas()
+        self.graph.delete_edge(idx)
+        # Los índices de las aristas posteriores cambian: solo se rehace esa lista
+        self._drop_all_edge_items()
+        self._refresh_edge_list()
+        self._schedule_redraw()
 
     # ---------- Guardado ---------- #
 
     def _save(self) -> None:
-        try:
-            self.graph.save()
+        if self._save_future is not None:
+            self.status_var.set("Ya hay un guardado en curso...")
+            return
+        # La copia se toma en el hilo de Tk; serializar y escribir va aparte
+        data = self.graph.to_dict()
+        self._save_future = self._io_pool.submit(Graph.write_json, data, GRAPH_FILE)
+        self.status_var.set("Guardando grafo...")
+        self.after(50, self._poll_save)
+
+    def _poll_save(self) -> None:
+        future = self._save_future
+        if future is None:
+            return
+        if not future.done():
+            self.after(50, self._poll_save)
+            return
+
+        self._save_future = None
+        e = future.exception()
+        if e is None:
             self.status_var.set(f"Grafo guardado en {GRAPH_FILE}")
             messagebox.showinfo("Guardado", f"Grafo guardado en {GRAPH_FILE}")
-        except Exception as e:
+        else:
             self.status_var.set("Error al guardar el grafo")
             messagebox.showerror("Error", f"No se pudo guardar el grafo:\n{e}")
 
+    def _on_close(self) -> None:
+        # No se cierra a mitad de una escritura
+        self._io_pool.shutdown(wait=True)
+        self.destroy()
+
     def _on_save_shortcut(self, event: tk.Event) -> str:
         self._save()
         return "break"
 
     # ---------- Canvas: interacción ---------- #
 
+    def _node_at(self, x: float, y: float) -> Optional[int]:
+        """Nodo cuyo óvalo contiene (x, y), buscando solo en las celdas vecinas."""
+        if self._hit_grid is None:
+            self._build_hit_grid()
+        cell = 2 * NODE_RADIUS
+        cx, cy = int(x // cell), int(y // cell)
+        best: Optional[int] = None
+        best_d2 = NODE_RADIUS * NODE_RADIUS
+        for gx in (cx - 1, cx, cx + 1):
+            for gy in (cy - 1, cy, cy + 1):
+                for i in self._hit_grid.get((gx, gy), ()):
+                    nx, ny = self._node_drawn_at[i]
+                    d2 = (nx - x) * (nx - x) + (ny - y) * (ny - y)
+                    if d2 <= best_d2:
+                        best, best_d2 = i, d2
+        return best
+
+    def _build_hit_grid(self) -> None:
+        cell = 2 * NODE_RADIUS
+        grid: Dict[Tuple[int, int], List[int]] = {}
+        for i, pos in enumerate(self._node_drawn_at):
+            if pos is not None:
+                grid.setdefault((int(pos[0] // cell), int(pos[1] // cell)), []).append(i)
+        self._hit_grid = grid
+
     def _on_canvas_press(self, event: tk.Event) -> None:
-        item = self.canvas.find_closest(event.x, event.y)
-        if not item:
-            self._drag_node_index = None
-            return
-        item_id = item[0]
-        idx = self._item_to_node.get(item_id)
+        idx = self._node_at(event.x, event.y)
+        if idx is None:
+            # Fuera de los óvalos aún se puede agarrar el nodo por su etiqueta
+            item = self.canvas.find_closest(event.x, event.y)
+            idx = self._item_to_node.get(item[0]) if item else None
         if idx is None:
             self._drag_node_index = None
             return
@@ -822,6 +1471,8 @@ class GraphEditorApp(tk.Tk):
 
         self._drag_offset = (event.x - cx, event.y - cy)
 
+        if self.list_nodes.curselection() == (idx,):
+            return
         self.list_nodes.selection_clear(0, tk.END)
         self.list_nodes.selection_set(idx)
         self.list_nodes.see(idx)
@@ -832,8 +1483,7 @@ class GraphEditorApp(tk.Tk):
         if self._drag_node_index is None:
             return
         idx = self._drag_node_index
-        node = self.node_items.get(idx)
-        if not node:
+        if self._node_oval(idx) is None:
             return
 
         cx, cy = self._get_node_center(idx)
@@ -845,9 +1495,9 @@ class GraphEditorApp(tk.Tk):
         dx = target_x - cx
         dy = target_y - cy
 
-        self.canvas.move(node["oval"], dx, dy)
-        self.canvas.move(node["index"], dx, dy)
-        self.canvas.move(node["label"], dx, dy)
+        self.canvas.move(f"node{idx}", dx, dy)
+        self._node_drawn_at[idx] = (target_x, target_y)
+        self._hit_grid = None
 
         self._update_edges_for_node(idx)
 
@@ -869,9 +1519,10 @@ class GraphEditorApp(tk.Tk):
             if coord is not None:
                 coord.x = x
                 coord.y = y
+                self._invalidate_screen_cache(idx)
 
-        self._refresh_lists()
-        self._redraw_canvas()
+        self._list_node_updated(idx)
+        self._schedule_redraw()
 
     def _on_canvas_right_click(self, event: tk.Event) -> None:
         if self._transform is not None:
@@ -882,16 +1533,20 @@ class GraphEditorApp(tk.Tk):
         name = f"Nodo {len(self.graph.names)}"
         self.graph.names.append(name)
         self.graph.coords.append(NodeCoord(x=x, y=y, theta=0.0, label=name))
-        self._refresh_lists()
-        self._redraw_canvas()
+        self._list_node_added(len(self.graph.names) - 1)
+        self._draw_added_node(len(self.graph.names) - 1)
 
     def _on_edge_click(self, event: tk.Event) -> None:
         item = self.canvas.find_withtag("current")
         if not item:
             return
-        line_id = item[0]
-        idx = self._line_to_edge_index.get(line_id)
-        if idx is None:
+        idx = None
+        for tag in self.canvas.gettags(item[0]):
+            if tag.startswith("ei:"):
+                idx = int(tag[3:])
+                break
+        if idx is None or self.list_edges.curselection() == (idx,):
+            # Ya seleccionada: nada que actualizar en la lista ni el formulario
             return
         self.list_edges.selection_clear(0, tk.END)
         self.list_edges.selection_set(idx)
@@ -901,27 +1556,37 @@ class GraphEditorApp(tk.Tk):
     # ---------- Resaltado ---------- #
 
     def _apply_highlight(self) -> None:
-        for idx, node in self.node_items.items():
-            self.canvas.itemconfig(
-                node["oval"], fill="#38bdf8", outline="#0f172a", width=2
-            )
-        for edge in self.edge_items:
-            self.canvas.itemconfig(edge["line"], fill="#64748b", width=2)
-
-        if self._selected_node_index is None:
-            return
-
+        """Repinta solo lo que cambia respecto al resaltado anterior."""
         sel = self._selected_node_index
-        node = self.node_items.get(sel)
-        if node:
-            self.canvas.itemconfig(
-                node["oval"], fill="#f97316", outline="#f97316", width=2
-            )
+        if sel == self._highlighted_node:
+            return
 
-        for edge in self.edge_items:
-            if edge["from"] == sel or edge["to"] == sel:
-                self.canvas.itemconfig(edge["line"], fill="#f97316", width=3)
+        self._clear_highlight()
+        self._highlighted_node = sel
+        if sel is None:
+            return
 
+        targets = self._hl_cache.get(sel)
+        if targets is None:
+            # Óvalo del nodo y expresión de Tk que selecciona sus aristas
+            # (las líneas llevan etiquetas from:/to: con sus extremos)
+            targets = (self._node_oval(sel), f"from:{sel}||to:{sel}")
+            self._hl_cache[sel] = targets
+        oval_id, edges_expr = targets
+        if oval_id is not None:
+            self.canvas.itemconfig(oval_id, **self._NODE_HL)
+        self.canvas.itemconfig(edges_expr, **self._EDGE_HL)
+        self._highlighted_targets = targets
+
+    def _clear_highlight(self) -> None:
+        self._highlighted_node = None
+        if self._highlighted_targets is None:
+            return
+        oval_id, edges_expr = self._highlighted_targets
+        if oval_id is not None:
+            self.canvas.itemconfig(oval_id, **self._NODE_DEFAULT)
+        self.canvas.itemconfig(edges_expr, **self._EDGE_DEFAULT)
+        self._highlighted_targets = None
 
 if __name__ == "__main__":
     app = GraphEditorApp()
@@ -99,11 +99,20 @@ Parámetros:
     - k_ang: Ganancia angular para corrección de orientación (0.6 default)
     - potential_type: Tipo de función ['linear', 'quadratic', 'conic', 'exponential']
 
-Variables globales:
-    - _last_v_linear: Velocidad lineal de la iteración anterior para rampa de aceleración
+Estado entre iteraciones:
+    - ControlState.last_v_linear: Velocidad lineal de la iteración anterior para
+      la rampa de aceleración (instancia por defecto del módulo si no se pasa una)
 """
 import math
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import NamedTuple
+
+import numpy as np
+
 from . import config
+from .potential_fields_numba import (HAS_NUMBA, _attractive_core, _attractive_magnitude,
+                                     _combined_command_core, _repulsive_core)
 
 # ============ CONSTANTES Y VARIABLES GLOBALES ============
 
@@ -112,15 +121,213 @@ from . import config
 # específicas de comportamiento
 POTENTIAL_TYPES = ['linear', 'quadratic', 'conic', 'exponential']
 
-# Variable global para mantener la velocidad lineal de la iteración anterior
-# Esta variable es esencial para implementar la rampa de aceleración que previene
-# cambios bruscos de velocidad que podrían causar deslizamiento o pérdida de control
-_last_v_linear = 0.0
+# Identificador entero de cada tipo (posición en POTENTIAL_TYPES), resuelto una
+# sola vez para que los núcleos compilados no comparen cadenas
+_PTYPE_ID = {name: i for i, name in enumerate(POTENTIAL_TYPES)}
+
+
+class _Consts(NamedTuple):
+    """Copia de los parámetros de config que usa el control en cada iteración."""
+    TOL_DIST_CM: float
+    V_MAX_CM_S: float
+    DECEL_ZONE_CM: float
+    V_APPROACH_MIN_CM_S: float
+    V_START_MIN_CM_S: float
+    K_ANGULAR: float
+    # Derivadas: incremento máximo de velocidad por iteración (rampa), mitad de
+    # la distancia entre ruedas y límite de velocidad angular en rad/s
+    MAX_DELTA_V: float
+    HALF_BASE_CM: float
+    OMEGA_MAX_RAD_S: float
+    # Ganancia lineal por defecto de cada tipo, indexada por _PTYPE_ID
+    K_LIN_BY_ID: tuple
+    # Parámetros del potencial repulsivo y del modelo de distancia IR
+    K_REPULSIVE: float
+    D_INFLUENCE: float
+    D_SAFE: float
+    ROBOT_RADIUS_CM: float
+    IR_THRESHOLD_DETECT: float
+    GAP_REPULSION_REDUCTION_FACTOR: float
+    IR_MIN_DISTANCE_CM: float
+    IR_MAX_DISTANCE_CM: float
+    # Derivadas: inverso de D_SAFE (término 1/d_safe del modelo repulsivo) e
+    # inverso del rango DETECT-EMERGENCY (escala de libertad de cada sensor)
+    INV_D_SAFE: float
+    INV_IR_RANGE: float
+
+
+def _read_consts():
+    half_base = config.WHEEL_BASE_CM / 2.0
+    return _Consts(
+        TOL_DIST_CM=config.TOL_DIST_CM,
+        V_MAX_CM_S=config.V_MAX_CM_S,
+        DECEL_ZONE_CM=config.DECEL_ZONE_CM,
+        V_APPROACH_MIN_CM_S=config.V_APPROACH_MIN_CM_S,
+        V_START_MIN_CM_S=config.V_START_MIN_CM_S,
+        K_ANGULAR=config.K_ANGULAR,
+        MAX_DELTA_V=config.ACCEL_RAMP_CM_S2 * config.CONTROL_DT,
+        HALF_BASE_CM=half_base,
+        OMEGA_MAX_RAD_S=config.W_MAX_CM_S / half_base,
+        K_LIN_BY_ID=(config.K_LINEAR, config.K_QUADRATIC, config.K_CONIC, config.K_EXPONENTIAL),
+        # Como float aunque config los defina enteros (IR_THRESHOLD_DETECT = 30):
+        # _repulsive_core los recibe tal cual y un int compilaría otra versión
+        K_REPULSIVE=float(config.K_REPULSIVE),
+        D_INFLUENCE=float(config.D_INFLUENCE),
+        D_SAFE=float(config.D_SAFE),
+        ROBOT_RADIUS_CM=float(config.ROBOT_RADIUS_CM),
+        IR_THRESHOLD_DETECT=float(config.IR_THRESHOLD_DETECT),
+        GAP_REPULSION_REDUCTION_FACTOR=float(config.GAP_REPULSION_REDUCTION_FACTOR),
+        IR_MIN_DISTANCE_CM=config.IR_MIN_DISTANCE_CM,
+        IR_MAX_DISTANCE_CM=config.IR_MAX_DISTANCE_CM,
+        INV_D_SAFE=1.0 / config.D_SAFE,
+        INV_IR_RANGE=1.0 / (config.IR_THRESHOLD_EMERGENCY - config.IR_THRESHOLD_DETECT),
+    )
+
+
+# Las constantes se leen de config una sola vez al importar el módulo en lugar
+# de buscarlas atributo a atributo en cada iteración del control
+_C = _read_consts()
+
+# Tablas por sensor (índices 0-6) para convertir las 7 lecturas IR en bloque:
+# factor de sensibilidad calibrado y compensación por ángulo de montaje
+# (1.0 para los sensores sin calibrar o casi frontales)
+_NUM_IR_SENSORS = 7
+
+
+def _ir_angle_compensation(sensor_index):
+    if sensor_index not in config.IR_SENSOR_ANGLES:
+        return 1.0
+    sensor_angle_deg = abs(config.IR_SENSOR_ANGLES[sensor_index])
+    if sensor_angle_deg > 50:
+        return 1.15
+    if sensor_angle_deg > 30:
+        return 1.08
+    if sensor_angle_deg > 15:
+        return 1.03
+    return 1.0
+
+
+_SENS_FACTORS = np.array([config.IR_SENSOR_SENSITIVITY_FACTORS.get(i, 1.0)
+                          for i in range(_NUM_IR_SENSORS)])
+_IR_INDICES = np.arange(_NUM_IR_SENSORS)
+
+
+def _reload_sensor_angles():
+    """
+    Calcula las tablas que dependen de config.IR_SENSOR_ANGLES.
+    
+    Los ángulos de montaje son fijos, así que sus radianes y su seno/coseno se
+    calculan una vez al importar en lugar de en cada iteración del control.
+    refresh_consts() la vuelve a llamar si config cambia en tiempo de ejecución.
+    """
+    global _VALID_SENSOR_IDX, _ANGLE_COMP, _IR_ANGLES_DEG, _IR_ANGLES_RAD
+    global _IR_SIN, _IR_COS, _IR_DIR, _IR_HAS_ANGLE, _IR_COS_ARR, _IR_SIN_ARR
+    global _IR_ANGLES_DEG_ARR
+    
+    # Sensores con ángulo configurado (solo esos generan obstáculos y fuerzas)
+    # y compensación por ángulo de cada sensor para el modelo de distancia
+    _VALID_SENSOR_IDX = frozenset(config.IR_SENSOR_ANGLES)
+    _ANGLE_COMP = np.array([_ir_angle_compensation(i) for i in range(_NUM_IR_SENSORS)])
+    
+    # Ángulos de montaje y su seno/coseno. Los sensores sin ángulo configurado
+    # se consideran frontales (0°)
+    _IR_ANGLES_DEG = tuple(config.IR_SENSOR_ANGLES.get(i, 0) for i in range(_NUM_IR_SENSORS))
+    _IR_ANGLES_DEG_ARR = np.array(_IR_ANGLES_DEG, dtype=float)
+    _IR_ANGLES_RAD = tuple(math.radians(a) for a in _IR_ANGLES_DEG)
+    _IR_SIN = tuple(math.sin(r) for r in _IR_ANGLES_RAD)
+    _IR_COS = tuple(math.cos(r) for r in _IR_ANGLES_RAD)
+    
+    # Dirección de cada sensor como número complejo cos(α) + i·sin(α): rotarla al
+    # marco global es un único producto por cos(θ) + i·sin(θ) para los siete
+    # sensores. También se guarda qué sensores tienen ángulo configurado
+    _IR_COS_ARR = np.array(_IR_COS)
+    _IR_SIN_ARR = np.array(_IR_SIN)
+    _IR_DIR = _IR_COS_ARR + 1j * _IR_SIN_ARR
+    _IR_HAS_ANGLE = np.array([i in _VALID_SENSOR_IDX for i in range(_NUM_IR_SENSORS)])
+
+
+_reload_sensor_angles()
+
+# Info vacía (de solo lectura) que se devuelve cuando el llamador no la necesita
+_EMPTY_INFO = MappingProxyType({})
+
+# Resultado de ir_sensors_to_obstacles_soa cuando no hay obstáculos
+_EMPTY_OBSTACLES = (np.empty(0), np.empty(0), np.empty(0))
+
+# Sensores frontales y frente-laterales (1-5) que limitan la velocidad máxima
+_FRONT_SENSORS = slice(1, 6)
+
+
+class AttractiveInfo(NamedTuple):
+    """
+    Información de logging de attractive_wheel_speeds.
+    
+    Una tupla con nombre es más barata de crear que un diccionario en cada
+    iteración; get() mantiene la interfaz que usan los loggers (info.get(...)).
+    """
+    potential_type: str
+    v_linear: float
+    omega: float
+    angle_error_deg: float
+    angle_factor: float
+    
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self._fields else default
+
+
+class PoseCache(NamedTuple):
+    """
+    Pose del robot con el seno/coseno de su orientación ya calculados.
+    
+    Se construye una vez por iteración del bucle de control y se comparte entre
+    las funciones que transforman direcciones de sensor al marco global: cada
+    rotación se reduce a dos multiplicaciones con las tablas _IR_SIN/_IR_COS
+    (identidades del ángulo suma) en vez de un nuevo par sin/cos. Los tres
+    primeros campos coinciden con la tupla q = (x, y, theta_deg), por lo que
+    q[0], q[1] y q[2] siguen funcionando igual.
+    """
+    x: float
+    y: float
+    theta_deg: float
+    th_rad: float
+    cth: float
+    sth: float
+    
+    @classmethod
+    def from_tuple(cls, q):
+        """Crea la caché a partir de una tupla (x, y, theta_deg) (o la devuelve tal cual)."""
+        if isinstance(q, cls):
+            return q
+        th_rad = math.radians(q[2])
+        return cls(q[0], q[1], q[2], th_rad, math.cos(th_rad), math.sin(th_rad))
+
+
+@dataclass
+class ControlState:
+    """
+    Estado del control que se conserva entre iteraciones.
+    
+    La velocidad lineal de la iteración anterior es esencial para implementar la
+    rampa de aceleración que previene cambios bruscos de velocidad que podrían
+    causar deslizamiento o pérdida de control. Cada robot (o simulación) puede
+    llevar su propio estado; si no se pasa ninguno, las funciones de control
+    usan la instancia por defecto del módulo.
+    """
+    last_v_linear: float = 0.0
+
+
+# Estado usado cuando el llamador no pasa el suyo (un único robot)
+_DEFAULT_STATE = ControlState()
+
+# Última detección de gaps: (lecturas IR usadas como clave, gaps en el marco
+# local). Entre iteraciones seguidas las lecturas suelen repetirse, y en ese caso
+# solo hay que volver a sumar la orientación actual del robot
+_gap_cache = (None, ())
 
 
 # ============ FUNCIONES AUXILIARES ============
 
-def reset_velocity_ramp():
+def reset_velocity_ramp(state=None):
     """
     Resetea la rampa de aceleración al inicio de una nueva navegación.
     
@@ -128,9 +335,29 @@ def reset_velocity_ramp():
     asegurar que la rampa de aceleración comience desde cero. Sin este reseteo,
     la velocidad inicial podría estar limitada por el valor de una navegación
     anterior, causando comportamientos inesperados.
+    
+    Args:
+        state: ControlState a resetear (el estado por defecto del módulo si es None)
+    """
+    global _gap_cache
+    if state is None:
+        state = _DEFAULT_STATE
+    state.last_v_linear = 0.0
+    _gap_cache = (None, ())
+
+
+def refresh_consts():
+    """
+    Vuelve a leer de config las constantes usadas por el control.
+    
+    Solo es necesario si se modifican valores de config en tiempo de ejecución
+    (por ejemplo, durante el ajuste de ganancias), ya que el módulo guarda una
+    copia al importarse.
     """
-    global _last_v_linear
-    _last_v_linear = 0.0
+    global _C, _gap_cache
+    _C = _read_consts()
+    _reload_sensor_angles()
+    _gap_cache = (None, ())
 
 
 def _wrap_pi(angle_rad):
@@ -148,14 +375,13 @@ def _wrap_pi(angle_rad):
     Returns:
         float: Ángulo normalizado en el rango (-π, π]
     """
-    while angle_rad > math.pi:
-        angle_rad -= 2.0 * math.pi
-    while angle_rad <= -math.pi:
-        angle_rad += 2.0 * math.pi
-    return angle_rad
+    # Una sola operación módulo en vez de bucles: tiempo constante y sin ramas.
+    # Se refleja el ángulo para que π se conserve y -π pase a π
+    return math.pi - (math.pi - angle_rad) % (2.0 * math.pi)
 
 
-def attractive_wheel_speeds(q, q_goal, k_lin=None, k_ang=None, potential_type='linear'):
+def attractive_wheel_speeds(q, q_goal, k_lin=None, k_ang=None, potential_type='linear',
+                            return_info=True, state=None):
     """
     Calcula velocidades de rueda usando campo de potencial atractivo.
     
@@ -177,248 +403,150 @@ def attractive_wheel_speeds(q, q_goal, k_lin=None, k_ang=None, potential_type='l
         k_lin: Ganancia lineal específica (usa la del tipo de potencial si es None)
         k_ang: Ganancia angular para corrección de orientación (usa config.K_ANGULAR si es None)
         potential_type: Tipo de función de potencial ['linear', 'quadratic', 'conic', 'exponential']
+        return_info: Si es False no se construye la información de logging y se
+            devuelve un mapeo vacío (útil en iteraciones que no se registran)
+        state: ControlState con la rampa de aceleración (el estado por defecto
+            del módulo si es None)
     
     Returns:
         tuple: Tupla con (v_left, v_right, distance, info) donde:
             - v_left: Velocidad de rueda izquierda en cm/s
             - v_right: Velocidad de rueda derecha en cm/s
             - distance: Distancia al objetivo en cm
-            - info: Diccionario con información adicional para logging
+            - info: AttractiveInfo con información adicional para logging
+              (admite info.get(clave) como un diccionario)
     """
-    # Seleccionar la ganancia lineal apropiada según el tipo de potencial
+    # Resolver el tipo de potencial a su identificador entero (los tipos no
+    # reconocidos se tratan como lineales) y seleccionar su ganancia lineal.
     # Cada función tiene características diferentes de escala, por lo que requieren
     # ganancias ajustadas independientemente para lograr comportamientos similares
+    c = _C
+    ptype_id = _PTYPE_ID.get(potential_type, 0)
     if k_lin is None:
-        if potential_type == 'linear':
-            k_lin = config.K_LINEAR
-        elif potential_type == 'quadratic':
-            k_lin = config.K_QUADRATIC
-        elif potential_type == 'conic':
-            k_lin = config.K_CONIC
-        elif potential_type == 'exponential':
-            k_lin = config.K_EXPONENTIAL
-        else:
-            k_lin = config.K_LINEAR
+        k_lin = c.K_LIN_BY_ID[ptype_id]
     
     if k_ang is None:
-        k_ang = config.K_ANGULAR
-    
-    # Calcular el vector de error de posición hacia el objetivo
-    # Este vector nos indica la dirección y distancia que debemos recorrer
-    dx = q_goal[0] - q[0]
-    dy = q_goal[1] - q[1]
-    distance = math.hypot(dx, dy)
-    
-    # Convertir la orientación actual del robot de grados a radianes
-    # para realizar cálculos trigonométricos
-    theta_rad = math.radians(q[2])
-    
-    # Calcular el ángulo deseado hacia la meta usando atan2 para obtener
-    # el ángulo en el rango correcto considerando todos los cuadrantes
-    desired_angle = math.atan2(dy, dx)
-    
-    # Calcular el error angular normalizado entre la dirección deseada y
-    # la orientación actual. Esta normalización es crucial para evitar
-    # giros innecesarios cuando el robot está cerca de la orientación correcta
-    angle_error = _wrap_pi(desired_angle - theta_rad)
-    
-    # ========== CALCULAR VELOCIDAD LINEAL SEGÚN FUNCIÓN DE POTENCIAL ==========
-    # Aplicamos la función de potencial seleccionada para determinar la velocidad
-    # lineal deseada. Cada función tiene características diferentes:
-    if potential_type == 'linear':
-        # Función lineal: F = k * d
-        # Proporcional directa a la distancia. Comportamiento predecible y constante
-        # Mantiene velocidad aproximadamente constante una vez alcanzada la máxima
-        v_linear = k_lin * distance
-        
-    elif potential_type == 'quadratic':
-        # Función cuadrática: F = k * d² / 10
-        # La fuerza crece con el cuadrado de la distancia, resultando en aceleración
-        # más agresiva cuando está lejos y desaceleración suave cuando se acerca
-        # El factor de normalización /10 ajusta la escala para evitar valores excesivos
-        v_linear = k_lin * (distance ** 2) / 10.0
-        
-    elif potential_type == 'conic':
-        # Función cónica con saturación: F = k * min(d, d_sat) * 2
-        # Saturación a 100 cm para mantener velocidad constante lejos
-        d_sat = 100.0
-        v_linear = k_lin * min(distance, d_sat) * 2.0
-        
-    elif potential_type == 'exponential':
-        # Función exponencial: F = k * (1 - e^(-d/λ)) * 20
-        # Presenta convergencia asintótica, acelerando rápidamente al inicio pero
-        # desacelerando de forma muy suave conforme se acerca al objetivo
-        # El factor *20 aumenta la velocidad para compensar la normalización 0-1
-        lambda_param = 50.0  # Parámetro de escala para la exponencial
-        v_linear = k_lin * (1.0 - math.exp(-distance / lambda_param)) * 20.0
-    else:
-        # Por defecto usar función lineal si el tipo no es reconocido
-        v_linear = k_lin * distance
+        k_ang = c.K_ANGULAR
+    
+    # El cálculo numérico (potencial, rampa, restricción de arco y saturación)
+    # vive en potential_fields_numba._attractive_core, compilado con Numba si
+    # está disponible. Aquí solo se resuelven los parámetros, se mantiene el
+    # estado de la rampa y se construye la información para logging
+    if state is None:
+        state = _DEFAULT_STATE
+    (v_left, v_right, distance, v_linear, omega, angle_error, angle_factor,
+     state.last_v_linear) = _attractive_core(
+        q[0], q[1], q[2], q_goal[0], q_goal[1],
+        k_lin, k_ang, ptype_id, state.last_v_linear,
+        c.TOL_DIST_CM, c.V_MAX_CM_S, c.DECEL_ZONE_CM,
+        c.V_APPROACH_MIN_CM_S, c.V_START_MIN_CM_S,
+        c.MAX_DELTA_V, c.OMEGA_MAX_RAD_S, c.HALF_BASE_CM,
+    )
+    
+    if not return_info:
+        return v_left, v_right, distance, _EMPTY_INFO
     
-    # ========== APLICAR LÍMITES Y SEGURIDAD ==========
-    
-    # Si estamos muy cerca de la meta, detener completamente
-    if distance < config.TOL_DIST_CM:
-        v_linear = 0.0
-    else:
-        # Saturar la velocidad calculada al máximo permitido
-        v_linear = min(config.V_MAX_CM_S, v_linear)
-        
-        # ========== ZONA DE DESACELERACIÓN PROGRESIVA ==========
-        # Cuando nos acercamos al objetivo, reducir velocidad gradualmente
-        # Esto da una llegada más suave y precisa
-        if distance < config.DECEL_ZONE_CM:
-            # Factor de desaceleración proporcional a la distancia restante
-            # A 80cm: factor=1.0 (velocidad completa)
-            # A 40cm: factor=0.5 (mitad de velocidad)
-            # A 10cm: factor=0.125 (muy lento)
-            decel_factor = distance / config.DECEL_ZONE_CM
-            
-            # Aplicar desaceleración pero mantener velocidad mínima de aproximación
-            v_linear_decel = v_linear * decel_factor
-            v_linear = max(v_linear_decel, config.V_APPROACH_MIN_CM_S)
-        
-        # ========== RAMPA DE ACELERACIÓN PROGRESIVA ==========
-        # Empezar lento y acelerar gradualmente
-        global _last_v_linear
-        max_delta_v = config.ACCEL_RAMP_CM_S2 * config.CONTROL_DT
-        
-        # Garantizar arranque suave desde velocidad mínima
-        if _last_v_linear < config.V_START_MIN_CM_S:
-            v_linear = max(v_linear, config.V_START_MIN_CM_S)
-        
-        # Limitar aceleración (subida), pero permitir desaceleración libre (bajada)
-        if v_linear > _last_v_linear:
-            # Acelerando: limitar el aumento máximo permitido
-            v_linear = min(v_linear, _last_v_linear + max_delta_v)
-        
-        # Guardar la velocidad actual para la próxima iteración de la rampa
-        _last_v_linear = v_linear
-    
-    # MODIFICADO: Control inteligente de velocidad angular con MOVIMIENTO EN ARCO
-    # El robot SIEMPRE avanza y corrige su orientación mediante velocidades diferenciales
-    # NUNCA gira sobre su propio eje
-    
-    # Calcular factor de reducción basado en el error angular
-    angle_factor = math.cos(angle_error)
-    
-    # CLAVE: Definir velocidad mínima según distancia a la meta
-    if distance > 50.0:
-        # Lejos de la meta: mantener velocidad mínima alta para arcos suaves
-        # Incluso si está apuntando en dirección contraria, debe avanzar
-        min_factor = 0.6  # Mínimo 60% de velocidad calculada
-    elif distance > 20.0:
-        # Distancia media: permitir más reducción pero mantener avance
-        min_factor = 0.4  # Mínimo 40% de velocidad
-    else:
-        # Cerca de la meta: permitir velocidades más bajas para convergencia precisa
-        min_factor = 0.2  # Mínimo 20% de velocidad
-    
-    # Aplicar el factor con el mínimo garantizado
-    if angle_factor < min_factor:
-        angle_factor = min_factor
-    
-    # Aplicar reducción (pero siempre manteniendo velocidad mínima)
-    v_linear *= angle_factor
-    
-    # GARANTÍA ADICIONAL: velocidad mínima absoluta cuando estamos lejos
-    if distance > 30.0 and v_linear < config.V_START_MIN_CM_S:
-        v_linear = config.V_START_MIN_CM_S
-    
-    # ========== CALCULAR VELOCIDAD ANGULAR ==========
-    # La velocidad angular es proporcional al error angular, permitiendo que
-    # el robot corrija su orientación más rápidamente cuando el error es mayor
-    
-    # MEJORA: Reducir ganancia angular para evitar zig-zag en navegación libre
-    # La ganancia K_ANGULAR=3.0 es muy agresiva y causa oscilaciones
-    # Reducimos a la mitad para trayectorias más suaves y rectas
-    # Esto solo afecta navegación sin obstáculos; con obstáculos la ganancia
-    # completa se mantendrá en la función combined_potential_speeds
-    k_ang_smooth = k_ang * 0.5  # Reducir de 3.0 a 1.5 para navegación suave
-    
-    omega = k_ang_smooth * angle_error
+    # Preparar información adicional para logging y análisis
+    # Esta información se registra en los archivos CSV para permitir análisis
+    # comparativo posterior entre diferentes funciones de potencial
+    info = AttractiveInfo(potential_type, v_linear, omega, math.degrees(angle_error),
+                          angle_factor)
     
-    # Convertir el límite de velocidad angular de cm/s a rad/s
-    # El límite está expresado como diferencia máxima entre ruedas, por lo que
-    # necesitamos dividir por la mitad de la distancia entre ruedas
-    omega_max_rad_s = config.W_MAX_CM_S / (config.WHEEL_BASE_CM / 2.0)
+    return v_left, v_right, distance, info
+
+
+def attractive_wheel_speeds_batch(q_arr, goal_arr, potential_type='linear', k_lin=None,
+                                  k_ang=None, last_v=None):
+    """
+    Versión vectorizada de attractive_wheel_speeds para N robots o simulaciones.
     
-    # Saturar la velocidad angular dentro del límite máximo permitido
-    omega = max(-omega_max_rad_s, min(omega_max_rad_s, omega))
+    Aplica exactamente el mismo control (potencial, desaceleración, rampa,
+    restricción de arco y saturación) sobre arrays NumPy, lo que permite barrer
+    parámetros o simular muchos agentes sin un bucle de Python. A diferencia
+    de la versión escalar, la rampa no usa el estado global: cada agente lleva
+    su propia velocidad anterior en last_v.
     
-    # ========== RESTRICCIÓN PARA NAVEGACIÓN EN ARCO ==========
-    # CLAVE: Limitar omega para que ambas ruedas siempre avancen (no giros sobre eje)
-    # Si omega es muy grande, una rueda iría hacia atrás, causando giro en lugar de arco
-    # Forzamos que la rueda más lenta siempre tenga velocidad >= MIN_WHEEL_SPEED
-    half_base = config.WHEEL_BASE_CM / 2.0
+    Args:
+        q_arr: Array (N, 3) con (x, y, theta_deg) de cada robot
+        goal_arr: Array (N, 2) con la meta de cada robot
+        potential_type: Tipo de función de potencial (común a todos)
+        k_lin: Ganancia lineal, escalar o array (N,) (la del tipo si es None)
+        k_ang: Ganancia angular, escalar o array (N,) (config.K_ANGULAR si es None)
+        last_v: Array (N,) con la velocidad lineal anterior de cada agente
+            (ceros si es None, como tras reset_velocity_ramp)
     
-    # Definir velocidad mínima de rueda según distancia al objetivo
-    if distance > 30.0:
-        # LEJOS: Mantener ambas ruedas con velocidad mínima significativa
-        min_wheel_speed = 4.0  # cm/s - garantiza arco suave
-    elif distance > 10.0:
-        # MEDIO: Permitir velocidades de rueda más bajas
-        min_wheel_speed = 2.0  # cm/s
+    Returns:
+        tuple: (v_left, v_right, distance, last_v) como arrays (N,); last_v es
+            el estado de la rampa que se debe pasar en la siguiente llamada
+    """
+    c = _C
+    ptype_id = _PTYPE_ID.get(potential_type, 0)
+    if k_lin is None:
+        k_lin = c.K_LIN_BY_ID[ptype_id]
+    if k_ang is None:
+        k_ang = c.K_ANGULAR
+    
+    q_arr = np.asarray(q_arr, dtype=float)
+    goal_arr = np.asarray(goal_arr, dtype=float)
+    dx = goal_arr[:, 0] - q_arr[:, 0]
+    dy = goal_arr[:, 1] - q_arr[:, 1]
+    distance = np.hypot(dx, dy)
+    if last_v is None:
+        last_v = np.zeros_like(distance)
     else:
-        # CERCA: Permitir casi detenerse para convergencia precisa
-        min_wheel_speed = 0.0  # cm/s
-    
-    # Aplicar restricción de arco siempre que no estemos en la meta
-    if distance > config.TOL_DIST_CM and v_linear > min_wheel_speed:
-        # Calcular el omega máximo que mantiene la rueda más lenta >= min_wheel_speed
-        # Queremos: v_linear - half_base * |omega| >= min_wheel_speed
-        # Por lo tanto: |omega| <= (v_linear - min_wheel_speed) / half_base
-        max_omega_for_arc = (v_linear - min_wheel_speed) / half_base
-        if abs(omega) > max_omega_for_arc:
-            # Reducir omega para mantener navegación en arco
-            omega = math.copysign(max_omega_for_arc, omega)
-    
-    # ========== CONVERSIÓN A VELOCIDADES INDIVIDUALES DE RUEDA ==========
-    # Convertimos la velocidad lineal y angular en velocidades individuales
-    # para cada rueda usando la cinemática diferencial del robot
-    # v_left = v_linear - (WHEEL_BASE/2) * omega
-    # v_right = v_linear + (WHEEL_BASE/2) * omega
-    v_left = v_linear - half_base * omega
-    v_right = v_linear + half_base * omega
-    
-    # CRÍTICO: GARANTIZAR NAVEGACIÓN EN ARCO (sin rotación sobre eje)
-    # Si alguna rueda tiene velocidad negativa (hacia atrás), el robot giraría
-    # sobre su eje en lugar de moverse en arco. Forzamos ambas ruedas >= 0
-    # SOLO cuando estamos lejos del objetivo (cuando estamos cerca, permitimos
-    # giros más cerrados para convergencia precisa)
-    if distance > config.TOL_DIST_CM * 2:  # Más de 10cm del objetivo
-        if v_left < 0 or v_right < 0:
-            # Una rueda iría hacia atrás - reducir omega para mantener arco
-            # Calcular el omega máximo que mantiene ambas ruedas >= 0
-            if v_linear > 0:
-                max_omega_positive = v_linear / half_base
-                # Limitar omega a este valor (con el signo apropiado)
-                if omega > max_omega_positive:
-                    omega = max_omega_positive * 0.95  # 95% para margen
-                elif omega < -max_omega_positive:
-                    omega = -max_omega_positive * 0.95
-                
-                # Recalcular velocidades de rueda
-                v_left = v_linear - half_base * omega
-                v_right = v_linear + half_base * omega
-    
-    # Saturación final de cada rueda individualmente para garantizar que
-    # nunca excedamos los límites físicos del robot
-    v_left = max(-config.V_MAX_CM_S, min(config.V_MAX_CM_S, v_left))
-    v_right = max(-config.V_MAX_CM_S, min(config.V_MAX_CM_S, v_right))
+        last_v = np.asarray(last_v, dtype=float)
     
-    # Preparar información adicional para logging y análisis
-    # Esta información se registra en los archivos CSV para permitir análisis
-    # comparativo posterior entre diferentes funciones de potencial
-    info = {
-        'potential_type': potential_type,
-        'v_linear': v_linear,
-        'omega': omega,
-        'angle_error_deg': math.degrees(angle_error),
-        'angle_factor': angle_factor
-    }
+    angle_error = np.arctan2(dy, dx) - np.radians(q_arr[:, 2])
+    angle_error = math.pi - (math.pi - angle_error) % (2.0 * math.pi)
     
-    return v_left, v_right, distance, info
+    # Velocidad lineal según la función de potencial
+    if ptype_id == 1:
+        v_linear = k_lin * (distance ** 2) / 10.0
+    elif ptype_id == 2:
+        v_linear = k_lin * np.minimum(distance, 100.0) * 2.0
+    elif ptype_id == 3:
+        v_linear = k_lin * (1.0 - np.exp(-distance / 50.0)) * 20.0
+    else:
+        v_linear = k_lin * distance
+    v_linear = np.broadcast_to(v_linear, distance.shape)
+    
+    # Límites, desaceleración y rampa (solo fuera de la tolerancia de llegada)
+    moving = distance >= c.TOL_DIST_CM
+    v_linear = np.where(moving, np.minimum(c.V_MAX_CM_S, v_linear), 0.0)
+    decel = moving & (distance < c.DECEL_ZONE_CM)
+    v_linear = np.where(decel, np.maximum(v_linear * (distance / c.DECEL_ZONE_CM),
+                                          c.V_APPROACH_MIN_CM_S), v_linear)
+    start = moving & (last_v < c.V_START_MIN_CM_S)
+    v_linear = np.where(start, np.maximum(v_linear, c.V_START_MIN_CM_S), v_linear)
+    accel = moving & (v_linear > last_v)
+    v_linear = np.where(accel, np.minimum(v_linear, last_v + c.MAX_DELTA_V), v_linear)
+    last_v = np.where(moving, v_linear, last_v)
+    
+    # Reducción por error angular con mínimo según la distancia
+    min_factor = np.array([0.2, 0.4, 0.6])[(distance > 20.0).astype(int) + (distance > 50.0)]
+    v_linear = v_linear * np.maximum(np.cos(angle_error), min_factor)
+    v_linear = np.where((distance > 30.0) & (v_linear < c.V_START_MIN_CM_S),
+                        c.V_START_MIN_CM_S, v_linear)
+    
+    # Velocidad angular saturada y restringida para navegar en arco
+    half_base = c.HALF_BASE_CM
+    omega = np.clip(k_ang * 0.5 * angle_error, -c.OMEGA_MAX_RAD_S, c.OMEGA_MAX_RAD_S)
+    min_wheel_speed = 2.0 * ((distance > 10.0).astype(float) + (distance > 30.0))
+    max_omega_for_arc = (v_linear - min_wheel_speed) / half_base
+    arc = (distance > c.TOL_DIST_CM) & (v_linear > min_wheel_speed)
+    omega = np.where(arc & (np.abs(omega) > max_omega_for_arc),
+                     np.copysign(max_omega_for_arc, omega), omega)
+    
+    # Ninguna rueda hacia atrás lejos de la meta, y saturación final
+    max_omega_positive = v_linear / half_base
+    no_reverse = (distance > c.TOL_DIST_CM * 2) & (v_linear > 0)
+    omega = np.where(no_reverse & (omega > max_omega_positive), max_omega_positive * 0.95, omega)
+    omega = np.where(no_reverse & (omega < -max_omega_positive), -max_omega_positive * 0.95, omega)
+    delta = half_base * omega
+    v_left = np.clip(v_linear - delta, -c.V_MAX_CM_S, c.V_MAX_CM_S)
+    v_right = np.clip(v_linear + delta, -c.V_MAX_CM_S, c.V_MAX_CM_S)
+    
+    return v_left, v_right, distance, last_v
 
 
 # ========== FUNCIONES DE POTENCIAL REPULSIVO (Para Parte 3.2) ==========
@@ -454,6 +582,22 @@ def normalize_ir_reading(ir_value, sensor_index):
     return ir_value / factor
 
 
+def normalize_ir_readings(ir_values):
+    """
+    Versión vectorizada de normalize_ir_reading para las 7 lecturas a la vez.
+    
+    Divide cada lectura por el factor de sensibilidad de su sensor (1.0 para
+    los sensores sin calibrar, que quedan igual).
+    
+    Args:
+        ir_values: Secuencia con los 7 valores crudos de los sensores IR
+    
+    Returns:
+        np.ndarray: Valores normalizados (1000 ≈ 5cm para todos los sensores)
+    """
+    return np.asarray(ir_values[:_NUM_IR_SENSORS], dtype=float) / _SENS_FACTORS
+
+
 def ir_value_to_distance(ir_value, sensor_index=None):
     """
     Convierte un valor de sensor IR (0-4095) a distancia estimada en centímetros.
@@ -506,21 +650,10 @@ def ir_value_to_distance(ir_value, sensor_index=None):
     if ir_normalized >= 1000:
         # Obstáculo muy cerca (≤5cm)
         distance = 5.0
-    elif ir_normalized >= 700:
-        # Muy cerca (5-7cm)
-        distance = 5.0 * math.pow(1000.0 / ir_normalized, 0.65)
-    elif ir_normalized >= 400:
-        # Cerca (7-10cm)
-        distance = 5.0 * math.pow(1000.0 / ir_normalized, 0.65)
-    elif ir_normalized >= 150:
-        # Medio (10-15cm)
-        distance = 5.0 * math.pow(1000.0 / ir_normalized, 0.65)
-    elif ir_normalized >= 60:
-        # Lejos (15-25cm)
-        distance = 5.0 * math.pow(1000.0 / ir_normalized, 0.65)
     else:
-        # Muy lejos (25-60cm)
-        distance = 5.0 * math.pow(1000.0 / ir_normalized, 0.70)
+        # Exponente 0.65 hasta ~25cm (IR_norm ≥ 60) y 0.70 más lejos (25-60cm)
+        exponent = 0.70 if ir_normalized < 60 else 0.65
+        distance = 5.0 * math.pow(1000.0 / ir_normalized, exponent)
     
     # Limitar al rango válido de medición del sensor
     distance = max(config.IR_MIN_DISTANCE_CM, min(distance, config.IR_MAX_DISTANCE_CM))
@@ -547,6 +680,131 @@ def ir_value_to_distance(ir_value, sensor_index=None):
     return distance
 
 
+def ir_values_to_distances(ir_values, sensor_indices=None):
+    """
+    Versión vectorizada de ir_value_to_distance para varias lecturas a la vez.
+    
+    Aplica el mismo modelo (normalización, exponente 0.65/0.70, saturación al
+    rango del sensor y compensación por ángulo) sobre un array NumPy en lugar
+    de llamar a la función escalar sensor a sensor.
+    
+    Args:
+        ir_values: Secuencia de valores IR (0-4095)
+        sensor_indices: Índice de sensor (0-6) de cada valor, o None para no
+            normalizar ni compensar (igual que ir_value_to_distance sin índice)
+    
+    Returns:
+        np.ndarray: Distancias estimadas en centímetros
+    """
+    ir = np.asarray(ir_values, dtype=float)
+    if sensor_indices is None:
+        ir_norm = ir
+        angle_comp = None
+    else:
+        idx = np.asarray(sensor_indices)
+        ir_norm = ir / _SENS_FACTORS[idx]
+        angle_comp = _ANGLE_COMP[idx]
+    
+    # d = 5 * (1000 / IR_norm)^e con e=0.70 en la zona lejana (IR_norm < 60)
+    exponent = np.where(ir_norm < 60, 0.70, 0.65)
+    distance = 5.0 * np.power(1000.0 / np.maximum(ir_norm, 25.0), exponent)
+    distance[ir_norm >= 1000] = 5.0
+    np.clip(distance, config.IR_MIN_DISTANCE_CM, config.IR_MAX_DISTANCE_CM, out=distance)
+    if angle_comp is not None:
+        distance *= angle_comp
+    
+    # Sin obstáculo significativo: distancia máxima, sin compensación
+    distance[ir_norm < 25] = config.IR_MAX_DISTANCE_CM
+    return distance
+
+
+def _precompute_ir_state(ir_sensors):
+    """
+    Análisis de las lecturas IR compartido por todo el control de una iteración.
+    
+    Args:
+        ir_sensors: Secuencia con las lecturas IR crudas (hasta 7)
+    
+    Returns:
+        tuple: (ir, distances, clearances) como arrays NumPy: lecturas crudas,
+            distancia estimada de cada sensor (con normalización y compensación
+            por ángulo) y clearance (distancia menos el radio del robot)
+    """
+    ir = np.asarray(ir_sensors[:_NUM_IR_SENSORS], dtype=float)
+    distances = ir_values_to_distances(ir, _IR_INDICES[:len(ir)])
+    return ir, distances, distances - _C.ROBOT_RADIUS_CM
+
+
+def _scan_local_gaps(ir_sensors):
+    """
+    Parte de detect_navigable_gaps que no depende de la pose del robot.
+    
+    Args:
+        ir_sensors: Tupla con las 7 lecturas IR
+    
+    Returns:
+        tuple: Tuplas (left_sensor, right_sensor, gap_angle_local, gap_width,
+            is_navigable, left_distance, right_distance) por cada gap
+    """
+    local_gaps = []
+    
+    # Máscaras de sensores bloqueados y no libres calculadas de una vez. Se usa
+    # float (no un entero corto) porque las lecturas pueden venir normalizadas
+    arr = np.asarray(ir_sensors[:7], dtype=float)
+    blocked = arr >= config.GAP_BLOCKED_THRESHOLD
+    not_clear = arr >= config.GAP_CLEAR_THRESHOLD
+    
+    # Un gap lo forman dos sensores bloqueados consecutivos (como mucho 3
+    # posiciones de distancia) cuyos sensores intermedios están todos libres;
+    # solo se recorren los índices bloqueados (normalmente 1-3)
+    blocked_idx = np.flatnonzero(blocked).tolist()
+    if len(blocked_idx) < 2:
+        return ()
+    
+    # Convertir todas las lecturas IR a distancias de una vez
+    distances = ir_values_to_distances(arr).tolist()
+    
+    for i, j in zip(blocked_idx, blocked_idx[1:]):
+        if j - i > 3 or not_clear[i + 1:j].any():
+            continue
+        
+        # Calcular el ancho del gap basándose en geometría
+        # Los obstáculos están en las direcciones de los sensores i y j
+        # a las distancias estimadas
+        
+        angle_i = _IR_ANGLES_DEG[i]
+        angle_j = _IR_ANGLES_DEG[j]
+        
+        dist_i = distances[i]
+        dist_j = distances[j]
+        
+        # Posiciones de los obstáculos en el marco local del robot
+        # (relativo al centro del robot, x=derecha, y=frente), usando el
+        # seno/coseno precalculado del ángulo de cada sensor
+        obs_i_local_x = dist_i * _IR_SIN[i]
+        obs_i_local_y = dist_i * _IR_COS[i]
+        
+        obs_j_local_x = dist_j * _IR_SIN[j]
+        obs_j_local_y = dist_j * _IR_COS[j]
+        
+        # Calcular la distancia entre los dos obstáculos
+        gap_width = math.hypot(
+            obs_i_local_x - obs_j_local_x,
+            obs_i_local_y - obs_j_local_y
+        )
+        
+        # Verificar si el gap es navegable
+        is_navigable = gap_width >= config.GAP_MIN_WIDTH_CM
+        
+        # Ángulo central del gap en el marco local (promedio de los ángulos
+        # de los obstáculos)
+        gap_angle_local = (angle_i + angle_j) / 2.0
+        
+        local_gaps.append((i, j, gap_angle_local, gap_width, is_navigable, dist_i, dist_j))
+    
+    return tuple(local_gaps)
+
+
 def detect_navigable_gaps(ir_sensors, q):
     """
     Detecta espacios navegables (gaps) entre obstáculos basándose en lecturas IR.
@@ -584,93 +842,34 @@ def detect_navigable_gaps(ir_sensors, q):
     if not ir_sensors or len(ir_sensors) < 7:
         return []
     
-    gaps = []
-    theta_robot_rad = math.radians(q[2])
-    
-    # Convertir todas las lecturas IR a distancias
-    distances = [ir_value_to_distance(ir_sensors[i]) for i in range(7)]
+    # Reutilizar el análisis de la iteración anterior si las lecturas son
+    # idénticas (clave exacta: el resultado no cambia respecto a recalcular)
+    global _gap_cache
+    key = tuple(ir_sensors[:7])
+    cached_key, local_gaps = _gap_cache
+    if key != cached_key:
+        local_gaps = _scan_local_gaps(key)
+        _gap_cache = (key, local_gaps)
     
-    # Analizar cada par de sensores adyacentes para buscar gaps
-    for i in range(7):
-        # Verificar si este sensor detecta un obstáculo
-        if ir_sensors[i] < config.GAP_BLOCKED_THRESHOLD:
-            continue
+    gaps = []
+    for i, j, gap_angle_local, gap_width, is_navigable, dist_i, dist_j in local_gaps:
+        # Ángulo central del gap en el marco global, normalizado a (-180, 180]
+        gap_angle_global = q[2] + gap_angle_local
+        gap_angle_global = 180.0 - (180.0 - gap_angle_global) % 360.0
         
-        # Buscar el siguiente sensor que también detecte un obstáculo
-        # (puede no ser el inmediatamente adyacente)
-        for j in range(i + 1, min(i + 4, 7)):  # Buscar hasta 3 sensores adelante
-            if ir_sensors[j] < config.GAP_BLOCKED_THRESHOLD:
-                continue
-            
-            # Tenemos dos sensores que detectan obstáculos: i y j
-            # Verificar si hay espacio libre entre ellos
-            
-            # Verificar que los sensores intermedios estén libres
-            all_clear_between = True
-            for k in range(i + 1, j):
-                if ir_sensors[k] >= config.GAP_CLEAR_THRESHOLD:
-                    all_clear_between = False
-                    break
-            
-            if not all_clear_between:
-                continue  # No hay espacio libre entre los obstáculos
-            
-            # Calcular el ancho del gap basándose en geometría
-            # Los obstáculos están en las direcciones de los sensores i y j
-            # a las distancias estimadas
-            
-            angle_i = config.IR_SENSOR_ANGLES.get(i, 0)
-            angle_j = config.IR_SENSOR_ANGLES.get(j, 0)
-            
-            dist_i = distances[i]
-            dist_j = distances[j]
-            
-            # Posiciones de los obstáculos en el marco local del robot
-            # (relativo al centro del robot)
-            angle_i_rad = math.radians(angle_i)
-            angle_j_rad = math.radians(angle_j)
-            
-            # Posiciones en marco local (x=derecha, y=frente)
-            # Convertir a marco global para cálculo preciso
-            obs_i_local_x = dist_i * math.sin(angle_i_rad)
-            obs_i_local_y = dist_i * math.cos(angle_i_rad)
-            
-            obs_j_local_x = dist_j * math.sin(angle_j_rad)
-            obs_j_local_y = dist_j * math.cos(angle_j_rad)
-            
-            # Calcular la distancia entre los dos obstáculos
-            gap_width = math.hypot(
-                obs_i_local_x - obs_j_local_x,
-                obs_i_local_y - obs_j_local_y
-            )
-            
-            # Verificar si el gap es navegable
-            is_navigable = gap_width >= config.GAP_MIN_WIDTH_CM
-            
-            # Calcular el ángulo central del gap (promedio de los ángulos de los obstáculos)
-            gap_angle_local = (angle_i + angle_j) / 2.0
-            gap_angle_global = q[2] + gap_angle_local
-            
-            # Normalizar el ángulo global a [-180, 180]
-            while gap_angle_global > 180:
-                gap_angle_global -= 360
-            while gap_angle_global < -180:
-                gap_angle_global += 360
-            
-            # Crear el descriptor del gap
-            gap_info = {
-                'left_sensor': i,
-                'right_sensor': j,
-                'gap_angle': gap_angle_global,
-                'gap_width': gap_width,
-                'is_navigable': is_navigable,
-                'left_distance': dist_i,
-                'right_distance': dist_j,
-                'sensors_between': j - i - 1  # Número de sensores libres entre obstáculos
-            }
-            
-            gaps.append(gap_info)
-            break  # Solo buscar un gap por sensor izquierdo
+        # Crear el descriptor del gap
+        gap_info = {
+            'left_sensor': i,
+            'right_sensor': j,
+            'gap_angle': gap_angle_global,
+            'gap_width': gap_width,
+            'is_navigable': is_navigable,
+            'left_distance': dist_i,
+            'right_distance': dist_j,
+            'sensors_between': j - i - 1  # Número de sensores libres entre obstáculos
+        }
+        
+        gaps.append(gap_info)
     
     return gaps
 
@@ -699,7 +898,7 @@ def ir_sensors_to_obstacles(q, ir_sensors):
     correctamente independientemente de hacia dónde esté mirando el robot.
     
     Args:
-        q: Tupla (x, y, theta_deg) con posición y orientación actual del robot
+        q: Tupla (x, y, theta_deg) o PoseCache con la pose actual del robot
         ir_sensors: Lista con 7 valores de sensores IR (rango 0-4095)
     
     Returns:
@@ -708,57 +907,59 @@ def ir_sensors_to_obstacles(q, ir_sensors):
             - y_obs: Coordenada Y estimada del obstáculo en el plano global (cm)
             - strength: Valor de intensidad del sensor IR (0-4095)
     """
-    # Validar que tengamos lecturas de sensores válidas
-    if not ir_sensors or len(ir_sensors) < 7:
-        return []
+    xs, ys, strengths = ir_sensors_to_obstacles_soa(q, ir_sensors)
+    return list(zip(xs.tolist(), ys.tolist(), strengths.tolist()))
+
+
+def ir_sensors_to_obstacles_soa(q, ir_sensors):
+    """
+    Versión de ir_sensors_to_obstacles que devuelve arrays (estructura de arrays).
     
-    obstacles = []
-    # Convertir la orientación del robot a radianes para cálculos trigonométricos
-    theta_robot_rad = math.radians(q[2])
+    Mismo modelo y misma transformación de coordenadas, pero en lugar de una
+    lista de tuplas devuelve un array por campo, de modo que quien los consuma
+    (suma de fuerzas, obstáculo más cercano, visualización) puede operar con
+    NumPy sin desempaquetar tuplas.
     
-    # Procesar cada uno de los siete sensores IR
-    for i in range(7):
-        ir_value = ir_sensors[i]
-        
-        # Solo considerar lecturas que superen el umbral mínimo de detección
-        # Esto filtra ruido y lecturas de sensores que no detectan obstáculos
-        if ir_value < config.IR_THRESHOLD_DETECT:
-            continue
-        
-        # ========== ESTIMACIÓN DE DISTANCIA MEDIANTE MODELO FÍSICO MEJORADO ==========
-        # Usar la función mejorada que compensa por ángulo del sensor
-        # y usa calibración más precisa
-        d_estimate = ir_value_to_distance(ir_value, sensor_index=i)
-        
-        # ========== TRANSFORMACIÓN DE COORDENADAS ==========
-        # Obtener el ángulo del sensor relativo al frente del robot desde la configuración
-        if i not in config.IR_SENSOR_ANGLES:
-            continue
-        
-        sensor_angle_from_front_deg = config.IR_SENSOR_ANGLES[i]
-        sensor_angle_from_front_rad = math.radians(sensor_angle_from_front_deg)
-        
-        # Calcular la dirección absoluta del sensor en el marco global
-        # Si el robot está orientado a θ y el sensor está a α desde el frente,
-        # la dirección global del sensor es θ + α
-        sensor_direction_global = theta_robot_rad + sensor_angle_from_front_rad
-        
-        # Calcular la posición del sensor en el marco global
-        # El sensor está montado en el borde del robot (a distancia IR_SENSOR_RADIUS
-        # del centro) en la dirección calculada
-        sensor_global_x = q[0] + config.IR_SENSOR_RADIUS * math.cos(sensor_direction_global)
-        sensor_global_y = q[1] + config.IR_SENSOR_RADIUS * math.sin(sensor_direction_global)
-        
-        # Calcular la posición estimada del obstáculo
-        # El obstáculo está a distancia d_estimate desde el sensor en la misma dirección
-        # que apunta el sensor
-        obs_x = sensor_global_x + d_estimate * math.cos(sensor_direction_global)
-        obs_y = sensor_global_y + d_estimate * math.sin(sensor_direction_global)
-        
-        # Agregar el obstáculo a la lista con su posición y fuerza de la señal
-        obstacles.append((obs_x, obs_y, ir_value))
+    Args:
+        q: Tupla (x, y, theta_deg) o PoseCache con la pose actual del robot
+        ir_sensors: Lista con 7 valores de sensores IR (rango 0-4095)
     
-    return obstacles
+    Returns:
+        tuple: (xs, ys, strengths) como arrays NumPy de igual longitud (uno por
+            obstáculo detectado; vacíos si no hay ninguno) con las coordenadas
+            globales en cm y el valor original del sensor IR
+    """
+    # Validar que tengamos lecturas de sensores válidas
+    if not ir_sensors or len(ir_sensors) < 7:
+        return _EMPTY_OBSTACLES
+    
+    # Los siete sensores se procesan a la vez con NumPy. Solo se consideran las
+    # lecturas que superan el umbral mínimo de detección (filtra ruido y
+    # sensores que no ven nada) y que tienen un ángulo configurado
+    raw = np.asarray(ir_sensors[:7])
+    ir = raw.astype(float)
+    active = (ir >= config.IR_THRESHOLD_DETECT) & _IR_HAS_ANGLE
+    if not active.any():
+        return _EMPTY_OBSTACLES
+    
+    # ========== ESTIMACIÓN DE DISTANCIA MEDIANTE MODELO FÍSICO MEJORADO ==========
+    distances = ir_values_to_distances(ir, _IR_INDICES)
+    
+    # ========== TRANSFORMACIÓN DE COORDENADAS ==========
+    # Si el robot está orientado a θ y el sensor está a α desde el frente, la
+    # dirección global del sensor es θ + α: en forma compleja, el producto de
+    # la dirección del sensor por la del robot (sin llamar a sin/cos)
+    pose = PoseCache.from_tuple(q)
+    dir_global = _IR_DIR * complex(pose.cth, pose.sth)
+    
+    # El sensor está montado en el borde del robot (a IR_SENSOR_RADIUS del
+    # centro) y el obstáculo está a la distancia estimada desde el sensor en la
+    # misma dirección: en total, radio + distancia desde el centro del robot
+    obs = complex(q[0], q[1]) + (config.IR_SENSOR_RADIUS + distances) * dir_global
+    
+    # Posición de cada obstáculo y fuerza de la señal (valor original)
+    obs = obs[active]
+    return obs.real, obs.imag, raw[active]
 
 
 def find_best_free_direction(ir_sensors, current_heading_deg, goal_angle_deg):
@@ -781,64 +982,69 @@ def find_best_free_direction(ir_sensors, current_heading_deg, goal_angle_deg):
             - should_slow: True si debe reducir velocidad (peligro real)
     """
     # Normalizar sensores
-    normalized_ir = [normalize_ir_reading(ir_sensors[i], i) for i in range(7)]
-    
-    # Definir sectores angulares para cada sensor (relativo al frente del robot)
-    sensor_angles = [config.IR_SENSOR_ANGLES.get(i, 0) for i in range(7)]
+    normalized_ir = normalize_ir_readings(ir_sensors)
     
     # Calcular "libertad" en cada dirección (invertir: alto IR = obstáculo cerca = baja libertad)
-    freedom_scores = []
-    for i in range(7):
-        ir_norm = normalized_ir[i]
-        
-        # Convertir IR a "score de libertad" (0=bloqueado, 1=libre)
-        if ir_norm < config.IR_THRESHOLD_DETECT:
-            freedom = 1.0  # Completamente libre
-        elif ir_norm >= config.IR_THRESHOLD_EMERGENCY:
-            freedom = 0.0  # Bloqueado
-        else:
-            # Escala lineal entre DETECT y EMERGENCY
-            freedom = 1.0 - (ir_norm - config.IR_THRESHOLD_DETECT) / \
-                      (config.IR_THRESHOLD_EMERGENCY - config.IR_THRESHOLD_DETECT)
-        
-        freedom_scores.append(freedom)
+    # Escala lineal entre DETECT (1=libre) y EMERGENCY (0=bloqueado) para los 7
+    # sensores a la vez; por debajo de DETECT el sensor está completamente libre
+    c = _C
+    ir_detect = c.IR_THRESHOLD_DETECT
+    freedom_scores = np.clip(1.0 - (normalized_ir - ir_detect) * c.INV_IR_RANGE, 0.0, 1.0)
+    freedom_scores[normalized_ir < ir_detect] = 1.0
     
     # Encontrar la dirección con MAYOR libertad que también se aproxime al objetivo
+    # (error normalizado a (-180, 180] con una sola operación módulo)
     error_to_goal = goal_angle_deg - current_heading_deg
-    while error_to_goal > 180:
-        error_to_goal -= 360
-    while error_to_goal < -180:
-        error_to_goal += 360
-    
-    best_score = -1000
-    best_direction = 0
-    min_freedom = 1.0
-    
-    for i in range(7):
-        sensor_angle = sensor_angles[i]
-        freedom = freedom_scores[i]
-        
-        # Penalizar direcciones alejadas del objetivo
-        angle_diff = abs(sensor_angle - error_to_goal)
-        if angle_diff > 180:
-            angle_diff = 360 - angle_diff
-        
-        # Score combinado: libertad (peso 70%) + cercanía al objetivo (peso 30%)
-        score = 0.7 * freedom - 0.3 * (angle_diff / 180.0)
-        
-        if score > best_score:
-            best_score = score
-            best_direction = sensor_angle
-            min_freedom = min(min_freedom, freedom)
+    error_to_goal = 180.0 - (180.0 - error_to_goal) % 360.0
+    
+    # Penalizar direcciones alejadas del objetivo (ángulo de cada sensor
+    # relativo al frente del robot)
+    angle_diff = np.abs(_IR_ANGLES_DEG_ARR - error_to_goal)
+    angle_diff = np.where(angle_diff > 180, 360 - angle_diff, angle_diff)
+    
+    # Score combinado: libertad (peso 70%) + cercanía al objetivo (peso 30%)
+    scores = 0.7 * freedom_scores - (0.3 / 180.0) * angle_diff
+    
+    # argmax se queda con el primer máximo, como la búsqueda secuencial. La
+    # libertad devuelta es la mínima entre los sucesivos mejores candidatos de
+    # esa búsqueda (los sensores cuyo score supera a todos los anteriores)
+    best = int(np.argmax(scores))
+    best_direction = _IR_ANGLES_DEG[best]
+    improved = np.empty(_NUM_IR_SENSORS, dtype=bool)
+    improved[0] = True
+    improved[1:] = scores[1:] > np.maximum.accumulate(scores)[:-1]
+    min_freedom = min(1.0, float(freedom_scores[improved].min()))
     
     # Determinar si debe reducir velocidad (libertad < 50% en TODAS direcciones)
-    avg_freedom = sum(freedom_scores) / len(freedom_scores)
-    should_slow = avg_freedom < 0.5
+    avg_freedom = freedom_scores.sum() / _NUM_IR_SENSORS
+    should_slow = bool(avg_freedom < 0.5)
     
     return best_direction, min_freedom, should_slow
 
 
-def repulsive_force(q, ir_sensors, k_rep=None, d_influence=None, gaps=None):
+def _navigable_gap_mask(gaps):
+    """
+    Marca los sensores que forman el borde de algún gap navegable.
+    
+    Args:
+        gaps: Lista de gaps de detect_navigable_gaps (o None)
+    
+    Returns:
+        np.ndarray: Array bool de 7 elementos, True en los sensores izquierdo y
+            derecho de cada gap navegable
+    """
+    gap_mask = np.zeros(_NUM_IR_SENSORS, dtype=bool)
+    if gaps:
+        for gap in gaps:
+            if gap.get('is_navigable', False):
+                for idx in (gap.get('left_sensor', -1), gap.get('right_sensor', -1)):
+                    if 0 <= idx < _NUM_IR_SENSORS:
+                        gap_mask[idx] = True
+    return gap_mask
+
+
+def repulsive_force(q, ir_sensors, k_rep=None, d_influence=None, gaps=None, gap_mask=None,
+                    distances=None):
     """
     Calcula la fuerza repulsiva que aleja al robot de obstáculos detectados.
     
@@ -851,116 +1057,74 @@ def repulsive_force(q, ir_sensors, k_rep=None, d_influence=None, gaps=None):
     cuando el clearance es insuficiente para maniobrar.
     
     Args:
-        q: Tupla (x, y, theta_deg) con posición y orientación actual del robot
+        q: Tupla (x, y, theta_deg) o PoseCache con la pose actual del robot
         ir_sensors: Lista de 7 valores de sensores IR (rango 0-4095)
         k_rep: Ganancia repulsiva (usa config.K_REPULSIVE si None)
         d_influence: Distancia de influencia repulsiva (usa config.D_INFLUENCE si None)
         gaps: Lista de gaps navegables detectados (para reducir fuerza en gaps)
+        gap_mask: Máscara de sensores en bordes de gaps ya calculada con
+            _navigable_gap_mask (si se pasa, gaps se ignora)
+        distances: Distancias estimadas de los 7 sensores ya calculadas en
+            esta iteración (ver _precompute_ir_state); se calculan si es None
     
     Returns:
         tuple: Tupla (fx, fy) con las componentes X e Y de la fuerza repulsiva total
     """
+    c = _C
+    
     # Usar valores por defecto de configuración si no se especificaron
     if k_rep is None:
-        k_rep = config.K_REPULSIVE
+        k_rep = c.K_REPULSIVE
     
     if d_influence is None:
-        d_influence = config.D_INFLUENCE
+        d_influence = c.D_INFLUENCE
     
     # Verificar si hay obstáculos detectados
     max_ir = max(ir_sensors) if ir_sensors else 0
     
     # Si NO hay obstáculos cercanos, no aplicar fuerza repulsiva
-    if max_ir < config.IR_THRESHOLD_DETECT:
+    if max_ir < c.IR_THRESHOLD_DETECT:
         return 0.0, 0.0
     
-    # ========== CALCULAR FUERZAS REPULSIVAS DE CADA OBSTÁCULO ==========
-    fx_total = 0.0
-    fy_total = 0.0
-    theta_robot_rad = math.radians(q[2])
-    
-    for i in range(7):
-        ir_value = ir_sensors[i]
-        
-        # Solo considerar lecturas significativas
-        if ir_value < config.IR_THRESHOLD_DETECT:
-            continue
-        
-        # Estimar distancia al obstáculo con compensación de ángulo
-        d_obstacle = ir_value_to_distance(ir_value, sensor_index=i)
-        
-        # GEOMETRÍA: Calcular CLEARANCE (distancia libre después del radio del robot)
-        # Esta es la distancia real disponible para maniobrar
-        clearance = d_obstacle - config.ROBOT_RADIUS_CM
-        
-        # Solo aplicar fuerza repulsiva si el obstáculo está dentro de la distancia de influencia
-        if d_obstacle >= d_influence:
-            continue
-        
-        # ========== MODELO DE FUERZA REPULSIVA MEJORADO ==========
-        # La fuerza aumenta DRÁSTICAMENTE cuando el clearance es pequeño
-        # Usa modelo: F_rep = k_rep * (1/clearance - 1/d_safe)^2
-        # donde d_safe es la distancia mínima segura
-        
-        d_safe = config.D_SAFE  # 12cm de clearance mínimo
-        
-        if clearance < 1.0:
-            # Clearance crítico (<1cm) - fuerza máxima
-            force_magnitude = k_rep * 10.0
-        elif clearance < d_safe:
-            # Clearance insuficiente - fuerza muy alta, inversamente proporcional
-            # F = k * ((1/clearance) - (1/d_safe))^2
-            term = (1.0 / clearance) - (1.0 / d_safe)
-            force_magnitude = k_rep * (term ** 2)
-        else:
-            # Clearance suficiente - fuerza moderada, decae con distancia
-            # F = k * (d_safe / clearance)^3 * factor_de_alcance
-            factor_alcance = 1.0 - (d_obstacle / d_influence)
-            force_magnitude = k_rep * math.pow(d_safe / clearance, 3.0) * factor_alcance
-        
-        # ========== REDUCIR FUERZA EN GAPS NAVEGABLES ==========
-        # Si este sensor forma parte de un gap navegable, reducir la fuerza
-        # para permitir que el robot pase entre los obstáculos
-        if gaps:
-            for gap in gaps:
-                if gap.get('is_navigable', False):
-                    left_idx = gap.get('left_sensor', -1)
-                    right_idx = gap.get('right_sensor', -1)
-                    
-                    # Si este sensor está en los bordes del gap, reducir fuerza
-                    if i == left_idx or i == right_idx:
-                        force_magnitude *= config.GAP_REPULSION_REDUCTION_FACTOR
-                        break
-        
-        # ========== CALCULAR DIRECCIÓN DE LA FUERZA ==========
-        # Obtener el ángulo del sensor
-        if i not in config.IR_SENSOR_ANGLES:
-            continue
-        
-        sensor_angle_deg = config.IR_SENSOR_ANGLES[i]
-        sensor_angle_rad = math.radians(sensor_angle_deg)
-        
-        # Dirección global del sensor (hacia donde apunta)
-        sensor_direction_global = theta_robot_rad + sensor_angle_rad
-        
-        # La fuerza repulsiva apunta en DIRECCIÓN OPUESTA al obstáculo
-        # (aleja del obstáculo)
-        force_direction = sensor_direction_global + math.pi
-        
-        # Componentes de la fuerza
-        fx = force_magnitude * math.cos(force_direction)
-        fy = force_magnitude * math.sin(force_direction)
-        
-        # Acumular fuerzas de todos los obstáculos
-        fx_total += fx
-        fy_total += fy
+    # ========== SENSORES EN LOS BORDES DE GAPS NAVEGABLES ==========
+    # Si un sensor forma parte de un gap navegable su fuerza se reduce para
+    # permitir que el robot pase entre los obstáculos
+    if gap_mask is None:
+        gap_mask = _navigable_gap_mask(gaps)
+    
+    # ========== ESTIMACIÓN DE DISTANCIAS ==========
+    # Distancia de cada sensor con el modelo calibrado y compensación de ángulo
+    # (reutilizada si el llamador ya la calculó en esta iteración)
+    ir = np.asarray(ir_sensors[:_NUM_IR_SENSORS], dtype=float)
+    if distances is None:
+        distances = ir_values_to_distances(ir, _IR_INDICES)
+    
+    # ========== FUERZAS REPULSIVAS DE CADA OBSTÁCULO ==========
+    # El bucle sobre los siete sensores (CLEARANCE = distancia - radio del
+    # robot y modelo de fuerza por tramos) vive en
+    # potential_fields_numba._repulsive_core, compilado con Numba si está
+    # disponible. Allí las fuerzas se acumulan en el marco del robot y la
+    # suma se rota al marco global una sola vez:
+    #   - clearance < 1cm:     F = k * 10 (fuerza máxima)
+    #   - clearance < d_safe:  F = k * (1/clearance - 1/d_safe)^2
+    #   - en otro caso:        F = k * (d_safe/clearance)^3 * (1 - d/d_influence)
+    # Solo cuentan los sensores con lectura significativa, ángulo configurado
+    # y obstáculo dentro de la distancia de influencia
+    pose = PoseCache.from_tuple(q)
+    fx_total, fy_total = _repulsive_core(
+        ir, distances, _IR_COS_ARR, _IR_SIN_ARR, _IR_HAS_ANGLE, gap_mask,
+        pose.cth, pose.sth, float(k_rep), float(d_influence), c.D_SAFE, c.INV_D_SAFE,
+        c.ROBOT_RADIUS_CM,
+        c.IR_THRESHOLD_DETECT, c.GAP_REPULSION_REDUCTION_FACTOR,
+    )
     
     return fx_total, fy_total
 
 
 
 def combined_potential_speeds(q, q_goal, ir_sensors=None, k_lin=None, k_ang=None, 
-                              k_rep=None, d_influence=None, potential_type='linear'):
+                              k_rep=None, d_influence=None, potential_type='linear',
+                              state=None):
     """
     Combina potencial atractivo y repulsivo para calcular velocidades de navegación.
     
@@ -986,7 +1150,7 @@ def combined_potential_speeds(q, q_goal, ir_sensors=None, k_lin=None, k_ang=None
     de reacción y frenado ante obstáculos, reduciendo significativamente las colisiones.
     
     Args:
-        q: Tupla (x, y, theta_deg) con posición y orientación actual del robot
+        q: Tupla (x, y, theta_deg) o PoseCache con la pose actual del robot
         q_goal: Tupla (x_goal, y_goal) con coordenadas del objetivo
         ir_sensors: Lista de 7 valores de sensores IR (None = usar solo potencial atractivo)
         k_lin: Ganancia lineal atractiva (auto-seleccionada según potential_type si es None)
@@ -994,6 +1158,8 @@ def combined_potential_speeds(q, q_goal, ir_sensors=None, k_lin=None, k_ang=None
         k_rep: Ganancia repulsiva que controla intensidad de evasión (usa config.K_REPULSIVE si None)
         d_influence: Distancia de influencia repulsiva en cm (usa config.D_INFLUENCE si None)
         potential_type: Tipo de función de potencial atractivo ['linear', 'quadratic', 'conic', 'exponential']
+        state: ControlState con la rampa de aceleración (el estado por defecto
+            del módulo si es None)
     
     Returns:
         tuple: Tupla con (v_left, v_right, distance, info) donde:
@@ -1002,49 +1168,71 @@ def combined_potential_speeds(q, q_goal, ir_sensors=None, k_lin=None, k_ang=None
             - distance: Distancia al objetivo en cm
             - info: Diccionario con información detallada para logging
     """
-    # Declarar variable global para rampa de aceleración
-    global _last_v_linear
+    # Estado de la rampa de aceleración
+    if state is None:
+        state = _DEFAULT_STATE
+    
+    # Pose con el seno/coseno de la orientación, compartida por los submódulos
+    q = PoseCache.from_tuple(q)
     
     # Si no hay sensores IR disponibles, usar solo potencial atractivo
     # Esto permite que la función funcione también en la Parte 01
     if ir_sensors is None or not ir_sensors:
         return attractive_wheel_speeds(q, q_goal, k_lin=k_lin, k_ang=k_ang, 
-                                      potential_type=potential_type)
+                                      potential_type=potential_type, state=state)
     
     # ========== CONFIGURACIÓN DE PARÁMETROS ==========
-    # Seleccionar la ganancia atractiva apropiada según el tipo de potencial
+    # Parámetros de config usados varias veces por iteración (y dentro de los
+    # bucles por sensor) enlazados a variables locales una sola vez
+    c = _C
+    tol_dist = c.TOL_DIST_CM
+    v_max = c.V_MAX_CM_S
+    ir_detect = c.IR_THRESHOLD_DETECT
+    ir_warning = config.IR_THRESHOLD_WARNING
+    ir_critical = config.IR_THRESHOLD_CRITICAL
+    trap_enabled = config.ENABLE_TRAP_ESCAPE
+    
+    # Resolver el tipo de potencial a su identificador entero una sola vez (los
+    # no reconocidos se tratan como lineales) y seleccionar su ganancia
     # Cada función requiere una ganancia específica debido a sus características de escala
+    ptype_id = _PTYPE_ID.get(potential_type, 0)
     if k_lin is None:
-        if potential_type == 'linear':
-            k_lin = config.K_LINEAR
-        elif potential_type == 'quadratic':
-            k_lin = config.K_QUADRATIC
-        elif potential_type == 'conic':
-            k_lin = config.K_CONIC
-        elif potential_type == 'exponential':
-            k_lin = config.K_EXPONENTIAL
-        else:
-            k_lin = config.K_LINEAR
+        k_lin = c.K_LIN_BY_ID[ptype_id]
     
     if k_ang is None:
-        k_ang = config.K_ANGULAR
+        k_ang = c.K_ANGULAR
     
     if k_rep is None:
-        k_rep = config.K_REPULSIVE
+        k_rep = c.K_REPULSIVE
     
     if d_influence is None:
-        d_influence = config.D_INFLUENCE
+        d_influence = c.D_INFLUENCE
     
     # ========== CONTROL DE SEGURIDAD: ANÁLISIS DE SENSORES IR ==========
     # IMPORTANTE: Normalizar lecturas de sensores según sensibilidad individual
     # para comparaciones justas entre sensores con diferentes características
-    normalized_ir = []
+    # (como array para los análisis vectorizados y como lista para los accesos
+    # sensor a sensor, que son más baratos sobre floats de Python)
     if ir_sensors and len(ir_sensors) >= 7:
-        for i in range(7):
-            norm_value = normalize_ir_reading(ir_sensors[i], i)
-            normalized_ir.append(norm_value)
+        normalized_arr = normalize_ir_readings(ir_sensors)
+        normalized_ir = normalized_arr.tolist()
     else:
         normalized_ir = ir_sensors if ir_sensors else []
+        normalized_arr = np.asarray(normalized_ir, dtype=float)
+    
+    # ========== ATAJO SIN OBSTÁCULOS ==========
+    # Si ninguna lectura (cruda ni normalizada) alcanza el umbral de detección,
+    # que es el más bajo de todos, no puede haber gaps, trampa, clearance frontal
+    # que limite la velocidad, fuerza repulsiva ni obstáculos que contar. En ese
+    # caso, el más habitual navegando en espacio libre, esos análisis se omiten
+    # y se usan directamente sus resultados para "sin obstáculos"
+    obstacles_detected = max(ir_sensors) >= ir_detect or max(normalized_ir) >= ir_detect
+    
+    # Distancias y clearance de todos los sensores, calculados una sola vez
+    # para el análisis frontal, el lateral y la fuerza repulsiva
+    if obstacles_detected:
+        ir_arr, distances_arr, clearances_arr = _precompute_ir_state(ir_sensors)
+        clearances = clearances_arr.tolist()
     
     # Determinar la velocidad máxima permitida basada en las lecturas NORMALIZADAS
     # CRÍTICO: Incluir sensores laterales [0] y [6] porque obstáculos laterales pueden
@@ -1056,36 +1244,39 @@ def combined_potential_speeds(q, q_goal, ir_sensors=None, k_lin=None, k_ang=None
     # ========== NUEVA FUNCIONALIDAD: DETECCIÓN DE GAPS NAVEGABLES ==========
     # Detectar espacios entre obstáculos por donde el robot puede pasar
     gaps = []
+    gap_mask = _navigable_gap_mask(None)
     navigable_gap_detected = False
     
     if normalized_ir and len(normalized_ir) >= 7:
-        # Detectar gaps usando valores NORMALIZADOS
-        gaps = detect_navigable_gaps(normalized_ir, q)
-        
-        # Verificar si hay al menos un gap navegable
-        for gap in gaps:
-            if gap.get('is_navigable', False):
-                navigable_gap_detected = True
-                break
-        
         # Considerar TODOS los sensores normalizados para detección completa
         max_ir_all = max(normalized_ir)
         # Sensores laterales extremos [0] y [6] para detección de aproximación lateral
         max_ir_lateral = max(normalized_ir[0], normalized_ir[6])
+    
+    if obstacles_detected and len(normalized_ir) >= 7:
+        # Detectar gaps usando valores NORMALIZADOS
+        gaps = detect_navigable_gaps(normalized_ir, q)
+        
+        # Sensores en los bordes de gaps navegables, calculados una sola vez
+        # para esta iteración (la fuerza repulsiva reutiliza la máscara).
+        # Hay al menos un gap navegable si algún sensor está marcado
+        gap_mask = _navigable_gap_mask(gaps)
+        navigable_gap_detected = bool(gap_mask.any())
         
         # ========== DETECCIÓN DE TRAMPA EN C ==========
         # Contar cuántos sensores detectan obstáculos simultáneamente
         # Si muchos sensores están bloqueados, el robot está atrapado en una C
         # IMPORTANTE: Si hay gap navegable, NO considerar como trampa
         # Usar valores NORMALIZADOS para conteo justo
-        if config.ENABLE_TRAP_ESCAPE and not navigable_gap_detected:
+        if trap_enabled and not navigable_gap_detected:
+            trap_threshold = config.TRAP_DETECTION_IR_THRESHOLD
             for i in range(7):
-                if normalized_ir[i] >= config.TRAP_DETECTION_IR_THRESHOLD:
+                if normalized_ir[i] >= trap_threshold:
                     trapped_sensor_count += 1
     
     # Determinar si el robot está atrapado (mínimo local)
     # MODIFICADO: No estar atrapado si hay gap navegable detectado
-    is_trapped = (config.ENABLE_TRAP_ESCAPE and 
+    is_trapped = (trap_enabled and 
                   trapped_sensor_count >= config.TRAP_DETECTION_SENSOR_COUNT and
                   not navigable_gap_detected)
     
@@ -1095,20 +1286,14 @@ def combined_potential_speeds(q, q_goal, ir_sensors=None, k_lin=None, k_ang=None
     
     # Analizar obstáculos frontales (sensores centrales y frente-laterales)
     # Ampliado para incluir intermedios [1] y [5] y reaccionar antes a aproximaciones laterales
-    front_sensor_indices = [1, 2, 3, 4, 5]
+    # Clearance mínimo (distancia real estimada con compensación de ángulo menos
+    # el radio del robot) entre los sensores frontales que detectan algo
     min_clearance_front = float('inf')
-    min_distance_front = float('inf')
-    
-    for idx in front_sensor_indices:
-        if normalized_ir[idx] >= config.IR_THRESHOLD_DETECT:
-            # Estimar distancia real con compensación de ángulo
-            dist = ir_value_to_distance(ir_sensors[idx], sensor_index=idx)
-            clearance = dist - config.ROBOT_RADIUS_CM
-            
-            if clearance < min_clearance_front:
-                min_clearance_front = clearance
-            if dist < min_distance_front:
-                min_distance_front = dist
+    
+    if obstacles_detected:
+        front_active = normalized_arr[_FRONT_SENSORS] >= ir_detect
+        if front_active.any():
+            min_clearance_front = float(clearances_arr[_FRONT_SENSORS][front_active].min())
     
     # Calcular velocidad máxima basada en clearance frontal
     # FILOSOFÍA: Velocidad proporcional al espacio disponible
@@ -1117,7 +1302,8 @@ def combined_potential_speeds(q, q_goal, ir_sensors=None, k_lin=None, k_ang=None
     # Estimar distancia de frenado necesaria basada en velocidad actual
     # Fórmula: d_brake = v² / (2 * a_decel)
     # Con a_decel = 20 cm/s² (desaceleración segura)
-    current_v = _last_v_linear if _last_v_linear > 0 else 8.0
+    last_v = state.last_v_linear
+    current_v = last_v if last_v > 0 else 8.0
     decel_rate = 20.0  # cm/s² - tasa de desaceleración segura
     brake_distance = (current_v ** 2) / (2 * decel_rate)
     
@@ -1143,7 +1329,7 @@ def combined_potential_speeds(q, q_goal, ir_sensors=None, k_lin=None, k_ang=None
         safety_level = "CAUTION"
     else:
         # Clearance excelente - LIBRE
-        v_max_allowed = config.V_MAX_CM_S
+        v_max_allowed = v_max
         safety_level = "CLEAR"
     
     # BOOST: Si hay gap navegable detectado, aumentar velocidad permitida
@@ -1154,10 +1340,10 @@ def combined_potential_speeds(q, q_goal, ir_sensors=None, k_lin=None, k_ang=None
         
         if max_gap_width > config.ROBOT_DIAMETER_CM + 30:
             # Gap muy ancho (>64cm) - aumentar velocidad 30%
-            v_max_allowed = min(v_max_allowed * 1.3, config.V_MAX_CM_S)
+            v_max_allowed = min(v_max_allowed * 1.3, v_max)
         elif max_gap_width > config.ROBOT_DIAMETER_CM + 15:
             # Gap ancho (>49cm) - aumentar velocidad 15%
-            v_max_allowed = min(v_max_allowed * 1.15, config.V_MAX_CM_S)
+            v_max_allowed = min(v_max_allowed * 1.15, v_max)
     
     # Si está atrapado, actualizar el nivel de seguridad
     if is_trapped:
@@ -1181,11 +1367,11 @@ def combined_potential_speeds(q, q_goal, ir_sensors=None, k_lin=None, k_ang=None
     if normalized_ir and len(normalized_ir) >= 7:
         # Sensores frontales críticos: 2, 3, 4 (los que apuntan hacia adelante)
         max_frontal = max(normalized_ir[2], normalized_ir[3], normalized_ir[4])
-        if max_frontal >= config.IR_THRESHOLD_CRITICAL:
+        if max_frontal >= ir_critical:
             # Si hay obstáculo frontal crítico, DUPLICAR la fuerza repulsiva
             # REDUCIDO de 3.0x a 2.0x para evitar dominación
             k_rep_effective = k_rep * 2.0
-        elif max_frontal >= config.IR_THRESHOLD_WARNING:
+        elif max_frontal >= ir_warning:
             # Si hay obstáculo frontal en advertencia, aumentar 50%
             # REDUCIDO de 2.0x a 1.5x
             k_rep_effective = k_rep * 1.5
@@ -1199,7 +1385,7 @@ def combined_potential_speeds(q, q_goal, ir_sensors=None, k_lin=None, k_ang=None
     
     # Calcular las componentes de la fuerza atractiva según el tipo de potencial
     # Si estamos muy cerca de la meta, no hay fuerza atractiva
-    if distance < config.TOL_DIST_CM:
+    if distance < tol_dist:
         fx_att = 0.0
         fy_att = 0.0
     else:
@@ -1208,18 +1394,9 @@ def combined_potential_speeds(q, q_goal, ir_sensors=None, k_lin=None, k_ang=None
         direction_y = dy_goal / distance
         
         # Calcular la magnitud de la fuerza según la función de potencial seleccionada
-        # Las fórmulas son las mismas que en attractive_wheel_speeds pero calculamos
-        # la fuerza en lugar de la velocidad directamente
-        if potential_type == 'linear':
-            f_magnitude = k_lin_effective * distance
-        elif potential_type == 'quadratic':
-            f_magnitude = k_lin_effective * (distance ** 2) / 10.0
-        elif potential_type == 'conic':
-            f_magnitude = k_lin_effective * min(distance, 100.0) * 2.0
-        elif potential_type == 'exponential':
-            f_magnitude = k_lin_effective * (1 - math.exp(-distance / 50.0)) * 20.0
-        else:
-            f_magnitude = k_lin_effective * distance
+        # Las fórmulas son las mismas que en attractive_wheel_speeds; la misma
+        # magnitud se reutiliza después como velocidad base
+        f_magnitude = _attractive_magnitude(distance, k_lin_effective, ptype_id)
         
         # Convertir la magnitud en componentes vectoriales
         fx_att = f_magnitude * direction_x
@@ -1229,8 +1406,12 @@ def combined_potential_speeds(q, q_goal, ir_sensors=None, k_lin=None, k_ang=None
     # Calcular las componentes de la fuerza repulsiva total sumando las contribuciones
     # de todos los obstáculos detectados por los sensores IR
     # MODIFICADO: Pasar información de gaps para reducir fuerzas en gaps navegables
-    fx_rep, fy_rep = repulsive_force(q, ir_sensors, k_rep=k_rep_effective, 
-                                     d_influence=d_influence, gaps=gaps)
+    if obstacles_detected:
+        fx_rep, fy_rep = repulsive_force(q, ir_sensors, k_rep=k_rep_effective, 
+                                         d_influence=d_influence, gap_mask=gap_mask,
+                                         distances=distances_arr)
+    else:
+        fx_rep, fy_rep = 0.0, 0.0
     
     # ========== ESTRATEGIA DE EVASIÓN COMBINADA ==========
     # Nuestro enfoque utiliza la velocidad del potencial atractivo como base y ajusta
@@ -1241,21 +1422,12 @@ def combined_potential_speeds(q, q_goal, ir_sensors=None, k_lin=None, k_ang=None
     # ========== CALCULAR VELOCIDAD BASE DEL POTENCIAL ATRACTIVO ==========
     # Calculamos la velocidad lineal base usando la función de potencial atractivo
     # Esta velocidad determina qué tan rápido queremos avanzar hacia el objetivo
-    if distance < config.TOL_DIST_CM:
+    if distance < tol_dist:
         v_base = 0.0
     else:
-        # Aplicar la función de potencial seleccionada para obtener velocidad base
-        if potential_type == 'linear':
-            v_base = k_lin_effective * distance
-        elif potential_type == 'quadratic':
-            v_base = k_lin_effective * (distance ** 2) / 10.0
-        elif potential_type == 'conic':
-            # Restituir velocidad base con saturación a 100cm para estabilidad
-            v_base = k_lin_effective * min(distance, 100.0) * 2.0
-        elif potential_type == 'exponential':
-            v_base = k_lin_effective * (1 - math.exp(-distance / 50.0)) * 20.0
-        else:
-            v_base = k_lin_effective * distance
+        # La velocidad base es la magnitud de la fuerza atractiva ya calculada
+        # en el paso 1 con la función de potencial seleccionada
+        v_base = f_magnitude
         
         # LIMITACIÓN DE SEGURIDAD CRÍTICA: aplicar v_max dinámico ANTES de otras saturaciones
         # Este límite dinámico es esencial para garantizar tiempo suficiente de frenado
@@ -1264,7 +1436,7 @@ def combined_potential_speeds(q, q_goal, ir_sensors=None, k_lin=None, k_ang=None
         v_base = min(v_base, v_max_allowed)
         
         # Saturar también a la velocidad máxima configurada del sistema
-        v_base = min(v_base, config.V_MAX_CM_S)
+        v_base = min(v_base, v_max)
         
         # ========== MODO ESCAPE: GARANTIZAR MOVIMIENTO MÍNIMO ==========
         # Si estamos atrapados, mantener velocidad mínima para seguir explorando
@@ -1272,22 +1444,19 @@ def combined_potential_speeds(q, q_goal, ir_sensors=None, k_lin=None, k_ang=None
             v_base = config.TRAP_MIN_FORWARD_SPEED
         
         # Aplicar rampa de aceleración para prevenir cambios bruscos de velocidad
-        max_accel = config.ACCEL_RAMP_CM_S2 * config.CONTROL_DT
-        if v_base > _last_v_linear + max_accel:
-            v_base = _last_v_linear + max_accel
-        _last_v_linear = v_base
+        max_accel = c.MAX_DELTA_V
+        if v_base > last_v + max_accel:
+            v_base = last_v + max_accel
+        state.last_v_linear = v_base
     
     # ========== COMBINAR DIRECCIONES ATRACTIVA Y REPULSIVA ==========
-    # Calcular el ángulo deseado hacia la meta desde el potencial atractivo
-    desired_angle_att = math.atan2(dy_goal, dx_goal)
-    
-    # Calcular la magnitud de la fuerza repulsiva para determinar su influencia
-    f_rep_mag = math.hypot(fx_rep, fy_rep)
-    
     # Si hay fuerzas repulsivas significativas, combinamos las direcciones
-    if f_rep_mag > 0.5:  # Umbral para considerar que hay obstáculos cercanos
-        # Calcular el ángulo de la dirección de evasión desde la fuerza repulsiva
-        angle_rep = math.atan2(fy_rep, fx_rep)
+    # Umbral para considerar que hay obstáculos cercanos: |F_rep| > 0.5,
+    # comparado al cuadrado para no calcular la raíz cuando no se supera
+    f_rep_sq = fx_rep * fx_rep + fy_rep * fy_rep
+    if f_rep_sq > 0.25:
+        # Magnitud de la fuerza repulsiva para determinar su influencia
+        f_rep_mag = math.sqrt(f_rep_sq)
         
         # Calcular pesos para combinar las direcciones
         # El peso repulsivo aumenta cuando el robot está más cerca de obstáculos
@@ -1300,9 +1469,17 @@ def combined_potential_speeds(q, q_goal, ir_sensors=None, k_lin=None, k_ang=None
         
         # Combinar ángulos mediante promedio ponderado de vectores unitarios
         # Esto produce una dirección resultante que evita obstáculos mientras
-        # mantiene el objetivo de avanzar hacia la meta
-        combined_x = weight_att * math.cos(desired_angle_att) + weight_rep * math.cos(angle_rep)
-        combined_y = weight_att * math.sin(desired_angle_att) + weight_rep * math.sin(angle_rep)
+        # mantiene el objetivo de avanzar hacia la meta. Los vectores unitarios
+        # salen directamente del error hacia la meta y de la fuerza repulsiva
+        # (el coseno y seno de sus ángulos) sin pasar por atan2/cos/sin; en la
+        # meta exacta el ángulo atractivo es atan2(0, 0) = 0
+        if distance > 0.0:
+            cos_att = dx_goal / distance
+            sin_att = dy_goal / distance
+        else:
+            cos_att, sin_att = 1.0, 0.0
+        combined_x = weight_att * cos_att + weight_rep * (fx_rep / f_rep_mag)
+        combined_y = weight_att * sin_att + weight_rep * (fy_rep / f_rep_mag)
         desired_angle = math.atan2(combined_y, combined_x)
         
         # REDUCCIÓN DE VELOCIDAD basada en influencia repulsiva
@@ -1320,207 +1497,49 @@ def combined_potential_speeds(q, q_goal, ir_sensors=None, k_lin=None, k_ang=None
         v_linear = v_base * extra_slowdown
     else:
         # Sin obstáculos detectados, usar directamente el ángulo hacia la meta
-        desired_angle = desired_angle_att
+        desired_angle = math.atan2(dy_goal, dx_goal)
         v_linear = v_base
     
-    # ========== CALCULAR ERROR ANGULAR Y AJUSTAR VELOCIDAD ==========
-    # Calcular el error entre la dirección deseada y la orientación actual del robot
-    theta_rad = math.radians(q[2])
-    angle_error = _wrap_pi(desired_angle - theta_rad)
-    
-    # ⚠️ CRÍTICO: SISTEMA DE PROHIBICIÓN DE GIRO HACIA OBSTÁCULOS LATERALES
-    # Si hay obstáculos laterales detectados con intensidad alta, PROHIBIR giros
-    # hacia ese lado para evitar que el diámetro del robot colisione durante el giro
+    # ========== ERROR ANGULAR, GANANCIA ADAPTATIVA Y VELOCIDADES DE RUEDA ==========
+    # La parte final del control es aritmética escalar pura y se ejecuta en un
+    # único kernel compilado (_combined_command_core). Aquí solo se reúnen sus
+    # entradas: máximos IR crudos de cada lado (para prohibir giros hacia
+    # obstáculos laterales) y clearance lateral mínimo (para reducir velocidad)
     if ir_sensors and len(ir_sensors) >= 7:
-        # Sensores laterales izquierdos: 0 (esquina), 1 (intermedio)
+        # Izquierda: sensores 0 (esquina) y 1; derecha: 5 y 6 (esquina)
         max_left_lateral = max(ir_sensors[0], ir_sensors[1])
-        # Sensores laterales derechos: 5 (intermedio), 6 (esquina)
         max_right_lateral = max(ir_sensors[5], ir_sensors[6])
-        
-        # Si hay obstáculo lateral CRÍTICO y queremos girar hacia ese lado, CORREGIR dirección
-        if max_left_lateral >= config.IR_THRESHOLD_CRITICAL and angle_error > 0.3:
-            # Obstáculo a la IZQUIERDA y queremos girar a la IZQUIERDA (angle_error > 0)
-            # FORZAR giro a la derecha o mantener curso recto
-            angle_error = min(angle_error, 0.1)  # Limitar giro izquierdo a casi 0
-            
-        elif max_right_lateral >= config.IR_THRESHOLD_CRITICAL and angle_error < -0.3:
-            # Obstáculo a la DERECHA y queremos girar a la DERECHA (angle_error < 0)
-            # FORZAR giro a la izquierda o mantener curso recto
-            angle_error = max(angle_error, -0.1)  # Limitar giro derecho a casi 0
-        
-        # Reducción adicional DRÁSTICA si hay obstáculos laterales en ADVERTENCIA
-        elif max_left_lateral >= config.IR_THRESHOLD_WARNING and angle_error > 0.5:
-            # Reducir el giro izquierdo a la mitad
-            angle_error *= 0.5
-            
-        elif max_right_lateral >= config.IR_THRESHOLD_WARNING and angle_error < -0.5:
-            # Reducir el giro derecho a la mitad
-            angle_error *= 0.5
-    
-    # MODIFICADO: Control inteligente con MOVIMIENTO EN ARCO GARANTIZADO
-    # El robot SIEMPRE avanza y corrige mediante velocidades diferenciales
-    # NUNCA gira sobre su propio eje
-    
-    # Calcular factor de reducción basado en el error angular
-    angle_factor = math.cos(angle_error)
-    
-    # CLAVE: Definir velocidad mínima según distancia a la meta
-    if distance > 50.0:
-        # Lejos de la meta: moderar reducción para mantener avance suficiente
-        min_factor = 0.4
-    elif distance > 20.0:
-        # Distancia media
-        min_factor = 0.3
     else:
-        # Cerca de la meta
-        min_factor = 0.2
-    
-    # Aplicar el factor con el mínimo garantizado
-    if angle_factor < min_factor:
-        angle_factor = min_factor
-    
-    # Aplicar reducción (pero siempre manteniendo velocidad mínima)
-    v_linear *= angle_factor
-    
-    # REDUCCIÓN MODERADA por obstáculos LATERALES muy cerca
-    # MEJORADO: Menos agresivo con umbrales actualizados y estimaciones precisas
-    # Los obstáculos laterales ahora se detectan más cerca de su distancia real
-    if ir_sensors and len(ir_sensors) >= 7:
-        # Calcular clearance lateral mínimo usando distancias reales
-        lateral_indices = [0, 1, 5, 6]
-        min_lateral_clearance = float('inf')
-        
-        for idx in lateral_indices:
-            if ir_sensors[idx] >= config.IR_THRESHOLD_DETECT:
-                dist = ir_value_to_distance(ir_sensors[idx], sensor_index=idx)
-                clearance = dist - config.ROBOT_RADIUS_CM
+        max_left_lateral = 0.0
+        max_right_lateral = 0.0
+    
+    min_lateral_clearance = math.inf
+    if obstacles_detected and len(ir_sensors) >= 7:
+        for idx in (0, 1, 5, 6):
+            if ir_sensors[idx] >= ir_detect:
+                clearance = clearances[idx]
                 if clearance < min_lateral_clearance:
                     min_lateral_clearance = clearance
-        
-        # Reducir velocidad solo si clearance lateral es realmente pequeño
-        if min_lateral_clearance < 5.0:
-            # Clearance crítico (<5cm) → Reducir a 40%
-            v_linear *= 0.4
-        elif min_lateral_clearance < 10.0:
-            # Clearance bajo (5-10cm) → Reducir a 65%
-            v_linear *= 0.65
-        elif min_lateral_clearance < 15.0:
-            # Clearance moderado (10-15cm) → Reducir a 80%
-            v_linear *= 0.8
-    
-    # GARANTÍA ADICIONAL: velocidad mínima absoluta cuando estamos lejos Y sin obstáculos críticos
-    if distance > 30.0 and v_linear < 8.0 and safety_level == "CLEAR":
-        v_linear = 8.0
-    
-    # ========== CALCULAR VELOCIDAD ANGULAR ==========
-    # La velocidad angular es proporcional al error angular, permitiendo corrección
-    # de orientación más rápida cuando el error es mayor. Esto es especialmente
-    # importante durante evasión de obstáculos cuando necesitamos cambiar dirección rápidamente
-    
-    # 🔧 MEJORA CRÍTICA: GANANCIA ANGULAR ADAPTATIVA PARA ELIMINAR ZIG-ZAG
-    # Problema: K_ANGULAR=3.0 causa ZIG-ZAG en navegación libre (sin obstáculos)
-    # Solución: Reducir ganancia cuando NO hay obstáculos significativos detectados
-    # Esto permite trayectorias suaves y rectas en navegación libre, pero mantiene
-    # capacidad de evasión rápida cuando detecta obstáculos reales
-    
-    # Verificar si hay obstáculos REALES (no ruido de sensores)
-    # Subir el umbral para considerar “libre” con más frecuencia y suavizar giros
-    OBSTACLE_THRESHOLD_FOR_SMOOTH_NAV = 100  # antes 50
-    has_significant_obstacles = (max_ir_all >= OBSTACLE_THRESHOLD_FOR_SMOOTH_NAV)
-    
-    if has_significant_obstacles:
-        # HAY OBSTÁCULOS REALES: Usar ganancia completa para evasión rápida
-        k_ang_adjusted = k_ang  # Mantener K_ANGULAR=3.0 completo
-    else:
-        # SIN OBSTÁCULOS O SOLO RUIDO: Reducir más la ganancia para navegación recta
-        # Esto elimina todavía más el zig-zag en espacio libre
-        k_ang_adjusted = k_ang * 0.33  # De 3.0 → ~1.0 para trayectorias rectas
     
-    # ========== MODO ESCAPE: AUMENTAR CAPACIDAD DE GIRO ==========
-    # Si estamos atrapados, necesitamos poder girar más rápido para encontrar salida
-    if is_trapped:
-        k_ang_adjusted = k_ang * config.TRAP_ANGULAR_BOOST
-    
-    # Boost por obstáculos laterales cercanos (solo si no estamos en modo trampa)
-    elif max_ir_lateral >= config.IR_THRESHOLD_CRITICAL:
-        # Obstáculo lateral CRÍTICO: aumentar ganancia angular 50%
-        k_ang_adjusted = k_ang * 1.5
-    elif max_ir_lateral >= config.IR_THRESHOLD_WARNING:
-        # Obstáculo lateral en ADVERTENCIA: aumentar ganancia angular 25%
-        k_ang_adjusted = k_ang * 1.25
-    
-    # MEJORA: Reducir ganancia angular cerca del objetivo para evitar oscilación
-    # Cuando estamos muy cerca (< 15cm), reducimos k_ang progresivamente para
-    # permitir convergencia suave sin oscilaciones (pero solo si NO hay obstáculos laterales)
-    if distance < 15.0 and max_ir_lateral < config.IR_THRESHOLD_CAUTION and not is_trapped:
-        # Reducir k_ang linealmente de 100% a 30% cuando dist va de 15cm a 5cm
-        reduction_factor = 0.3 + 0.7 * ((distance - 5.0) / 10.0)
-        reduction_factor = max(0.3, min(1.0, reduction_factor))
-        k_ang_adjusted = k_ang_adjusted * reduction_factor
-    
-    omega = k_ang_adjusted * angle_error
-    
-    # Convertir el límite de velocidad angular y saturar
-    omega_max_rad_s = config.W_MAX_CM_S / (config.WHEEL_BASE_CM / 2.0)
-    omega = max(-omega_max_rad_s, min(omega_max_rad_s, omega))
-    
-    # ========== RESTRICCIÓN PARA NAVEGACIÓN EN ARCO ==========
-    # CLAVE: Limitar omega para que ambas ruedas siempre avancen (no giros sobre eje)
-    # Si omega es muy grande, una rueda iría hacia atrás, causando giro en lugar de arco
-    # Forzamos que la rueda más lenta siempre tenga velocidad >= MIN_WHEEL_SPEED
-    half_base = config.WHEEL_BASE_CM / 2.0
-    
-    # Definir velocidad mínima de rueda según distancia al objetivo
-    if distance > 30.0:
-        # LEJOS: Mantener ambas ruedas con velocidad mínima significativa
-        min_wheel_speed = 4.0  # cm/s - garantiza arco suave
-    elif distance > 10.0:
-        # MEDIO: Permitir velocidades de rueda más bajas
-        min_wheel_speed = 2.0  # cm/s
+    # Todos los escalares se pasan como float/bool: las lecturas IR y los
+    # umbrales de config son enteros, y cada combinación de tipos distinta
+    # obligaría a Numba a compilar otra versión del kernel en mitad del control
+    v_left, v_right, omega, v_linear, angle_error = _combined_command_core(
+        float(desired_angle), float(q.th_rad), float(v_linear), float(distance), float(k_ang),
+        float(max_left_lateral), float(max_right_lateral), float(min_lateral_clearance),
+        safety_level == "CLEAR", float(max_ir_all), float(max_ir_lateral), bool(is_trapped),
+        float(ir_critical), float(ir_warning), float(config.IR_THRESHOLD_CAUTION),
+        float(config.TRAP_ANGULAR_BOOST), float(tol_dist), float(v_max),
+        c.OMEGA_MAX_RAD_S, c.HALF_BASE_CM
+    )
+    
+    # Obstáculos que proyectaría ir_sensors_to_obstacles: lecturas crudas que
+    # superan el umbral de detección en sensores con ángulo configurado (solo
+    # hace falta contarlos, no calcular su posición)
+    if obstacles_detected and len(ir_sensors) >= 7:
+        num_obstacles = int(np.count_nonzero((ir_arr >= ir_detect) & _IR_HAS_ANGLE))
     else:
-        # CERCA: Permitir casi detenerse para convergencia precisa
-        min_wheel_speed = 0.0  # cm/s
-    
-    # Aplicar restricción de arco siempre que no estemos en la meta
-    if distance > config.TOL_DIST_CM and v_linear > min_wheel_speed:
-        # Calcular el omega máximo que mantiene la rueda más lenta >= min_wheel_speed
-        # Queremos: v_linear - half_base * |omega| >= min_wheel_speed
-        # Por lo tanto: |omega| <= (v_linear - min_wheel_speed) / half_base
-        max_omega_for_arc = (v_linear - min_wheel_speed) / half_base
-        if abs(omega) > max_omega_for_arc:
-            # Reducir omega para mantener navegación en arco
-            omega = math.copysign(max_omega_for_arc, omega)
-    
-    # ========== CONVERSIÓN A VELOCIDADES DE RUEDA ==========
-    # Convertir velocidad lineal y angular en velocidades individuales de rueda
-    # usando la cinemática diferencial del robot
-    v_left = v_linear - half_base * omega
-    v_right = v_linear + half_base * omega
-    
-    # CRÍTICO: GARANTIZAR NAVEGACIÓN EN ARCO (sin rotación sobre eje)
-    # Si alguna rueda tiene velocidad negativa (hacia atrás), el robot giraría
-    # sobre su eje en lugar de moverse en arco. Forzamos ambas ruedas >= 0
-    # SOLO cuando estamos lejos del objetivo (cuando estamos cerca, permitimos
-    # giros más cerrados para convergencia precisa)
-    if distance > config.TOL_DIST_CM * 2:  # Más de 10cm del objetivo
-        if v_left < 0 or v_right < 0:
-            # Una rueda iría hacia atrás - reducir omega para mantener arco
-            # Calcular el omega máximo que mantiene ambas ruedas >= 0
-            if v_linear > 0:
-                max_omega_positive = v_linear / half_base
-                # Limitar omega a este valor (con el signo apropiado)
-                if omega > max_omega_positive:
-                    omega = max_omega_positive * 0.95  # 95% para margen
-                elif omega < -max_omega_positive:
-                    omega = -max_omega_positive * 0.95
-                
-                # Recalcular velocidades de rueda
-                v_left = v_linear - half_base * omega
-                v_right = v_linear + half_base * omega
-    
-    # Saturación final de cada rueda para garantizar límites físicos
-    v_left = max(-config.V_MAX_CM_S, min(config.V_MAX_CM_S, v_left))
-    v_right = max(-config.V_MAX_CM_S, min(config.V_MAX_CM_S, v_right))
+        num_obstacles = 0
     
     # ========== PREPARAR INFORMACIÓN PARA LOGGING ==========
     # Recopilar información detallada sobre el estado del sistema para análisis posterior
@@ -1537,7 +1556,7 @@ def combined_potential_speeds(q, q_goal, ir_sensors=None, k_lin=None, k_ang=None
         'fx_total': fx_att + fx_rep,
         'fy_total': fy_att + fy_rep,
         'force_magnitude': math.hypot(fx_att + fx_rep, fy_att + fy_rep),
-        'num_obstacles': len(ir_sensors_to_obstacles(q, ir_sensors)),
+        'num_obstacles': num_obstacles,
         'potential_type': potential_type,
         'safety_level': safety_level,
         'max_ir_all': max_ir_all,
@@ -1553,4 +1572,34 @@ def combined_potential_speeds(q, q_goal, ir_sensors=None, k_lin=None, k_ang=None
     }
 
     
-    return v_left, v_right, distance, info
\ No newline at end of file
+    return v_left, v_right, distance, info
+
+
+def warmup():
+    """
+    Compila (o carga de la caché en disco) los núcleos antes de la misión.
+    
+    Con Numba la primera llamada a cada núcleo dispara su compilación, que
+    puede tardar varios segundos, y cada combinación distinta de tipos de
+    argumento compila otra versión. Por eso se calienta a través de las
+    mismas funciones públicas que usa el bucle de control (con lecturas IR
+    enteras como las del robot y poses float), una vez por tipo de potencial,
+    con y sin obstáculos. Llamándola al arrancar, antes de conectar con el
+    robot, la primera iteración no paga ninguna compilación. Sin Numba no hace
+    nada útil pero es inocua.
+    
+    Returns:
+        bool: True si los núcleos están compilados con Numba
+    """
+    # Estado propio para no tocar la rampa del estado por defecto
+    state = ControlState()
+    q = (0.0, 0.0, 0.0)
+    q_goal = (100.0, 50.0)
+    # Sin obstáculos y con obstáculos delante y a ambos lados
+    readings = ([0] * 7, [400, 200, 60, 500, 60, 200, 400])
+    for potential_type in POTENTIAL_TYPES:
+        attractive_wheel_speeds(q, q_goal, potential_type=potential_type, state=state)
+        for ir_sensors in readings:
+            combined_potential_speeds(q, q_goal, ir_sensors, potential_type=potential_type,
+                                      state=state)
+    return HAS_NUMBA
@@ -0,0 +1,344 @@
+"""
+Núcleos numéricos compilados con Numba para los campos de potencial
+
+Este módulo contiene la parte puramente numérica del control atractivo y
+repulsivo que se ejecuta en cada iteración del bucle (CONTROL_DT). Las
+funciones solo reciben escalares y arrays NumPy y devuelven escalares para que
+Numba pueda compilarlas a código nativo; todo lo que depende de Python
+(diccionario de info, estado de la rampa, lectura de config, gaps) se
+queda en potential_fields.py, que actúa como envoltorio.
+
+Si Numba no está instalado las mismas funciones se ejecutan como Python normal,
+con el mismo comportamiento (con fastmath los resultados compilados pueden
+diferir en los últimos decimales).
+"""
+import math
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        """Sustituto sin Numba: devuelve la función sin compilar."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda fn: fn
+
+
+@njit(cache=True, fastmath=True)
+def _wrap_pi(angle_rad):
+    """Normaliza un ángulo al rango (-π, π]."""
+    return math.pi - (math.pi - angle_rad) % (2.0 * math.pi)
+
+
+@njit(cache=True, fastmath=True)
+def _arc_wheel_speeds(v_linear, omega, distance, tol_dist, v_max, half_base):
+    """
+    Cinemática diferencial con restricción de arco y saturación final.
+
+    Lejos de la meta ninguna rueda puede ir hacia atrás (sin giros sobre el
+    eje): una rueda es negativa justo cuando |omega| supera v_linear/half_base,
+    así que basta con recortar omega (al 95% de ese límite) antes de calcular
+    las ruedas una única vez.
+
+    Returns:
+        tuple: (v_left, v_right, omega) con omega ya recortado
+    """
+    if distance > tol_dist * 2 and v_linear > 0:
+        max_omega_positive = v_linear / half_base
+        if omega > max_omega_positive:
+            omega = max_omega_positive * 0.95
+        elif omega < -max_omega_positive:
+            omega = -max_omega_positive * 0.95
+
+    # Diferencia de velocidad entre cada rueda y el centro (una sola vez)
+    delta = half_base * omega
+    v_left = v_linear - delta
+    v_right = v_linear + delta
+
+    # Saturación final de cada rueda a ±v_max
+    v_left = v_max if v_left > v_max else (-v_max if v_left < -v_max else v_left)
+    v_right = v_max if v_right > v_max else (-v_max if v_right < -v_max else v_right)
+    return v_left, v_right, omega
+
+
+@njit(cache=True, fastmath=True)
+def _attractive_magnitude(distance, k_lin, ptype_id):
+    """
+    Magnitud de la fuerza atractiva (y velocidad lineal base) a una distancia.
+    
+    Args:
+        distance: Distancia a la meta (cm)
+        k_lin: Ganancia lineal ya resuelta
+        ptype_id: Tipo de potencial como entero (0=linear, 1=quadratic,
+            2=conic, 3=exponential; cualquier otro se trata como lineal)
+    
+    Returns:
+        float: Magnitud de la fuerza
+    """
+    if ptype_id == 1:
+        # Cuadrática: F = k * d² / 10
+        return k_lin * (distance ** 2) / 10.0
+    if ptype_id == 2:
+        # Cónica con saturación a 100 cm: F = k * min(d, 100) * 2
+        return k_lin * min(distance, 100.0) * 2.0
+    if ptype_id == 3:
+        # Exponencial: F = k * (1 - e^(-d/50)) * 20
+        return k_lin * (1.0 - math.exp(-distance / 50.0)) * 20.0
+    # Lineal (y valor por defecto): F = k * d
+    return k_lin * distance
+
+
+@njit(cache=True, fastmath=True)
+def _attractive_core(x, y, th_deg, gx, gy, k_lin, k_ang, ptype_id, last_v,
+                     tol_dist, v_max, decel_zone, v_approach_min, v_start_min,
+                     max_delta_v, omega_max_rad_s, half_base):
+    """
+    Cálculo escalar de attractive_wheel_speeds.
+
+    Args:
+        x, y, th_deg: Pose actual del robot (cm, cm, grados)
+        gx, gy: Coordenadas de la meta (cm)
+        k_lin, k_ang: Ganancias ya resueltas
+        ptype_id: Tipo de potencial como entero (0=linear, 1=quadratic,
+            2=conic, 3=exponential)
+        last_v: Velocidad lineal de la iteración anterior (rampa)
+        tol_dist ... half_base: Constantes de config (y derivadas) pasadas
+            como escalares
+
+    Returns:
+        tuple: (v_left, v_right, distance, v_linear, omega, angle_error,
+            angle_factor, last_v) con last_v ya actualizado para la rampa
+    """
+    # Vector de error de posición y ángulo hacia la meta
+    dx = gx - x
+    dy = gy - y
+    distance = math.hypot(dx, dy)
+    theta_rad = math.radians(th_deg)
+    desired_angle = math.atan2(dy, dx)
+    angle_error = _wrap_pi(desired_angle - theta_rad)
+
+    # ========== VELOCIDAD LINEAL SEGÚN FUNCIÓN DE POTENCIAL ==========
+    v_linear = _attractive_magnitude(distance, k_lin, ptype_id)
+
+    # ========== LÍMITES, DESACELERACIÓN Y RAMPA ==========
+    if distance < tol_dist:
+        v_linear = 0.0
+    else:
+        v_linear = min(v_max, v_linear)
+
+        # Zona de desaceleración progresiva con velocidad mínima de aproximación
+        if distance < decel_zone:
+            v_linear = max(v_linear * (distance / decel_zone), v_approach_min)
+
+        # Arranque suave y límite de aceleración (la bajada es libre)
+        if last_v < v_start_min:
+            v_linear = max(v_linear, v_start_min)
+        if v_linear > last_v:
+            v_linear = min(v_linear, last_v + max_delta_v)
+        last_v = v_linear
+
+    # ========== REDUCCIÓN POR ERROR ANGULAR (MOVIMIENTO EN ARCO) ==========
+    angle_factor = math.cos(angle_error)
+    # Mínimo 60% lejos (>50cm), 40% a media distancia (>20cm) y 20% cerca;
+    # el tramo se elige sumando comparaciones en lugar de encadenar ramas
+    min_factor = (0.2, 0.4, 0.6)[(distance > 20.0) + (distance > 50.0)]
+    if angle_factor < min_factor:
+        angle_factor = min_factor
+    v_linear *= angle_factor
+
+    # Velocidad mínima absoluta cuando estamos lejos
+    if distance > 30.0 and v_linear < v_start_min:
+        v_linear = v_start_min
+
+    # ========== VELOCIDAD ANGULAR ==========
+    # Ganancia a la mitad para evitar zig-zag en navegación libre
+    omega = k_ang * 0.5 * angle_error
+    omega = max(-omega_max_rad_s, min(omega_max_rad_s, omega))
+
+    # ========== RESTRICCIÓN PARA NAVEGACIÓN EN ARCO ==========
+    # Velocidad mínima de la rueda lenta: 4 cm/s lejos (>30cm), 2 cm/s a media
+    # distancia (>10cm) y 0 cerca de la meta
+    min_wheel_speed = 2.0 * ((distance > 10.0) + (distance > 30.0))
+
+    if distance > tol_dist and v_linear > min_wheel_speed:
+        max_omega_for_arc = (v_linear - min_wheel_speed) / half_base
+        if abs(omega) > max_omega_for_arc:
+            omega = math.copysign(max_omega_for_arc, omega)
+
+    # ========== CINEMÁTICA DIFERENCIAL ==========
+    v_left, v_right, omega = _arc_wheel_speeds(v_linear, omega, distance, tol_dist,
+                                               v_max, half_base)
+    return v_left, v_right, distance, v_linear, omega, angle_error, angle_factor, last_v
+
+
+@njit(cache=True, fastmath=True)
+def _repulsive_core(ir, distances, cos_tab, sin_tab, has_angle, gap_mask, cth, sth,
+                    k_rep, d_influence, d_safe, inv_d_safe, robot_radius, ir_detect,
+                    gap_factor):
+    """
+    Cálculo de repulsive_force para los siete sensores en un solo bucle.
+    
+    Calcula el clearance de cada obstáculo y la magnitud de la fuerza, la
+    acumula en el marco del robot y rota la suma al marco global una vez al
+    final.
+    
+    Args:
+        ir: Array float con las lecturas IR crudas
+        distances: Distancia estimada de cada sensor (ir_values_to_distances)
+        cos_tab, sin_tab: Coseno/seno del ángulo de montaje de cada sensor
+        has_angle: Array bool, True para los sensores con ángulo configurado
+        gap_mask: Array bool, True para los sensores en el borde de un gap
+            navegable (su fuerza se multiplica por gap_factor)
+        cth, sth: Coseno/seno de la orientación del robot
+        k_rep ... gap_factor: Ganancia y constantes de config como escalares
+            (inv_d_safe = 1/d_safe, precalculado)
+    
+    Returns:
+        tuple: (fx, fy) con la fuerza repulsiva total en el marco global
+    """
+    fx_local = 0.0
+    fy_local = 0.0
+    for i in range(ir.shape[0]):
+        ir_value = ir[i]
+        if ir_value < ir_detect or not has_angle[i]:
+            continue
+        
+        d_obstacle = distances[i]
+        if d_obstacle >= d_influence:
+            continue
+        clearance = d_obstacle - robot_radius
+        
+        # Los tres tramos del modelo se evalúan siempre (con el clearance
+        # acotado para no dividir por cero) y se eligen multiplicando por las
+        # comparaciones: sin saltos que dependan de la lectura
+        c = max(clearance, 1e-3)
+        term = (1.0 / c) - inv_d_safe
+        mag_a = k_rep * 10.0
+        mag_b = k_rep * (term * term)
+        mag_c = k_rep * math.pow(d_safe / c, 3.0) * (1.0 - (d_obstacle / d_influence))
+        t = clearance < 1.0
+        u = (not t) and clearance < d_safe
+        force_magnitude = t * mag_a + u * mag_b + (not (t or u)) * mag_c
+        
+        if gap_mask[i]:
+            force_magnitude *= gap_factor
+        
+        fx_local += force_magnitude * cos_tab[i]
+        fy_local += force_magnitude * sin_tab[i]
+    
+    # La fuerza apunta en dirección opuesta al obstáculo (cambio de signo)
+    return -(cth * fx_local - sth * fy_local), -(sth * fx_local + cth * fy_local)
+
+
+@njit(cache=True)
+def _combined_command_core(desired_angle, th_rad, v_linear, distance, k_ang,
+                           max_left_lateral, max_right_lateral, min_lateral_clearance,
+                           is_clear, max_ir_all, max_ir_lateral, is_trapped,
+                           ir_critical, ir_warning, ir_caution, trap_angular_boost,
+                           tol_dist, v_max, omega_max_rad_s, half_base):
+    """
+    Parte final de combined_potential_speeds: del ángulo deseado a las ruedas.
+    
+    Aplica la prohibición de giro hacia obstáculos laterales, la reducción
+    por error angular y por clearance lateral, la ganancia angular adaptativa,
+    la restricción de arco y la cinemática diferencial. Se compila sin
+    fastmath porque min_lateral_clearance es infinito cuando ningún sensor
+    lateral detecta nada.
+    
+    Args:
+        desired_angle, th_rad: Dirección deseada (ya combinada con la
+            repulsiva) y orientación del robot, en radianes
+        v_linear: Velocidad lineal tras la reducción por influencia repulsiva
+        distance: Distancia a la meta (cm)
+        k_ang: Ganancia angular ya resuelta
+        max_left_lateral, max_right_lateral: Máximo IR crudo de los sensores
+            0-1 y 5-6 (0 si no hay lecturas)
+        min_lateral_clearance: Clearance mínimo de los sensores laterales que
+            detectan algo (inf si ninguno)
+        is_clear: True si el nivel de seguridad es CLEAR
+        max_ir_all, max_ir_lateral: Máximos IR normalizados (todos y 0/6)
+        is_trapped: True si el robot está atrapado en una C
+        ir_critical ... half_base: Constantes de config como escalares
+    
+    Returns:
+        tuple: (v_left, v_right, omega, v_linear, angle_error)
+    """
+    angle_error = _wrap_pi(desired_angle - th_rad)
+    
+    # Prohibición de giro hacia obstáculos laterales críticos y reducción del
+    # giro hacia los que están en advertencia
+    if max_left_lateral >= ir_critical and angle_error > 0.3:
+        angle_error = min(angle_error, 0.1)
+    elif max_right_lateral >= ir_critical and angle_error < -0.3:
+        angle_error = max(angle_error, -0.1)
+    elif max_left_lateral >= ir_warning and angle_error > 0.5:
+        angle_error *= 0.5
+    elif max_right_lateral >= ir_warning and angle_error < -0.5:
+        angle_error *= 0.5
+    
+    # Reducción por error angular con mínimo según la distancia a la meta
+    # (40% lejos, 30% a media distancia, 20% cerca)
+    angle_factor = math.cos(angle_error)
+    if distance > 50.0:
+        min_factor = 0.4
+    elif distance > 20.0:
+        min_factor = 0.3
+    else:
+        min_factor = 0.2
+    if angle_factor < min_factor:
+        angle_factor = min_factor
+    v_linear *= angle_factor
+    
+    # Reducción por clearance lateral (<5cm → 40%, <10cm → 65%, <15cm → 80%)
+    if min_lateral_clearance < 5.0:
+        v_linear *= 0.4
+    elif min_lateral_clearance < 10.0:
+        v_linear *= 0.65
+    elif min_lateral_clearance < 15.0:
+        v_linear *= 0.8
+    
+    # Velocidad mínima absoluta lejos de la meta y sin obstáculos
+    if distance > 30.0 and v_linear < 8.0 and is_clear:
+        v_linear = 8.0
+    
+    # Ganancia angular adaptativa: reducida en espacio libre (sin zig-zag),
+    # aumentada en modo trampa o con obstáculos laterales
+    if max_ir_all >= 100:
+        k_ang_adjusted = k_ang
+    else:
+        k_ang_adjusted = k_ang * 0.33
+    if is_trapped:
+        k_ang_adjusted = k_ang * trap_angular_boost
+    elif max_ir_lateral >= ir_critical:
+        k_ang_adjusted = k_ang * 1.5
+    elif max_ir_lateral >= ir_warning:
+        k_ang_adjusted = k_ang * 1.25
+    
+    # Convergencia suave cerca de la meta (de 100% a 30% entre 15 y 5 cm)
+    if distance < 15.0 and max_ir_lateral < ir_caution and not is_trapped:
+        reduction_factor = 0.3 + 0.7 * ((distance - 5.0) / 10.0)
+        reduction_factor = max(0.3, min(1.0, reduction_factor))
+        k_ang_adjusted = k_ang_adjusted * reduction_factor
+    
+    omega = k_ang_adjusted * angle_error
+    omega = max(-omega_max_rad_s, min(omega_max_rad_s, omega))
+    
+    # Restricción de arco: la rueda lenta mantiene al menos 4 cm/s lejos
+    # (>30cm), 2 cm/s a media distancia (>10cm) y 0 cerca de la meta
+    if distance > 30.0:
+        min_wheel_speed = 4.0
+    elif distance > 10.0:
+        min_wheel_speed = 2.0
+    else:
+        min_wheel_speed = 0.0
+    if distance > tol_dist and v_linear > min_wheel_speed:
+        max_omega_for_arc = (v_linear - min_wheel_speed) / half_base
+        if abs(omega) > max_omega_for_arc:
+            omega = math.copysign(max_omega_for_arc, omega)
+    
+    v_left, v_right, omega = _arc_wheel_speeds(v_linear, omega, distance, tol_dist,
+                                               v_max, half_base)
+    return v_left, v_right, omega, v_linear, angle_error
@@ -105,16 +105,47 @@ NOTAS IMPORTANTES:
 - El sistema valida que los puntos estén al menos a 10 cm de distancia
 """
 
+from contextlib import contextmanager
 import json
-import math
+from math import atan2, cos, degrees, hypot, radians, sin, sqrt
+import os
 import sys
 from pathlib import Path
 
 import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-from matplotlib.patches import FancyArrow, Circle
+from matplotlib.collections import PatchCollection
+from matplotlib.patches import FancyArrow, Circle, Rectangle
 import numpy as np
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+
+if HAS_NUMBA:
+    # Firma explícita: se compila al importar el módulo (o se carga de la caché
+    # en disco) y el primer cálculo de la ruta no paga la compilación
+    @njit('float64(float64[:], float64[:])', cache=True)
+    def _path_length(xs, ys):
+        """Longitud de la polilínea (xs[i], ys[i]) en cm."""
+        total = 0.0
+        for i in range(1, xs.shape[0]):
+            total += sqrt((xs[i] - xs[i - 1]) ** 2 + (ys[i] - ys[i - 1]) ** 2)
+        return total
+
+else:
+    def _path_length(xs, ys):
+        """Longitud de la polilínea (xs[i], ys[i]) en cm."""
+        return float(np.hypot(np.diff(xs), np.diff(ys)).sum())
+
 
 class VisualPointConfigurator:
     """
@@ -140,7 +171,12 @@ class VisualPointConfigurator:
         # Estado de configuración
         self.q_i = None  # Punto inicial (x, y)
         self.orientation_point = None  # Punto para definir orientación
-        self.waypoints = []  # Lista de puntos intermedios [(x1, y1), (x2, y2), ...]
+        # Ruta en un buffer (N, 2) que crece duplicando su capacidad: la fila 0
+        # es q_i y las siguientes los puntos intermedios, así la línea de ruta
+        # y el resumen usan cortes del buffer sin apilar arrays nuevos.
+        # self.waypoints expone solo las filas de waypoints ocupadas
+        self._route_xy = np.empty((16, 2), dtype=np.float64)
+        self._n_wp = 0
         self.q_f = None  # Punto final (x, y)
         self.theta = None  # Orientación en grados
         
@@ -158,21 +194,65 @@ class VisualPointConfigurator:
         self.ax = None
         self.point_initial = None
         self.point_final = None
-        self.waypoint_points = []  # Lista de círculos de waypoints
+        self._waypoint_markers = None  # Colección con los círculos de waypoints
         self.waypoint_labels = []  # Lista de etiquetas de waypoints
-        self.path_lines = []  # Lista de líneas que conectan los puntos
+        self._map_labels = []  # Etiquetas fijas de inicio, θ, meta y distancia total
+        self._path_line = None  # Línea q_i → q_1 → ... → último waypoint
+        self._final_line = None  # Segmento último punto → q_f
         self.orientation_arrow = None
         self.robot_circle = None
         self.info_text = None
-        self.orientation_label = None
+        self._last_title = None  # (texto, color) del último título aplicado
         
         # Control de arrastre para orientación
         self.dragging_orientation = False
-        self.temp_orientation_arrow = None
+        self._preview_arrow = None  # Flecha de vista previa (persistente)
+        self._preview_text = None  # Etiqueta θ de la vista previa (persistente)
+        self._pending_xy = None  # Última posición del mouse pendiente de dibujar
+        self._bg = None  # Fondo capturado para blitting durante el arrastre
+        self._static_bg = None  # Figura sin ruta ni título para blitting de waypoints
+        self._capturing = False  # True durante los draw() propios para capturar fondos
+        self._last_xy_px = None  # Último píxel procesado durante el arrastre
+        self._motion_cid = None  # Conexión de motion_notify_event (solo al arrastrar)
+        self._motion_timer = None
+        
+        # Redibujado agrupado (ver _batch_updates)
+        self._batch_depth = 0
+        self._dirty = False
+        
+        # Tabla de teclas → acción (ver _on_key)
+        self._key_handlers = {
+            'r': self._reset,  # Resetear configuración
+            'u': self._undo_last_point,  # Deshacer último punto
+            ' ': self._on_space_key,  # Marcar siguiente como punto final
+            's': self._on_save_key,  # Guardar y salir
+            'q': self._on_quit_key,  # Salir sin guardar
+        }
         
         # Configurar la interfaz gráfica
         self._setup_plot()
         
+    @property
+    def waypoints(self):
+        """Puntos intermedios configurados como array (N, 2) de [x, y] (vista)."""
+        return self._route_xy[1:self._n_wp + 1]
+    
+    def _append_waypoint(self, waypoint):
+        """Añade un waypoint al buffer, duplicando su capacidad si está lleno."""
+        used = self._n_wp + 1  # q_i + waypoints
+        if used == self._route_xy.shape[0]:
+            grown = np.empty((2 * used, 2), dtype=np.float64)
+            grown[:used] = self._route_xy
+            self._route_xy = grown
+        self._route_xy[used] = waypoint
+        self._n_wp += 1
+    
+    def _pop_waypoint(self):
+        """Quita el último waypoint y lo devuelve como tupla (x, y)."""
+        removed = tuple(self._route_xy[self._n_wp].tolist())
+        self._n_wp -= 1
+        return removed
+    
     def _setup_plot(self):
         """Configura la figura de matplotlib y el mapa interactivo."""
         # Crear figura con tamaño adecuado
@@ -189,9 +269,8 @@ class VisualPointConfigurator:
         # Etiquetas y título
         self.ax.set_xlabel('X (cm)', fontsize=12, fontweight='bold')
         self.ax.set_ylabel('Y (cm)', fontsize=12, fontweight='bold')
-        self.ax.set_title('Configuración de Puntos de Navegación\n' +
-                         'Paso 1: Click para PUNTO INICIAL (verde)',
-                         fontsize=14, fontweight='bold', pad=20)
+        self._set_title('Configuración de Puntos de Navegación\n' +
+                       'Paso 1: Click para PUNTO INICIAL (verde)')
         
         # Agregar cuadrícula para facilitar colocación de puntos
         self.ax.grid(True, linestyle='--', alpha=0.4, linewidth=0.8)
@@ -210,34 +289,28 @@ class VisualPointConfigurator:
         self.ax.set_yticks(minor_ticks_y, minor=True)
         self.ax.grid(which='minor', linestyle=':', alpha=0.2, linewidth=0.5)
         
-        # Sombrear el área fuera del mapa para indicar zona de orientación
-        from matplotlib.patches import Rectangle
-        # Área gris arriba
-        self.ax.add_patch(Rectangle((0, self.map_size), self.map_size, margin, 
-                                   facecolor='lightgray', alpha=0.15, zorder=0))
-        # Área gris a la derecha
-        self.ax.add_patch(Rectangle((self.map_size, 0), margin, self.map_size, 
-                                   facecolor='lightgray', alpha=0.15, zorder=0))
-        # Área gris abajo
-        self.ax.add_patch(Rectangle((0, -margin), self.map_size, margin, 
-                                   facecolor='lightgray', alpha=0.15, zorder=0))
-        # Área gris a la izquierda
-        self.ax.add_patch(Rectangle((-margin, 0), margin, self.map_size, 
-                                   facecolor='lightgray', alpha=0.15, zorder=0))
-        # Esquinas
-        self.ax.add_patch(Rectangle((-margin, -margin), margin, margin, 
-                                   facecolor='lightgray', alpha=0.15, zorder=0))
-        self.ax.add_patch(Rectangle((self.map_size, -margin), margin, margin, 
-                                   facecolor='lightgray', alpha=0.15, zorder=0))
-        self.ax.add_patch(Rectangle((-margin, self.map_size), margin, margin, 
-                                   facecolor='lightgray', alpha=0.15, zorder=0))
-        self.ax.add_patch(Rectangle((self.map_size, self.map_size), margin, margin, 
-                                   facecolor='lightgray', alpha=0.15, zorder=0))
+        # Sombrear el área fuera del mapa para indicar zona de orientación.
+        # Las 8 zonas grises (4 lados y 4 esquinas) forman una sola
+        # PatchCollection: un único artista que dibujar en lugar de 8
+        # Rectangle sueltos
+        margin_areas = [
+            Rectangle((0, self.map_size), self.map_size, margin),         # Arriba
+            Rectangle((self.map_size, 0), margin, self.map_size),         # Derecha
+            Rectangle((0, -margin), self.map_size, margin),               # Abajo
+            Rectangle((-margin, 0), margin, self.map_size),               # Izquierda
+            Rectangle((-margin, -margin), margin, margin),                # Esquinas
+            Rectangle((self.map_size, -margin), margin, margin),
+            Rectangle((-margin, self.map_size), margin, margin),
+            Rectangle((self.map_size, self.map_size), margin, margin),
+        ]
+        margin_collection = PatchCollection(margin_areas, facecolor='lightgray',
+                                            edgecolor='none', alpha=0.15, zorder=0)
+        self.ax.add_collection(margin_collection)
         
         # Agregar borde al mapa
-        border = patches.Rectangle((0, 0), self.map_size, self.map_size,
-                                   linewidth=3, edgecolor='black',
-                                   facecolor='none')
+        border = Rectangle((0, 0), self.map_size, self.map_size,
+                           linewidth=3, edgecolor='black',
+                           facecolor='none')
         self.ax.add_patch(border)
         
         # Agregar texto de instrucciones en la parte inferior
@@ -254,12 +327,95 @@ class VisualPointConfigurator:
                      verticalalignment='bottom',
                      bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
         
-        # Conectar eventos
+        # Círculos de los waypoints: una sola PatchCollection cuyos paths se
+        # regeneran al añadir o deshacer un waypoint, en lugar de un Circle por
+        # punto (radio de 6 cm en unidades de datos, como antes)
+        self._waypoint_markers = PatchCollection([], facecolor='orange', edgecolor='none',
+                                                 alpha=0.7, zorder=5)
+        self.ax.add_collection(self._waypoint_markers, autolim=False)
+        
+        # Líneas de la ruta: un único Line2D para q_i → waypoints y otro para el
+        # segmento final hacia q_f, actualizados con set_data en lugar de
+        # añadir un artista nuevo por segmento
+        self._path_line, = self.ax.plot([], [], 'b--', linewidth=2, alpha=0.5, zorder=3)
+        self._final_line, = self.ax.plot([], [], 'g--', linewidth=2.5, alpha=0.6, zorder=3)
+        
+        # Artistas de la vista previa de orientación: se crean una sola vez y
+        # durante el arrastre solo se actualizan su posición y su texto, en
+        # lugar de eliminar y reconstruir una FancyArrow y un Text por evento.
+        # Si el backend soporta blitting se marcan como animados: los draw()
+        # completos los omiten y solo se dibujan explícitamente con draw_artist
+        # (sin blitting se dibujan con draw_idle y no pueden ser animados)
+        animated = getattr(self.fig.canvas, 'supports_blit', False)
+        self._preview_arrow = self.ax.annotate(
+            '', xy=(0, 0), xytext=(0, 0),
+            arrowprops=dict(arrowstyle='-|>', color='blue', alpha=0.5,
+                            lw=5, mutation_scale=25),
+            zorder=6, visible=False, animated=animated
+        )
+        self._preview_text = self.ax.text(
+            0, 0, '', ha='center', va='center', fontweight='bold',
+            color='darkblue', fontsize=10, zorder=7, visible=False, animated=animated,
+            bbox=dict(boxstyle='round,pad=0.5', facecolor='lightblue', alpha=0.5)
+        )
+        
+        # Temporizador de un solo disparo (~30 ms) para agrupar los eventos de
+        # movimiento durante el arrastre: la vista previa se redibuja como mucho
+        # ~33 veces por segundo en lugar de una vez por píxel. Es el temporizador
+        # del backend, así que el callback se ejecuta en el hilo de la GUI
+        self._motion_timer = self.fig.canvas.new_timer(interval=30)
+        self._motion_timer.single_shot = True
+        self._motion_timer.add_callback(self._flush_motion)
+        
+        # Conectar eventos. motion_notify_event solo se conecta mientras se
+        # arrastra la orientación (_start_motion_tracking), para no ejecutar un
+        # callback de Python por cada movimiento del mouse el resto del tiempo
         self.fig.canvas.mpl_connect('button_press_event', self._on_mouse_press)
         self.fig.canvas.mpl_connect('button_release_event', self._on_mouse_release)
-        self.fig.canvas.mpl_connect('motion_notify_event', self._on_mouse_move)
         self.fig.canvas.mpl_connect('key_press_event', self._on_key)
+        self.fig.canvas.mpl_connect('draw_event', self._on_draw)
+        
+    @contextmanager
+    def _batch_updates(self):
+        """
+        Agrupa los redibujados pedidos dentro del bloque en un solo draw_idle.
+        
+        Es reentrante: solo el bloque más externo programa el redibujado, y
+        solo si algún cambio lo pidió con _request_draw.
+        """
+        self._batch_depth += 1
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._dirty:
+                self._dirty = False
+                self.fig.canvas.draw_idle()
+    
+    def _request_draw(self):
+        """Marca la figura para redibujar (al salir del lote, o ya si no hay lote)."""
+        if self._batch_depth:
+            self._dirty = True
+        else:
+            self.fig.canvas.draw_idle()
+    
+    def _set_title(self, title, color=None):
+        """
+        Actualiza el título del mapa solo si cambia el texto o el color.
         
+        Evita recalcular la maquetación del título cuando se repite el mismo
+        (p. ej. al añadir varios waypoints seguidos sin cambiar de paso).
+        
+        Args:
+            title: Texto del título
+            color: Color del texto (None para no cambiarlo)
+        """
+        if (title, color) == self._last_title:
+            return
+        self._last_title = (title, color)
+        kwargs = {} if color is None else {'color': color}
+        self.ax.set_title(title, fontsize=14, fontweight='bold', pad=20, **kwargs)
+    
     def _on_mouse_press(self, event):
         """
         Maneja eventos de presión del mouse.
@@ -273,6 +429,9 @@ class VisualPointConfigurator:
             if event.xdata is not None and event.ydata is not None:
                 x, y = event.xdata, event.ydata
                 self.dragging_orientation = True
+                self._start_motion_tracking()
+                self._last_xy_px = (int(event.x), int(event.y))
+                self._capture_preview_background()
                 self._update_orientation_preview(x, y)
             return
         
@@ -287,16 +446,17 @@ class VisualPointConfigurator:
             print(f"\n[ADVERTENCIA] Los puntos deben estar dentro del mapa (0-{self.map_size} cm)")
             return
         
-        if self.step == 0:
-            # Paso 1: Definir punto inicial
-            self._set_initial_point(x, y)
-            
-        elif self.step == 2:
-            # Paso 3: Definir waypoints o punto final
-            if self.waiting_for_final:
-                self._set_final_point(x, y)
-            else:
-                self._add_waypoint(x, y)
+        with self._batch_updates():
+            if self.step == 0:
+                # Paso 1: Definir punto inicial
+                self._set_initial_point(x, y)
+                
+            elif self.step == 2:
+                # Paso 3: Definir waypoints o punto final
+                if self.waiting_for_final:
+                    self._set_final_point(x, y)
+                else:
+                    self._add_waypoint(x, y)
     
     def _on_mouse_release(self, event):
         """
@@ -306,11 +466,48 @@ class VisualPointConfigurator:
             event: Evento de matplotlib con información del release
         """
         if self.step == 1 and self.dragging_orientation:
+            # Descartar la vista previa pendiente: la orientación final se dibuja ahora
+            self._motion_timer.stop()
+            self._pending_xy = None
+            
             # Finalizar la configuración de orientación
             if event.xdata is not None and event.ydata is not None:
                 x, y = event.xdata, event.ydata
                 self._set_orientation(x, y)
             self.dragging_orientation = False
+            self._stop_motion_tracking()
+            self._bg = None
+    
+    def _on_draw(self, event):
+        """
+        Renueva los fondos guardados tras un redibujado completo ajeno.
+        
+        Zoom, desplazamiento, 'Home', la tecla de cuadrícula o redimensionar la
+        ventana cambian lo que hay debajo de la ruta y de la vista previa. El
+        fondo de la vista previa se descarta y se captura en el próximo
+        arrastre; mientras se añaden waypoints, el fondo estático se vuelve a
+        capturar aquí (con la ruta oculta), para que añadir, deshacer o
+        ESPACIO sigan siendo un blitting. Los draw() que hacen las propias
+        capturas no cuentan.
+        """
+        if self._capturing:
+            return
+        self._bg = None
+        self._static_bg = None
+        if self.step == 2 and getattr(self.fig.canvas, 'supports_blit', False):
+            self._capture_static_background()
+    
+    def _start_motion_tracking(self):
+        """Conecta motion_notify_event mientras dura el arrastre de orientación."""
+        if self._motion_cid is None:
+            self._motion_cid = self.fig.canvas.mpl_connect('motion_notify_event',
+                                                           self._on_mouse_move)
+    
+    def _stop_motion_tracking(self):
+        """Desconecta motion_notify_event al terminar el arrastre."""
+        if self._motion_cid is not None:
+            self.fig.canvas.mpl_disconnect(self._motion_cid)
+            self._motion_cid = None
     
     def _on_mouse_move(self, event):
         """
@@ -320,10 +517,28 @@ class VisualPointConfigurator:
             event: Evento de matplotlib con información del movimiento
         """
         if self.step == 1 and self.dragging_orientation:
-            # Actualizar vista previa de orientación mientras arrastra
+            # Descartar eventos sin cambio de píxel (jitter sub-píxel del
+            # trackpad): la vista previa sería idéntica
+            xy_px = (int(event.x), int(event.y))
+            if xy_px == self._last_xy_px:
+                return
+            self._last_xy_px = xy_px
+            
+            # Guardar la posición y arrancar el temporizador si no hay una
+            # actualización pendiente; _flush_motion dibuja la última posición
+            # recibida (arrancarlo en cada evento lo reiniciaría sin parar)
             if event.xdata is not None and event.ydata is not None:
-                x, y = event.xdata, event.ydata
-                self._update_orientation_preview(x, y)
+                if self._pending_xy is None:
+                    self._motion_timer.start()
+                self._pending_xy = (event.xdata, event.ydata)
+    
+    def _flush_motion(self):
+        """Dibuja la vista previa de orientación con la última posición del mouse."""
+        if self._pending_xy is None or not (self.step == 1 and self.dragging_orientation):
+            return
+        x, y = self._pending_xy
+        self._pending_xy = None
+        self._update_orientation_preview(x, y)
     
     def _update_orientation_preview(self, x, y):
         """
@@ -340,50 +555,73 @@ class VisualPointConfigurator:
         dy = y - self.q_i[1]
         
         # Validar distancia mínima para evitar ángulos inestables
-        distance = math.hypot(dx, dy)
+        distance = hypot(dx, dy)
         if distance < 5:
             return
         
-        # Calcular theta temporal
-        temp_theta = math.degrees(math.atan2(dy, dx))
-        
-        # Limpiar flecha temporal anterior
-        if self.temp_orientation_arrow:
-            self.temp_orientation_arrow.remove()
-            self.temp_orientation_arrow = None
-        
-        if self.orientation_label:
-            self.orientation_label.remove()
-            self.orientation_label = None
-        
-        # Dibujar flecha temporal
-        arrow_length = 40
-        arrow_dx = arrow_length * math.cos(math.radians(temp_theta))
-        arrow_dy = arrow_length * math.sin(math.radians(temp_theta))
-        
-        self.temp_orientation_arrow = FancyArrow(
-            self.q_i[0], self.q_i[1],
-            arrow_dx, arrow_dy,
-            width=5, head_width=15, head_length=10,
-            color='blue', alpha=0.5, zorder=6
-        )
-        self.ax.add_patch(self.temp_orientation_arrow)
-        
-        # Agregar etiqueta temporal
-        label_x = self.q_i[0] + arrow_dx * 0.6
-        label_y = self.q_i[1] + arrow_dy * 0.6
-        self.orientation_label = self.ax.text(
-            label_x, label_y, f'θ = {temp_theta:.1f}°',
-            ha='center', va='center', fontweight='bold',
-            color='darkblue', fontsize=10,
-            bbox=dict(boxstyle='round,pad=0.5', facecolor='lightblue', alpha=0.5)
-        )
+        # Calcular theta temporal (solo para la etiqueta)
+        temp_theta = degrees(atan2(dy, dx))
+        
+        # Sin fondo guardado (p. ej. tras redimensionar) hay que capturarlo de
+        # nuevo antes de mostrar la vista previa: es animada, así que un
+        # draw_idle no la dibujaría
+        if self._bg is None:
+            self._capture_preview_background()
+        
+        # Mover la flecha temporal (longitud normalizada a 40 cm). La dirección
+        # sale directamente del vector unitario (dx, dy) / distance, sin pasar
+        # por el ángulo y volver con cos/sin
+        scale = 40 / distance
+        arrow_dx = dx * scale
+        arrow_dy = dy * scale
+        
+        self._preview_arrow.set_position(self.q_i)
+        self._preview_arrow.xy = (self.q_i[0] + arrow_dx, self.q_i[1] + arrow_dy)
+        self._preview_arrow.set_visible(True)
+        
+        # Actualizar etiqueta temporal
+        self._preview_text.set_position((self.q_i[0] + arrow_dx * 0.6,
+                                         self.q_i[1] + arrow_dy * 0.6))
+        self._preview_text.set_text(f'θ = {temp_theta:.1f}°')
+        self._preview_text.set_visible(True)
+        
+        if self._bg is not None:
+            # Blitting: restaurar el mapa estático y dibujar solo la vista previa
+            canvas = self.fig.canvas
+            canvas.restore_region(self._bg)
+            self.ax.draw_artist(self._preview_arrow)
+            self.ax.draw_artist(self._preview_text)
+            canvas.blit(self.ax.bbox)
+        else:
+            self.fig.canvas.draw_idle()
+    
+    def _capture_preview_background(self):
+        """
+        Captura el mapa sin la vista previa para redibujarla con blitting.
         
-        self.fig.canvas.draw_idle()
+        Durante el arrastre solo cambian la flecha y la etiqueta de la vista
+        previa, así que en lugar de redibujar todo el mapa (cuadrícula, zonas
+        grises, puntos) en cada actualización se restaura este fondo y se
+        dibujan únicamente esos dos artistas. Si el backend no soporta
+        blitting, _bg queda en None y se usa draw_idle.
+        """
+        self._bg = None
+        self._hide_orientation_preview()
+        canvas = self.fig.canvas
+        if getattr(canvas, 'supports_blit', False):
+            self._draw_for_capture()
+            self._bg = canvas.copy_from_bbox(self.ax.bbox)
+    
+    def _hide_orientation_preview(self):
+        """Oculta la flecha y la etiqueta de la vista previa de orientación."""
+        self._preview_arrow.set_visible(False)
+        self._preview_text.set_visible(False)
     
     def _set_initial_point(self, x, y):
         """Establece el punto inicial del robot."""
-        self.q_i = (round(x, 2), round(y, 2))
+        # event.xdata/ydata son numpy.float64: guardar floats de Python
+        self.q_i = (float(round(x, 2)), float(round(y, 2)))
+        self._route_xy[0] = self.q_i
         
         # Dibujar punto inicial en verde
         if self.point_initial:
@@ -394,45 +632,39 @@ class VisualPointConfigurator:
         self.ax.add_patch(self.point_initial)
         
         # Agregar etiqueta
-        self.ax.text(x, y + 15, f'INICIO\n({x:.1f}, {y:.1f})',
+        start_label = self.ax.text(x, y + 15, f'INICIO\n({x:.1f}, {y:.1f})',
                     ha='center', va='bottom', fontweight='bold',
                     color='darkgreen', fontsize=10,
                     bbox=dict(boxstyle='round,pad=0.5', facecolor='lightgreen', alpha=0.7))
+        self._map_labels.append(start_label)
         
         # Actualizar título
-        self.ax.set_title('Configuración de Puntos de Navegación\n' +
-                         'Paso 2: ARRASTRA para definir ORIENTACIÓN (mantén click y mueve el mouse)',
-                         fontsize=14, fontweight='bold', pad=20)
+        self._set_title('Configuración de Puntos de Navegación\n' +
+                       'Paso 2: ARRASTRA para definir ORIENTACIÓN (mantén click y mueve el mouse)')
         
         self.step = 1
-        self.fig.canvas.draw()
+        self._request_draw()
     
     def _set_orientation(self, x, y):
         """Establece la orientación inicial del robot."""
-        self.orientation_point = (round(x, 2), round(y, 2))
+        self.orientation_point = (float(round(x, 2)), float(round(y, 2)))
         
         # Calcular ángulo desde punto inicial hacia punto de orientación
         dx = x - self.q_i[0]
         dy = y - self.q_i[1]
         
         # Validar que el punto de orientación no esté demasiado cerca
-        distance = math.hypot(dx, dy)
+        distance = hypot(dx, dy)
         if distance < 5:
             print("\n[ADVERTENCIA] El punto de orientación está muy cerca del punto inicial.")
             print("              Arrastra más lejos para definir mejor la dirección.")
             return
         
         # Calcular theta en grados
-        self.theta = round(math.degrees(math.atan2(dy, dx)), 2)
+        self.theta = round(degrees(atan2(dy, dx)), 2)
         
-        # Limpiar flecha temporal si existe
-        if self.temp_orientation_arrow:
-            self.temp_orientation_arrow.remove()
-            self.temp_orientation_arrow = None
-        
-        if self.orientation_label:
-            self.orientation_label.remove()
-            self.orientation_label = None
+        # Ocultar la vista previa
+        self._hide_orientation_preview()
         
         # Dibujar flecha de orientación FINAL
         if self.orientation_arrow:
@@ -440,8 +672,8 @@ class VisualPointConfigurator:
         
         # Normalizar la longitud de la flecha a 40 cm
         arrow_length = 40
-        arrow_dx = arrow_length * math.cos(math.radians(self.theta))
-        arrow_dy = arrow_length * math.sin(math.radians(self.theta))
+        arrow_dx = arrow_length * cos(radians(self.theta))
+        arrow_dy = arrow_length * sin(radians(self.theta))
         
         self.orientation_arrow = FancyArrow(
             self.q_i[0], self.q_i[1],
@@ -464,18 +696,71 @@ class VisualPointConfigurator:
         # Agregar etiqueta de orientación FINAL
         label_x = self.q_i[0] + arrow_dx * 0.6
         label_y = self.q_i[1] + arrow_dy * 0.6
-        final_label = self.ax.text(label_x, label_y, f'θ = {self.theta:.1f}°',
+        theta_label = self.ax.text(label_x, label_y, f'θ = {self.theta:.1f}°',
                     ha='center', va='center', fontweight='bold',
                     color='darkblue', fontsize=10,
                     bbox=dict(boxstyle='round,pad=0.5', facecolor='lightblue', alpha=0.8))
+        self._map_labels.append(theta_label)
         
         # Actualizar título
-        self.ax.set_title('Configuración de Puntos de Navegación\n' +
-                         'Paso 3: Click para PUNTOS INTERMEDIOS (amarillo) | ESPACIO para marcar FINAL',
-                         fontsize=14, fontweight='bold', pad=20)
+        self._set_title('Configuración de Puntos de Navegación\n' +
+                       'Paso 3: Click para PUNTOS INTERMEDIOS (amarillo) | ESPACIO para marcar FINAL')
         
         self.step = 2
-        self.fig.canvas.draw()
+        self._capture_static_background()
+    
+    def _capture_static_background(self):
+        """
+        Dibuja el mapa y guarda la figura sin título para blitting de waypoints.
+        
+        Tras fijar la orientación, lo único que cambia al añadir waypoints son
+        sus círculos, etiquetas, la línea de ruta y el título, así que se guarda
+        el resto de la figura con esos artistas ocultos y _blit_route solo los
+        dibuja encima. Sin soporte de blitting se hace un draw() normal.
+        """
+        canvas = self.fig.canvas
+        self._static_bg = None
+        if not getattr(canvas, 'supports_blit', False):
+            canvas.draw()
+            return
+        
+        # Con el título oculto draw() no recoloca su posición (la deja fuera
+        # de la figura), así que se guarda y se restaura
+        title_position = self.ax.title.get_position()
+        route_artists = self._route_artists()
+        for artist in route_artists:
+            artist.set_visible(False)
+        self._draw_for_capture()
+        self._static_bg = canvas.copy_from_bbox(self.fig.bbox)
+        for artist in route_artists:
+            artist.set_visible(True)
+        self.ax.title.set_position(title_position)
+        self._blit_route()
+    
+    def _draw_for_capture(self):
+        """draw() completo que _on_draw no toma como un cambio de la vista."""
+        self._capturing = True
+        try:
+            self.fig.canvas.draw()
+        finally:
+            self._capturing = False
+    
+    def _route_artists(self):
+        """Artistas que cambian al añadir waypoints, en orden de dibujo (zorder)."""
+        return [self._path_line, *self.waypoint_labels, self._waypoint_markers, self.ax.title]
+    
+    def _blit_route(self):
+        """Redibuja ruta, waypoints y título sobre el fondo estático guardado."""
+        if self._static_bg is None:
+            # Fondo descartado (zoom, cuadrícula, redimensionar...): volver a capturarlo
+            self._capture_static_background()
+            return
+        
+        canvas = self.fig.canvas
+        canvas.restore_region(self._static_bg)
+        for artist in self._route_artists():
+            self.ax.draw_artist(artist)
+        canvas.blit(self.fig.bbox)
     
     def _add_waypoint(self, x, y):
         """Añade un punto intermedio (waypoint) a la ruta."""
@@ -487,8 +772,8 @@ class VisualPointConfigurator:
         else:
             last_point = self.q_i
         
-        distance = math.hypot(waypoint[0] - last_point[0],
-                             waypoint[1] - last_point[1])
+        distance = hypot(waypoint[0] - last_point[0],
+                         waypoint[1] - last_point[1])
         
         if distance < 10:
             print(f"\n[ADVERTENCIA] El punto está muy cerca del anterior.")
@@ -496,14 +781,11 @@ class VisualPointConfigurator:
             return
         
         # Añadir waypoint a la lista
-        self.waypoints.append(waypoint)
-        waypoint_num = len(self.waypoints)
+        self._append_waypoint(waypoint)
+        waypoint_num = self._n_wp
         
         # Dibujar punto waypoint en amarillo/naranja
-        waypoint_circle = Circle((x, y), radius=6, color='orange',
-                                alpha=0.7, zorder=5)
-        self.ax.add_patch(waypoint_circle)
-        self.waypoint_points.append(waypoint_circle)
+        self._update_waypoint_markers()
         
         # Agregar etiqueta
         label = self.ax.text(x + 12, y + 12, f'q_{waypoint_num}\n({x:.1f}, {y:.1f})',
@@ -512,32 +794,35 @@ class VisualPointConfigurator:
                     bbox=dict(boxstyle='round,pad=0.4', facecolor='lightyellow', alpha=0.7))
         self.waypoint_labels.append(label)
         
-        # Dibujar línea desde el punto anterior
-        if len(self.waypoints) == 1:
-            # Primera línea desde q_i
-            line = self.ax.plot([self.q_i[0], x], [self.q_i[1], y],
-                               'b--', linewidth=2, alpha=0.5, zorder=3)[0]
-        else:
-            # Líneas entre waypoints
-            prev = self.waypoints[-2]
-            line = self.ax.plot([prev[0], x], [prev[1], y],
-                               'b--', linewidth=2, alpha=0.5, zorder=3)[0]
-        self.path_lines.append(line)
+        # Extender la línea de ruta hasta el nuevo waypoint
+        self._update_path_line()
         
         # Actualizar título
         total_points = len(self.waypoints)
-        self.ax.set_title(f'Configuración de Puntos de Navegación\n' +
-                         f'Puntos intermedios: {total_points} | Click para MÁS | ESPACIO para FINAL',
-                         fontsize=14, fontweight='bold', pad=20)
+        self._set_title(f'Configuración de Puntos de Navegación\n' +
+                       f'Puntos intermedios: {total_points} | Click para MÁS | ESPACIO para FINAL')
         
-        self.fig.canvas.draw()
+        self._blit_route()
         
         print(f"\n[INFO] Waypoint {waypoint_num} añadido: ({x:.1f}, {y:.1f})")
         print(f"       Total de puntos intermedios: {total_points}")
     
+    def _update_waypoint_markers(self):
+        """Regenera los círculos de la colección de waypoints."""
+        self._waypoint_markers.set_paths([Circle(wp, radius=6)
+                                          for wp in self.waypoints.tolist()])
+    
+    def _update_path_line(self):
+        """Actualiza la línea de ruta q_i → q_1 → ... → último waypoint."""
+        if self._n_wp:
+            route = self._route_xy[:self._n_wp + 1]
+            self._path_line.set_data(route[:, 0], route[:, 1])
+        else:
+            self._path_line.set_data([], [])
+    
     def _set_final_point(self, x, y):
         """Establece el punto final del robot."""
-        self.q_f = (round(x, 2), round(y, 2))
+        self.q_f = (float(round(x, 2)), float(round(y, 2)))
         
         # Validar distancia con el último punto (waypoint o q_i)
         if len(self.waypoints) > 0:
@@ -545,8 +830,8 @@ class VisualPointConfigurator:
         else:
             last_point = self.q_i
         
-        distance = math.hypot(self.q_f[0] - last_point[0],
-                             self.q_f[1] - last_point[1])
+        distance = hypot(self.q_f[0] - last_point[0],
+                         self.q_f[1] - last_point[1])
         
         if distance < 10:
             print("\n[ADVERTENCIA] El punto final está muy cerca del punto anterior.")
@@ -563,58 +848,60 @@ class VisualPointConfigurator:
         self.ax.add_patch(self.point_final)
         
         # Agregar etiqueta
-        self.ax.text(x, y - 15, f'META\n({x:.1f}, {y:.1f})',
+        goal_label = self.ax.text(x, y - 15, f'META\n({x:.1f}, {y:.1f})',
                     ha='center', va='top', fontweight='bold',
                     color='darkred', fontsize=10,
                     bbox=dict(boxstyle='round,pad=0.5', facecolor='lightcoral', alpha=0.7))
+        self._map_labels.append(goal_label)
         
         # Dibujar línea desde el último punto hasta q_f
-        line = self.ax.plot([last_point[0], self.q_f[0]],
-                           [last_point[1], self.q_f[1]],
-                           'g--', linewidth=2.5, alpha=0.6, zorder=3)[0]
-        self.path_lines.append(line)
+        self._final_line.set_data([last_point[0], self.q_f[0]],
+                                  [last_point[1], self.q_f[1]])
         
         # Calcular distancia total del recorrido
-        total_distance = 0.0
-        
-        # Distancia q_i → primer waypoint o q_f
-        if len(self.waypoints) > 0:
-            total_distance += math.hypot(self.waypoints[0][0] - self.q_i[0],
-                                        self.waypoints[0][1] - self.q_i[1])
-            
-            # Distancias entre waypoints
-            for i in range(1, len(self.waypoints)):
-                total_distance += math.hypot(self.waypoints[i][0] - self.waypoints[i-1][0],
-                                            self.waypoints[i][1] - self.waypoints[i-1][1])
-            
-            # Distancia último waypoint → q_f
-            total_distance += distance
-        else:
-            # Sin waypoints, solo q_i → q_f
-            total_distance = math.hypot(self.q_f[0] - self.q_i[0],
-                                       self.q_f[1] - self.q_i[1])
+        total_distance = self._total_path_distance()
         
         # Agregar información de distancia total
         mid_x = (self.q_i[0] + self.q_f[0]) / 2
         mid_y = (self.q_i[1] + self.q_f[1]) / 2
-        self.ax.text(mid_x, mid_y, f'Distancia total: {total_distance:.1f} cm',
+        distance_label = self.ax.text(mid_x, mid_y, f'Distancia total: {total_distance:.1f} cm',
                     ha='center', va='center', fontweight='bold',
                     color='black', fontsize=9,
                     bbox=dict(boxstyle='round,pad=0.5', facecolor='yellow', alpha=0.7))
+        self._map_labels.append(distance_label)
         
         # Actualizar título
-        self.ax.set_title('Configuración Completada\n' +
-                         'Presiona "S" para GUARDAR o "R" para RESETEAR',
-                         fontsize=14, fontweight='bold', pad=20,
-                         color='darkgreen')
+        self._set_title('Configuración Completada\n' +
+                       'Presiona "S" para GUARDAR o "R" para RESETEAR',
+                       color='darkgreen')
         
         self.step = 4
         self.waiting_for_final = False
-        self.fig.canvas.draw()
+        self._request_draw()
         
         # Mostrar resumen en consola
         self._print_summary()
     
+    def _route_points(self):
+        """
+        Devuelve la ruta completa q_i → q_1 → ... → q_f como array (N+2, 2).
+        """
+        return np.vstack((self._route_xy[:self._n_wp + 1], self.q_f))
+    
+    def _total_path_distance(self, pts=None):
+        """
+        Calcula la longitud total de la ruta q_i → q_1 → ... → q_f.
+        
+        Args:
+            pts: Ruta ya apilada por _route_points (se construye si es None)
+        
+        Returns:
+            float: Suma de las longitudes de todos los segmentos (cm)
+        """
+        if pts is None:
+            pts = self._route_points()
+        return _path_length(pts[:, 0], pts[:, 1])
+    
     def _on_key(self, event):
         """
         Maneja eventos de teclado.
@@ -622,46 +909,46 @@ class VisualPointConfigurator:
         Args:
             event: Evento de matplotlib con información de la tecla presionada
         """
-        if event.key.lower() == 'r':
-            # Resetear configuración
-            self._reset()
-        
-        elif event.key.lower() == 'u':
-            # Deshacer último punto
-            self._undo_last_point()
-        
-        elif event.key == ' ':
-            # ESPACIO: Marcar que el siguiente será el punto final
-            if self.step == 2 and not self.waiting_for_final:
-                self.waiting_for_final = True
-                print("\n[INFO] Siguiente punto será el PUNTO FINAL (rojo)")
-                self.ax.set_title('Configuración de Puntos de Navegación\n' +
-                                 'Click para PUNTO FINAL (rojo)',
-                                 fontsize=14, fontweight='bold', pad=20,
-                                 color='darkred')
-                self.fig.canvas.draw()
-            
-        elif event.key.lower() == 's':
-            # Guardar configuración
-            if self.step == 4:
-                # Guardar primero y asegurar que se complete
-                try:
-                    self._save_configuration()
-                    # Esperar un momento para asegurar que el archivo se escribió
-                    import time
-                    time.sleep(0.1)
-                    print("\n[INFO] Cerrando configurador...")
-                    plt.close(self.fig)
-                except Exception as e:
-                    print(f"\n[ERROR] Error al guardar: {e}")
-                    print("[INFO] La ventana permanecerá abierta para reintentar.")
-            else:
-                print("\n[ERROR] Configuración incompleta. Completa todos los pasos antes de guardar.")
-                
-        elif event.key.lower() == 'q':
-            # Salir sin guardar
-            print("\n[INFO] Saliendo sin guardar...")
-            plt.close(self.fig)
+        # Búsqueda directa en la tabla de teclas; las letras se aceptan en
+        # mayúscula o minúscula (event.key es None con algunas teclas especiales)
+        key = event.key
+        if not key:
+            return
+        handler = self._key_handlers.get(key) or self._key_handlers.get(key.lower())
+        if handler is not None:
+            with self._batch_updates():
+                handler()
+    
+    def _on_space_key(self):
+        """ESPACIO: marca que el siguiente punto será el punto final."""
+        if self.step == 2 and not self.waiting_for_final:
+            self.waiting_for_final = True
+            print("\n[INFO] Siguiente punto será el PUNTO FINAL (rojo)")
+            self._set_title('Configuración de Puntos de Navegación\n' +
+                           'Click para PUNTO FINAL (rojo)',
+                           color='darkred')
+            # Solo cambia el título: basta con el blitting de la ruta
+            self._blit_route()
+    
+    def _on_save_key(self):
+        """'S': guarda la configuración y cierra la ventana."""
+        if self.step == 4:
+            # Guardar primero y asegurar que se complete
+            try:
+                # La escritura es síncrona: al volver el archivo ya está completo
+                self._save_configuration()
+                print("\n[INFO] Cerrando configurador...")
+                plt.close(self.fig)
+            except Exception as e:
+                print(f"\n[ERROR] Error al guardar: {e}")
+                print("[INFO] La ventana permanecerá abierta para reintentar.")
+        else:
+            print("\n[ERROR] Configuración incompleta. Completa todos los pasos antes de guardar.")
+    
+    def _on_quit_key(self):
+        """'Q': sale sin guardar."""
+        print("\n[INFO] Saliendo sin guardar...")
+        plt.close(self.fig)
     
     def _reset(self):
         """Resetea la configuración y limpia el mapa."""
@@ -670,104 +957,77 @@ class VisualPointConfigurator:
         # Limpiar estado
         self.q_i = None
         self.orientation_point = None
-        self.waypoints = []
+        self._n_wp = 0
         self.q_f = None
         self.theta = None
         self.step = 0
         self.waiting_for_final = False
         
-        # Limpiar elementos visuales
-        if self.point_initial:
-            self.point_initial.remove()
-            self.point_initial = None
-        
-        if self.point_final:
-            self.point_final.remove()
-            self.point_final = None
-        
-        # Limpiar waypoints
-        for wp in self.waypoint_points:
-            wp.remove()
-        self.waypoint_points = []
-        
-        for label in self.waypoint_labels:
-            label.remove()
+        # Limpiar elementos visuales: se quitan solo los artistas creados para
+        # esta configuración (los del mapa, la ruta y la vista previa son
+        # persistentes y solo se vacían u ocultan)
+        transient = [self.point_initial, self.point_final, self.orientation_arrow,
+                     self.robot_circle, *self.waypoint_labels, *self._map_labels]
+        for artist in transient:
+            if artist is not None:
+                artist.remove()
+        self.point_initial = None
+        self.point_final = None
+        self.orientation_arrow = None
+        self.robot_circle = None
         self.waypoint_labels = []
+        self._map_labels = []
         
-        # Limpiar líneas de ruta
-        for line in self.path_lines:
-            line.remove()
-        self.path_lines = []
-        
-        if self.orientation_arrow:
-            self.orientation_arrow.remove()
-            self.orientation_arrow = None
-        
-        if self.robot_circle:
-            self.robot_circle.remove()
-            self.robot_circle = None
-        
-        if self.temp_orientation_arrow:
-            self.temp_orientation_arrow.remove()
-            self.temp_orientation_arrow = None
-        
-        if self.orientation_label:
-            self.orientation_label.remove()
-            self.orientation_label = None
-        
-        # Limpiar textos adicionales
-        for txt in self.ax.texts[:]:
-            txt.remove()
-        
-        # Limpiar líneas adicionales
-        for line in self.ax.lines[:]:
-            line.remove()
+        self._update_waypoint_markers()
+        self._path_line.set_data([], [])
+        self._final_line.set_data([], [])
+        self._hide_orientation_preview()
         
         # Resetear estado de arrastre
         self.dragging_orientation = False
+        self._stop_motion_tracking()
+        self._motion_timer.stop()
+        self._pending_xy = None
+        self._bg = None
+        self._static_bg = None
         
         # Resetear título
-        self.ax.set_title('Configuración de Puntos de Navegación\n' +
-                         'Paso 1: Click para PUNTO INICIAL (verde)',
-                         fontsize=14, fontweight='bold', pad=20)
+        self._set_title('Configuración de Puntos de Navegación\n' +
+                       'Paso 1: Click para PUNTO INICIAL (verde)')
         
-        self.fig.canvas.draw()
+        self._request_draw()
     
     def _undo_last_point(self):
         """Deshace el último punto añadido."""
         if self.step == 2 and len(self.waypoints) > 0:
             # Eliminar el último waypoint
-            removed = self.waypoints.pop()
+            removed = self._pop_waypoint()
             
             # Eliminar círculo visual
-            if self.waypoint_points:
-                circle = self.waypoint_points.pop()
-                circle.remove()
+            self._update_waypoint_markers()
             
             # Eliminar etiqueta
             if self.waypoint_labels:
                 label = self.waypoint_labels.pop()
                 label.remove()
             
-            # Eliminar línea
-            if self.path_lines:
-                line = self.path_lines.pop()
-                line.remove()
+            # Recortar la línea de ruta
+            self._update_path_line()
             
             print(f"\n[INFO] Waypoint eliminado: ({removed[0]:.1f}, {removed[1]:.1f})")
             print(f"       Waypoints restantes: {len(self.waypoints)}")
             
             # Actualizar título
             if len(self.waypoints) > 0:
-                self.ax.set_title(f'Configuración de Puntos de Navegación\n' +
-                                 f'Puntos intermedios: {len(self.waypoints)} | Click para MÁS | ESPACIO para FINAL',
-                                 fontsize=14, fontweight='bold', pad=20)
+                self._set_title(f'Configuración de Puntos de Navegación\n' +
+                               f'Puntos intermedios: {len(self.waypoints)} | Click para MÁS | ESPACIO para FINAL')
             else:
-                self.ax.set_title('Configuración de Puntos de Navegación\n' +
-                                 'Paso 3: Click para PUNTOS INTERMEDIOS (amarillo) | ESPACIO para marcar FINAL',
-                                 fontsize=14, fontweight='bold', pad=20)
+                self._set_title('Configuración de Puntos de Navegación\n' +
+                               'Paso 3: Click para PUNTOS INTERMEDIOS (amarillo) | ESPACIO para marcar FINAL')
             
-            self.fig.canvas.draw()
+            # El fondo estático no contiene la ruta, así que al redibujarla
+            # sin el último waypoint este desaparece sin un draw() completo
+            self._blit_route()
         else:
             print("\n[INFO] No hay waypoints para deshacer.")
     
@@ -791,48 +1051,23 @@ class VisualPointConfigurator:
         print(f"   x = {self.q_f[0]:.2f} cm")
         print(f"   y = {self.q_f[1]:.2f} cm")
         
-        # Calcular distancia total
-        total_distance = 0.0
-        
-        if len(self.waypoints) > 0:
-            # q_i → primer waypoint
-            total_distance += math.hypot(self.waypoints[0][0] - self.q_i[0],
-                                        self.waypoints[0][1] - self.q_i[1])
-            
-            # Entre waypoints
-            for i in range(1, len(self.waypoints)):
-                total_distance += math.hypot(self.waypoints[i][0] - self.waypoints[i-1][0],
-                                            self.waypoints[i][1] - self.waypoints[i-1][1])
-            
-            # Último waypoint → q_f
-            total_distance += math.hypot(self.q_f[0] - self.waypoints[-1][0],
-                                        self.q_f[1] - self.waypoints[-1][1])
-        else:
-            # Sin waypoints: q_i → q_f directo
-            total_distance = math.hypot(self.q_f[0] - self.q_i[0],
-                                       self.q_f[1] - self.q_i[1])
-        
-        # Calcular ángulo hacia el primer objetivo (waypoint o q_f)
-        if len(self.waypoints) > 0:
-            first_target = self.waypoints[0]
-        else:
-            first_target = self.q_f
+        # Calcular distancia total sobre la ruta apilada una sola vez
+        pts = self._route_points()
+        total_distance = self._total_path_distance(pts)
         
-        angle_to_first = math.degrees(math.atan2(
-            first_target[1] - self.q_i[1],
-            first_target[0] - self.q_i[0]
-        ))
+        # Calcular ángulo hacia el primer objetivo (waypoint o q_f): es el
+        # primer segmento de la ruta
+        first_dx, first_dy = (pts[1] - pts[0]).tolist()
+        angle_to_first = degrees(atan2(first_dy, first_dx))
         
         print(f"\nDistancia total a recorrer: {total_distance:.1f} cm")
         print(f"Ángulo hacia primer objetivo: {angle_to_first:.1f} deg")
         
         # Calcular error angular inicial
         angle_diff = angle_to_first - self.theta
-        # Normalizar a rango [-180, 180]
-        while angle_diff > 180:
-            angle_diff -= 360
-        while angle_diff <= -180:
-            angle_diff += 360
+        # Normalizar a rango (-180, 180] con un solo módulo (tiempo constante
+        # para cualquier magnitud de entrada)
+        angle_diff = 180.0 - (180.0 - angle_diff) % 360.0
         
         print(f"Error angular inicial: {angle_diff:.1f} deg")
         
@@ -848,35 +1083,50 @@ class VisualPointConfigurator:
         # Crear estructura de datos
         data = {
             "q_i": {
-                "x": round(self.q_i[0], 2),
-                "y": round(self.q_i[1], 2),
-                "theta": round(self.theta, 2)
+                "x": float(round(self.q_i[0], 2)),
+                "y": float(round(self.q_i[1], 2)),
+                "theta": float(round(self.theta, 2))
             }
         }
         
         # Añadir waypoints si existen
         if len(self.waypoints) > 0:
+            # Redondeo vectorizado sobre el buffer; el JSON mantiene el formato
+            # {"x", "y"} por waypoint que leen los scripts de navegación
             data["waypoints"] = [
-                {"x": round(wp[0], 2), "y": round(wp[1], 2)} for wp in self.waypoints
+                {"x": x, "y": y} for x, y in np.round(self.waypoints, 2).tolist()
             ]
         
         # Añadir punto final
         data["q_f"] = {
-            "x": round(self.q_f[0], 2),
-            "y": round(self.q_f[1], 2)
+            "x": float(round(self.q_f[0], 2)),
+            "y": float(round(self.q_f[1], 2))
         }
         
         # Asegurar que el directorio existe
         self.output_file.parent.mkdir(parents=True, exist_ok=True)
         
-        # Guardar JSON con formato bonito usando context manager
+        # Serializar de una vez (orjson si está disponible)
+        if HAS_ORJSON:
+            payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        else:
+            payload = json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+        
         try:
-            with open(self.output_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=4, ensure_ascii=False)
+            # Se escribe en un temporal, se fuerza a disco y se renombra: el
+            # reemplazo es atómico, así que points.json nunca queda a medias
+            tmp_path = self.output_file.with_suffix(self.output_file.suffix + ".tmp")
+            with tmp_path.open("wb") as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.output_file)
             
             # Verificar que el archivo se escribió correctamente
             with open(self.output_file, 'r', encoding='utf-8') as f:
                 verify_data = json.load(f)
+            if verify_data != data:
+                raise IOError(f"El contenido de {self.output_file} no coincide con la configuración")
             
             print(f"\n[ÉXITO] Configuración guardada en: {self.output_file}")
             print(f"\nRuta configurada:")